@@ -0,0 +1,227 @@
+"""
+LightGBM Scalping Classifier
+============================
+
+FreqAI prediction model for MLScalpingStrategy.
+
+Trains and predicts like FreqAI's LightGBMClassifier, one booster per
+pair; predictions are not batched across pairs (see mlscalping/inference.py).
+In live/dry-run it adds:
+1. The time spent predicting is tracked per candle across all pairs and
+   compared with the process_throttle_secs budget
+2. Models are served from a warm ModelCache: memory-mapped at startup,
+   swapped atomically when a retrain finishes (see
+   mlscalping/model_cache.py), with cold-start time reported
+
+The outlier step enabled by use_SVM_to_remove_outliers can be swapped for
+a faster filter with feature_parameters "outlier_filter" on training
+windows long enough for it to pay off (see mlscalping/outliers.py), and "DI_index": "indexed" answers the DI_threshold
+step's nearest-neighbour queries from a KD-tree built once per model (see
+mlscalping/dissimilarity.py). The index is opt-in: its DI_values are off by
+up to ~0.5% (python scripts/benchmark.py di), which can flip the strategy's
+DI_values > 0.5 entry gate, so the default "brute" keeps FreqAI's exact DI.
+
+Features the strategy keeps as float32/int8 (compact_feature_store) are
+widened to float64 before training and prediction, so the pipeline and
+model see the same dtype as without the compact store.
+
+Select it with "freqaimodel": "LightGBMScalpingClassifier" in config.json
+(or --freqaimodel LightGBMScalpingClassifier).
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from datasieve.pipeline import Pipeline
+from pandas import DataFrame
+
+from freqtrade.enums import RunMode
+from freqtrade.freqai.data_drawer import FEATURE_PIPELINE, LABEL_PIPELINE, METADATA
+from freqtrade.freqai.data_kitchen import FreqaiDataKitchen
+from freqtrade.freqai.prediction_models.LightGBMClassifier import LightGBMClassifier
+
+# Strategy helpers live in user_data/strategies/mlscalping
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'strategies'))
+
+from mlscalping.dissimilarity import IndexedDissimilarityIndex  # noqa: E402
+from mlscalping.feature_store import float64_features  # noqa: E402
+from mlscalping.inference import InferenceLatency  # noqa: E402
+from mlscalping.model_cache import ModelBundle, ModelCache, bundle_path, save_bundle  # noqa: E402
+from mlscalping.outliers import make_outlier_filter, use_outlier_filter  # noqa: E402
+
+
+logger = logging.getLogger(__name__)
+
+
+class LightGBMScalpingClassifier(LightGBMClassifier):
+    """
+    LightGBMClassifier with per-candle latency tracking and a warm model cache
+    """
+    
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        budget = self.config.get('internals', {}).get('process_throttle_secs', 5)
+        self.inference_latency = InferenceLatency(budget)
+        self._last_latency_report = time.monotonic()
+        
+        self.model_cache = ModelCache()
+        self._startup = time.perf_counter()
+        self._first_prediction_logged = False
+        if self.config.get('runmode') in (RunMode.LIVE, RunMode.DRY_RUN):
+            threading.Thread(target=self._warm_model_cache, name='freqai-model-warmup',
+                             daemon=True).start()
+    
+    def _warm_model_cache(self) -> None:
+        """
+        Load every pair's saved bundle into memory at startup, so the first
+        candle does not unpickle the models pair by pair
+        """
+        start = time.perf_counter()
+        with self.dd.pair_dict_lock:
+            pairs = {pair: dict(info) for pair, info in self.dd.pair_dict.items()}
+        
+        warmed = 0
+        for pair, info in pairs.items():
+            if not info.get('model_filename'):
+                continue
+            path = bundle_path(info['data_path'], info['model_filename'])
+            if not path.is_file():
+                continue
+            try:
+                bundle = self.model_cache.load(pair, path)
+                with (path.parent / f"{info['model_filename']}_{METADATA}.json").open('r') as fp:
+                    metadata = json.load(fp)
+            except Exception as e:
+                logger.warning(f"Model cache: could not load {path.name} for {pair}: {e}")
+                continue
+            
+            # Hand the same objects to FreqAI's in-memory dictionaries
+            # (model first: load_data falls back to disk for a missing model)
+            self.dd.model_dictionary.setdefault(pair, bundle.model)
+            self.dd.meta_data_dictionary.setdefault(pair, {
+                METADATA: metadata,
+                FEATURE_PIPELINE: bundle.feature_pipeline,
+                LABEL_PIPELINE: bundle.label_pipeline,
+            })
+            warmed += 1
+        
+        logger.info(f"Model cache: warmed {warmed} of {len(pairs)} pairs in "
+                    f"{time.perf_counter() - start:.2f}s ({self.model_cache.stats()})")
+    
+    def define_data_pipeline(self, threads=-1) -> Pipeline:
+        """
+        FreqAI's feature pipeline, with the SVM outlier step replaced by the
+        configured outlier_filter and the DI step by the indexed version
+        """
+        pipeline = super().define_data_pipeline(threads)
+        ft_params = self.freqai_info["feature_parameters"]
+        outlier_filter = ft_params.get("outlier_filter", "svm")
+        if not use_outlier_filter(outlier_filter, self.freqai_info.get("train_period_days", 0),
+                                  ft_params.get("outlier_filter_min_days")):
+            outlier_filter = "svm"
+        indexed_di = ft_params.get("DI_index", "brute") == "indexed"
+        
+        steps = []
+        for step_name, step in pipeline.steps:
+            if step_name == "svm" and outlier_filter != "svm":
+                step_name = "outliers"
+                step = make_outlier_filter(outlier_filter, ft_params.get("outlier_filter_params"), threads)
+            elif step_name == "di" and indexed_di:
+                step = IndexedDissimilarityIndex(di_threshold=step.di_threshold, n_jobs=threads,
+                                                 **ft_params.get("DI_index_params", {}))
+            steps.append((step_name, step))
+        return Pipeline(steps, fitparams={})
+    
+    def train(self, unfiltered_df: DataFrame, pair: str, dk: FreqaiDataKitchen, **kwargs):
+        """
+        Train like LightGBMClassifier, then save the bundle and swap it in
+        """
+        # Compact float32/int8 features are widened, so the pipeline fits in float64
+        model = super().train(float64_features(unfiltered_df), pair, dk, **kwargs)
+        
+        if getattr(self, 'live', False):
+            bundle = ModelBundle(model, dk.feature_pipeline, dk.label_pipeline,
+                                 list(dk.training_features_list), list(dk.label_list))
+            try:
+                save_bundle(bundle_path(dk.data_path, dk.model_filename), bundle)
+            except OSError as e:
+                logger.warning(f"Model cache: could not save bundle for {pair}: {e}")
+            self.model_cache.publish(pair, bundle)
+        
+        return model
+    
+    def predict(self, unfiltered_df: DataFrame, dk: FreqaiDataKitchen, **kwargs):
+        """
+        Filter the prediction features and predict with them.
+        :return: (pred_df, do_predict) like BaseClassifierModel.predict
+        """
+        start = time.perf_counter()
+        model = self.model
+        
+        # Live: use one consistent model + pipeline snapshot, even if a
+        # retrain publishes a new version while this pair is predicting
+        bundle = self.model_cache.get(dk.pair) if self.live else None
+        if bundle is not None:
+            model = bundle.model
+            dk.feature_pipeline = bundle.feature_pipeline
+            dk.label_pipeline = bundle.label_pipeline
+            dk.training_features_list = bundle.training_features_list
+            dk.label_list = bundle.label_list
+        
+        dk.find_features(unfiltered_df)
+        filtered_df, _ = dk.filter_features(
+            float64_features(unfiltered_df), dk.training_features_list, training_filter=False
+        )
+        
+        dk.data_dictionary["prediction_features"] = filtered_df
+        
+        dk.data_dictionary["prediction_features"], outliers, _ = dk.feature_pipeline.transform(
+            dk.data_dictionary["prediction_features"], outlier_check=True
+        )
+        
+        predictions = model.predict(dk.data_dictionary["prediction_features"])
+        if self.CONV_WIDTH == 1:
+            predictions = np.reshape(predictions, (-1, len(dk.label_list)))
+        
+        pred_df = DataFrame(predictions, columns=dk.label_list)
+        
+        predictions_prob = model.predict_proba(dk.data_dictionary["prediction_features"])
+        if self.CONV_WIDTH == 1:
+            predictions_prob = np.reshape(predictions_prob, (-1, len(model.classes_)))
+        pred_df_prob = DataFrame(predictions_prob, columns=model.classes_)
+        pred_df = pd.concat([pred_df, pred_df_prob], axis=1)
+        
+        if dk.feature_pipeline["di"]:
+            dk.DI_values = dk.feature_pipeline["di"].di_values
+        else:
+            dk.DI_values = np.zeros(outliers.shape[0])
+        dk.do_predict = outliers
+        
+        if self.live:
+            candle = unfiltered_df['date'].iloc[-1] if 'date' in unfiltered_df.columns else None
+            self.inference_latency.record(candle, dk.pair, time.perf_counter() - start)
+            self._report_latency()
+            if not self._first_prediction_logged:
+                self._first_prediction_logged = True
+                logger.info(f"Cold start: first prediction ({dk.pair}) "
+                            f"{time.perf_counter() - self._startup:.2f}s after model startup, "
+                            f"served from {'model cache' if bundle is not None else 'disk'}")
+        
+        return (pred_df, dk.do_predict)
+    
+    def _report_latency(self) -> None:
+        """Log the inference latency summary once an hour"""
+        now = time.monotonic()
+        if now - self._last_latency_report < 3600:
+            return
+        self._last_latency_report = now
+        summary = self.inference_latency.summary()
+        if summary:
+            logger.info(f"Inference latency per candle: {summary} "
+                        f"(budget {self.inference_latency.budget_seconds}s)")
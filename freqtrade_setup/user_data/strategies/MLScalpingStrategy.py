@@ -20,14 +20,36 @@ Risk Management:
 """
 
 from freqtrade.strategy import IStrategy, IntParameter, DecimalParameter
-from pandas import DataFrame
+from freqtrade.enums import RunMode
+from pandas import DataFrame, concat
 import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from freqtrade.persistence import Trade
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
+import logging
+import time
 import numpy as np
 
+from mlscalping import IncrementalIndicatorEngine, IndicatorCache
+from mlscalping.batch_features import PanelIndicators, warm_cache
+from mlscalping.day_cache import DayBlockCache, feature_spec_hash
+from mlscalping.feature_store import compact_features
+from mlscalping.labels import forward_max, forward_return_labels
+from mlscalping.param_grid import signal_grid, grid_column, grid_frame
+from mlscalping.snapshot import take_snapshot
+from mlscalping.indicator_cache import (
+    RSI_14, MACD_12_26_9, BBANDS_20_2, EMA_8, EMA_21, ATR_14, VOLUME_MEAN_20,
+    compute_indicator,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Cache spec for the period-independent part of feature_engineering_expand_all
+FIXED_FEATURES = ('expand_all_fixed',)
+
 
 class MLScalpingStrategy(IStrategy):
     """
@@ -78,9 +100,56 @@ class MLScalpingStrategy(IStrategy):
     # ML confidence threshold
     ml_confidence_threshold = DecimalParameter(0.5, 0.8, default=0.65, space="buy")
     
+    # custom_stake_amount: (ATR % of the rate above, stake factor), highest first
+    atr_stake_steps = [(2.0, 0.7), (1.5, 0.85)]
+    
+    # confirm_trade_exit: minutes in a trade before exits other than stops/ROI
+    min_exit_signal_minutes = 5
+    
     # Process only new candles
     process_only_new_candles = True
     
+    # Update strategy indicators candle-by-candle in live/dry-run
+    # (full TA-Lib recompute is still used for backtesting and hyperopt)
+    use_incremental_indicators = True
+    
+    # Compute shared indicators for all pairs at once (time x pair arrays)
+    # at the start of each live loop, instead of pair by pair
+    use_batched_indicators = False
+    
+    # Backtesting/hyperopt: keep the fixed feature block on disk per UTC day
+    # (user_data/feature_cache) so overlapping training windows only compute
+    # new days. Days are cached once they have this much history before them,
+    # and the first this many rows of a window are always computed from the
+    # window itself, like a cold compute (python scripts/benchmark.py daycache).
+    # Opt-in: rows past the warmup match a cold compute to ~1e-9, not bit for bit.
+    use_feature_day_cache = False
+    feature_cache_warmup_candles = 2000
+    
+    # Keep FreqAI features as float32 (int8 for candle patterns / EMA cross)
+    # instead of float64 to cut memory per pair. LightGBMScalpingClassifier
+    # widens them back to float64 for training and prediction, so do_predict
+    # and the signals do not change (python scripts/benchmark.py compact)
+    compact_feature_store = False
+    
+    # Extra FreqAI targets: one &-s_target_<h>c_<pct>pct label per
+    # horizon (candles) x minimum return, e.g. [10, 20, 40] x [0.005, 0.01]
+    label_horizons = []
+    label_thresholds = []
+    
+    # Live/dry-run: entry and exit rules are only evaluated on the newest
+    # candles (backtesting and hyperopt keep the full-vector path)
+    live_signal_rows = 1
+    
+    # Columns the entry/exit rules read
+    ENTRY_COLUMNS = ['do_predict', 'DI_values', 'volume', 'volume_mean_20', 'rsi', 'close',
+                     'ema_fast', 'bb_upperband', 'bb_lowerband', 'bb_middleband']
+    EXIT_COLUMNS = ['do_predict', 'rsi', 'close', 'ema_fast', 'macd', 'macdsignal']
+    
+    # Hyperopt: evaluate the entry/exit rules for every buy_rsi/sell_rsi
+    # candidate once per pair, so each epoch only selects a mask column
+    use_signal_grid = True
+    
     # These values can be overridden in config
     plot_config = {
         'main_plot': {
@@ -100,86 +169,219 @@ class MLScalpingStrategy(IStrategy):
         }
     }
     
+    def bot_start(self, **kwargs) -> None:
+        """
+        Called once after the bot is initialized
+        """
+        self.indicator_engine = IncrementalIndicatorEngine()
+        self.indicator_cache = IndicatorCache()
+        self._cached_pairs = set()
+        self._last_cache_report = None
+        self._batched_candles = {}
+        self._panel_indicators = {}
+        self._candle_snapshots = {}
+        self._feature_store_reports = {}
+        
+        self.feature_day_cache = None
+        if self.use_feature_day_cache and self.config.get('runmode') in (RunMode.BACKTEST, RunMode.HYPEROPT):
+            self.feature_day_cache = DayBlockCache(Path(self.config['user_data_dir']) / 'feature_cache')
+            self._feature_spec_hash = feature_spec_hash(
+                self._fixed_features, compute_indicator, self.feature_cache_warmup_candles)
+    
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        """
+        Report feature engineering savings and drop cached indicator state
+        for pairs that left the pairlist
+        """
+        # First call comes right after startup training (or backtest training), then hourly
+        now = time.monotonic()
+        if self._last_cache_report is None or now - self._last_cache_report > 3600:
+            self._last_cache_report = now
+            fixed = self.indicator_cache.stats(FIXED_FEATURES[0])
+            if fixed['hits'] or fixed['misses']:
+                total = fixed['compute_seconds'] + fixed['saved_seconds']
+                logger.info(f"Feature engineering: fixed block computed {fixed['misses']}x "
+                            f"({fixed['compute_seconds']:.1f}s), reused {fixed['hits']}x, "
+                            f"saved {fixed['saved_seconds']:.1f}s of {total:.1f}s "
+                            f"({fixed['saved_seconds'] / total:.0%})")
+            logger.info(f"Indicator cache stats: {self.indicator_cache.stats()}")
+            if self.feature_day_cache is not None:
+                logger.info(f"Feature day cache stats: {self.feature_day_cache.stats()}")
+            if self._feature_store_reports:
+                reports = list(self._feature_store_reports.values())
+                before = sum(r['bytes_before'] for r in reports) / len(reports)
+                after = sum(r['bytes_after'] for r in reports) / len(reports)
+                logger.info(f"Compact feature store: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+                            f"per pair ({len(reports)} pairs)")
+        
+        corr_pairs = self.config.get('freqai', {}).get('feature_parameters', {}).get('include_corr_pairlist', [])
+        pairs = set(self.dp.current_whitelist()) | set(corr_pairs)
+        
+        if self.use_batched_indicators and self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN):
+            self._warm_batched_indicators(sorted(pairs))
+        
+        if pairs == self._cached_pairs:
+            return
+        
+        removed = self._cached_pairs - pairs
+        for pair in removed:
+            self.indicator_engine.reset(pair)
+            self._candle_snapshots.pop(pair, None)
+        evicted = self.indicator_cache.evict_pairs(pairs)
+        self._cached_pairs = pairs
+        
+        if removed:
+            logger.info(f"Pairlist changed: evicted {evicted} cached indicators for {len(removed)} pairs. "
+                        f"Indicator cache stats: {self.indicator_cache.stats()}")
+    
+    def _warm_batched_indicators(self, pairs) -> None:
+        """
+        Fill the indicator cache for every pair and FreqAI timeframe in one
+        vectorized pass per timeframe, once per new candle; only the rows
+        added since the previous candle are computed
+        """
+        timeframes = self.config.get('freqai', {}).get('feature_parameters', {}).get(
+            'include_timeframes', [self.timeframe])
+        for timeframe in timeframes:
+            dataframes = {pair: self.dp.get_pair_dataframe(pair, timeframe) for pair in pairs}
+            last_candles = tuple(df['date'].iloc[-1] if len(df) else None for df in dataframes.values())
+            if self._batched_candles.get(timeframe) == (tuple(pairs), last_candles):
+                continue
+            self._batched_candles[timeframe] = (tuple(pairs), last_candles)
+            
+            panel = self._panel_indicators.setdefault(timeframe, PanelIndicators())
+            skipped = warm_cache(self.indicator_cache, timeframe, dataframes, panel)
+            if skipped:
+                logger.debug(f"Batched indicators ({timeframe}): {len(skipped)} pairs not aligned, "
+                             f"computed per pair instead: {skipped}")
+    
+    def _cached(self, dataframe: DataFrame, metadata: dict, spec, compute=None):
+        """
+        Shared indicator for this pair/timeframe, computed at most once per candle
+        """
+        timeframe = metadata.get('tf', self.timeframe)
+        return self.indicator_cache.get(metadata['pair'], timeframe, spec, dataframe, compute)
+    
     def feature_engineering_expand_all(self, dataframe: DataFrame, period: int,
                                        metadata: dict, **kwargs) -> DataFrame:
         """
         Creates all features for FreqAI model training.
         This is where we engineer 30+ features from raw OHLCV data.
+        
+        FreqAI calls this once for every entry in indicator_periods_candles.
         """
+        # Fixed features ignore `period`: build them once per pair/timeframe/data window
+        features = self._cached(dataframe, metadata, FIXED_FEATURES,
+                                lambda: self._build_fixed_features(dataframe, metadata))
+        
+        # Period-parameterized features (using `period`) would be added here
+        
+        return concat([dataframe, features], axis=1)
+    
+    def _build_fixed_features(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        Fixed feature block, reusing days cached by earlier training windows
+        """
+        if self.feature_day_cache is None:
+            return self._fixed_features(dataframe, metadata)
+        
+        return self.feature_day_cache.features(
+            metadata['pair'], metadata.get('tf', self.timeframe), self._feature_spec_hash, dataframe,
+            lambda frame: self._fixed_features(frame, metadata),
+            self.feature_cache_warmup_candles,
+            recompute=self._cumulative_features,
+        )
+    
+    @staticmethod
+    def _cumulative_features(dataframe: DataFrame) -> dict:
+        """
+        Fixed features whose level depends on where the window starts
+        (never taken from the day cache)
+        """
+        return {
+            "%-obv": ta.OBV(dataframe),
+            "%-ad": ta.AD(dataframe),
+        }
+    
+    def _fixed_features(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        Features of feature_engineering_expand_all that do not depend on `period`
+        """
+        features = DataFrame(index=dataframe.index)
         
         # ===== PRICE-BASED FEATURES =====
-        dataframe["%-pct-change"] = dataframe["close"].pct_change()
-        dataframe["%-pct-change-high"] = dataframe["high"].pct_change()
-        dataframe["%-pct-change-low"] = dataframe["low"].pct_change()
-        dataframe["%-raw_volume"] = dataframe["volume"]
-        dataframe["%-raw_price"] = dataframe["close"]
+        features["%-pct-change"] = dataframe["close"].pct_change()
+        features["%-pct-change-high"] = dataframe["high"].pct_change()
+        features["%-pct-change-low"] = dataframe["low"].pct_change()
+        features["%-raw_volume"] = dataframe["volume"]
+        features["%-raw_price"] = dataframe["close"]
         
         # ===== MOMENTUM INDICATORS =====
         # RSI (Relative Strength Index)
-        dataframe["%-rsi"] = ta.RSI(dataframe, timeperiod=14)
-        dataframe["%-rsi-fast"] = ta.RSI(dataframe, timeperiod=7)
-        dataframe["%-rsi-slow"] = ta.RSI(dataframe, timeperiod=21)
+        features["%-rsi"] = self._cached(dataframe, metadata, RSI_14)
+        features["%-rsi-fast"] = ta.RSI(dataframe, timeperiod=7)
+        features["%-rsi-slow"] = ta.RSI(dataframe, timeperiod=21)
         
         # MFI (Money Flow Index)
-        dataframe["%-mfi"] = ta.MFI(dataframe, timeperiod=14)
+        features["%-mfi"] = ta.MFI(dataframe, timeperiod=14)
         
         # Stochastic
         stoch = ta.STOCH(dataframe)
-        dataframe["%-slowk"] = stoch['slowk']
-        dataframe["%-slowd"] = stoch['slowd']
+        features["%-slowk"] = stoch['slowk']
+        features["%-slowd"] = stoch['slowd']
         
         # Williams %R
-        dataframe["%-willr"] = ta.WILLR(dataframe, timeperiod=14)
+        features["%-willr"] = ta.WILLR(dataframe, timeperiod=14)
         
         # ===== TREND INDICATORS =====
         # MACD
-        macd = ta.MACD(dataframe)
-        dataframe["%-macd"] = macd['macd']
-        dataframe["%-macdsignal"] = macd['macdsignal']
-        dataframe["%-macdhist"] = macd['macdhist']
+        macd = self._cached(dataframe, metadata, MACD_12_26_9)
+        features["%-macd"] = macd['macd']
+        features["%-macdsignal"] = macd['macdsignal']
+        features["%-macdhist"] = macd['macdhist']
         
         # ADX (Average Directional Index)
-        dataframe["%-adx"] = ta.ADX(dataframe, timeperiod=14)
-        dataframe["%-plus_di"] = ta.PLUS_DI(dataframe, timeperiod=14)
-        dataframe["%-minus_di"] = ta.MINUS_DI(dataframe, timeperiod=14)
+        features["%-adx"] = ta.ADX(dataframe, timeperiod=14)
+        features["%-plus_di"] = ta.PLUS_DI(dataframe, timeperiod=14)
+        features["%-minus_di"] = ta.MINUS_DI(dataframe, timeperiod=14)
         
         # ===== VOLATILITY INDICATORS =====
         # Bollinger Bands
-        bollinger = qtpylib.bollinger_bands(dataframe['close'], window=20, stds=2)
-        dataframe["%-bb_lowerband"] = bollinger['lower']
-        dataframe["%-bb_middleband"] = bollinger['mid']
-        dataframe["%-bb_upperband"] = bollinger['upper']
-        dataframe["%-bb_width"] = (bollinger['upper'] - bollinger['lower']) / bollinger['mid']
-        dataframe["%-bb_percent"] = (dataframe['close'] - bollinger['lower']) / (bollinger['upper'] - bollinger['lower'])
+        bollinger = self._cached(dataframe, metadata, BBANDS_20_2)
+        features["%-bb_lowerband"] = bollinger['lower']
+        features["%-bb_middleband"] = bollinger['mid']
+        features["%-bb_upperband"] = bollinger['upper']
+        features["%-bb_width"] = (bollinger['upper'] - bollinger['lower']) / bollinger['mid']
+        features["%-bb_percent"] = (dataframe['close'] - bollinger['lower']) / (bollinger['upper'] - bollinger['lower'])
         
         # ATR (Average True Range)
-        dataframe["%-atr"] = ta.ATR(dataframe, timeperiod=14)
-        dataframe["%-natr"] = ta.NATR(dataframe, timeperiod=14)
+        features["%-atr"] = self._cached(dataframe, metadata, ATR_14)
+        features["%-natr"] = ta.NATR(dataframe, timeperiod=14)
         
         # ===== MOVING AVERAGES =====
         # EMAs
-        dataframe["%-ema_fast"] = ta.EMA(dataframe, timeperiod=8)
-        dataframe["%-ema_slow"] = ta.EMA(dataframe, timeperiod=21)
-        dataframe["%-ema_200"] = ta.EMA(dataframe, timeperiod=200)
+        features["%-ema_fast"] = self._cached(dataframe, metadata, EMA_8)
+        features["%-ema_slow"] = self._cached(dataframe, metadata, EMA_21)
+        features["%-ema_200"] = ta.EMA(dataframe, timeperiod=200)
         
         # SMA
-        dataframe["%-sma_fast"] = ta.SMA(dataframe, timeperiod=8)
-        dataframe["%-sma_slow"] = ta.SMA(dataframe, timeperiod=21)
+        features["%-sma_fast"] = ta.SMA(dataframe, timeperiod=8)
+        features["%-sma_slow"] = ta.SMA(dataframe, timeperiod=21)
         
         # ===== VOLUME INDICATORS =====
         # OBV (On-Balance Volume)
-        dataframe["%-obv"] = ta.OBV(dataframe)
+        features["%-obv"] = ta.OBV(dataframe)
         
         # AD (Accumulation/Distribution)
-        dataframe["%-ad"] = ta.AD(dataframe)
+        features["%-ad"] = ta.AD(dataframe)
         
         # ===== PATTERN RECOGNITION =====
         # Candle patterns
-        dataframe["%-cdl_doji"] = ta.CDLDOJI(dataframe)
-        dataframe["%-cdl_hammer"] = ta.CDLHAMMER(dataframe)
-        dataframe["%-cdl_engulfing"] = ta.CDLENGULFING(dataframe)
+        features["%-cdl_doji"] = ta.CDLDOJI(dataframe)
+        features["%-cdl_hammer"] = ta.CDLHAMMER(dataframe)
+        features["%-cdl_engulfing"] = ta.CDLENGULFING(dataframe)
         
-        return dataframe
+        return features
     
     def feature_engineering_expand_basic(self, dataframe: DataFrame, metadata: dict, **kwargs) -> DataFrame:
         """
@@ -205,6 +407,13 @@ class MLScalpingStrategy(IStrategy):
         # Volatility
         dataframe["%-volatility"] = dataframe["close"].rolling(window=20).std() / dataframe["close"].rolling(window=20).mean()
         
+        # Last feature step: pack all features into compact float32/int8 buffers
+        if self.compact_feature_store:
+            dataframe, report = compact_features(dataframe)
+            self._feature_store_reports[metadata['pair']] = report
+            logger.debug(f"Compact feature store for {metadata['pair']}: {report['features']} features, "
+                         f"{report['bytes_before']} -> {report['bytes_after']} bytes")
+        
         return dataframe
     
     def set_freqai_targets(self, dataframe: DataFrame, metadata: dict, **kwargs) -> DataFrame:
@@ -212,13 +421,15 @@ class MLScalpingStrategy(IStrategy):
         Define what the ML model should predict.
         We predict if the price will increase by 1% in the next 20 candles (5m * 20 = 100 min).
         """
-        # Calculate future returns
-        dataframe['&-s_close'] = (
-            dataframe['close']
-            .shift(-20)  # Look 20 candles ahead
-            .rolling(20)
-            .max()
-        )
+        close = dataframe['close'].to_numpy(dtype='float64')
+        horizon = self.freqai_info['feature_parameters'].get('label_period_candles', 20)
+        
+        # Calculate future returns: highest close of the next 20 candles.
+        # The first 19 rows stay NaN, as with the former close.shift(-20).rolling(20).max(),
+        # so the training rows do not change.
+        future_max = forward_max(close, horizon)
+        future_max[:horizon - 1] = np.nan
+        dataframe['&-s_close'] = future_max
         
         # Binary classification: Will price go up by 1%+?
         dataframe['&-s_target'] = (
@@ -226,110 +437,284 @@ class MLScalpingStrategy(IStrategy):
             .astype(int)
         )
         
+        # Optional multi-horizon labels, all computed in one pass
+        if self.label_horizons and self.label_thresholds:
+            labels, _ = forward_return_labels(close, self.label_horizons, self.label_thresholds)
+            for (label_horizon, threshold), values in labels.items():
+                dataframe[f'&-s_target_{label_horizon}c_{threshold * 100:g}pct'] = values
+        
         return dataframe
     
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Add indicators to dataframe for strategy logic (not freqAI features)
         """
-        # RSI
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
-        
-        # MACD
-        macd = ta.MACD(dataframe)
-        dataframe['macd'] = macd['macd']
-        dataframe['macdsignal'] = macd['macdsignal']
-        
-        # Bollinger Bands
-        bollinger = qtpylib.bollinger_bands(dataframe['close'], window=20, stds=2)
-        dataframe['bb_lowerband'] = bollinger['lower']
-        dataframe['bb_middleband'] = bollinger['mid']
-        dataframe['bb_upperband'] = bollinger['upper']
-        
-        # EMAs
-        dataframe['ema_fast'] = ta.EMA(dataframe, timeperiod=8)
-        dataframe['ema_slow'] = ta.EMA(dataframe, timeperiod=21)
-        
-        # Volume
-        dataframe['volume_mean_20'] = dataframe['volume'].rolling(window=20).mean()
+        pair = metadata['pair']
         
-        # ATR for position sizing
-        dataframe['atr'] = ta.ATR(dataframe, timeperiod=14)
+        # Live: only the newly closed candle is pushed through the running state
+        # (with batched indicators the cache below was already filled in bot_loop_start)
+        live = self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN)
+        if live and self.use_incremental_indicators and not self.use_batched_indicators:
+            self._populate_incremental(dataframe, pair)
+        else:
+            # RSI
+            dataframe['rsi'] = self._cached(dataframe, metadata, RSI_14)
+            
+            # MACD
+            macd = self._cached(dataframe, metadata, MACD_12_26_9)
+            dataframe['macd'] = macd['macd']
+            dataframe['macdsignal'] = macd['macdsignal']
+            
+            # Bollinger Bands
+            bollinger = self._cached(dataframe, metadata, BBANDS_20_2)
+            dataframe['bb_lowerband'] = bollinger['lower']
+            dataframe['bb_middleband'] = bollinger['mid']
+            dataframe['bb_upperband'] = bollinger['upper']
+            
+            # EMAs
+            dataframe['ema_fast'] = self._cached(dataframe, metadata, EMA_8)
+            dataframe['ema_slow'] = self._cached(dataframe, metadata, EMA_21)
+            
+            # Volume
+            dataframe['volume_mean_20'] = self._cached(dataframe, metadata, VOLUME_MEAN_20)
+            
+            # ATR for position sizing
+            dataframe['atr'] = self._cached(dataframe, metadata, ATR_14)
         
         # FreqAI will populate these columns with predictions:
         # - do_predict: ML model's prediction (0 or 1)
         # - DI_values: Data quality metric
         # - &*_std/mean: Confidence metrics
+        # freqtrade does not call FreqAI by itself; after the indicators above,
+        # so feature engineering reads the base timeframe from the indicator cache
+        dataframe = self.freqai.start(dataframe, metadata, self)
+        
+        # Hyperopt computes indicators once, then calls the signal methods
+        # every epoch: precompute the masks for the whole parameter grid here
+        if self.use_signal_grid and self.dp.runmode == RunMode.HYPEROPT:
+            dataframe = self._add_signal_grid(dataframe)
         
         return dataframe
     
+    def _add_signal_grid(self, dataframe: DataFrame) -> DataFrame:
+        """
+        Append one boolean column per buy_rsi (entry) and sell_rsi (exit)
+        value. ml_confidence_threshold is not part of the rules, so it adds
+        no grid axis.
+        """
+        grids = []
+        
+        if self.buy_rsi_enabled:
+            values = list(self.buy_rsi.range)
+            base = reduce(lambda x, y: x & y, self._entry_conditions(dataframe, include_rsi=False))
+            grid = signal_grid(base, dataframe['rsi'], values, above=False, combine=np.logical_and)
+            grids.append(grid_frame('enter_long', grid, values, dataframe.index))
+        
+        if self.sell_rsi_enabled:
+            values = list(self.sell_rsi.range)
+            base = reduce(lambda x, y: x | y, self._exit_conditions(dataframe, include_rsi=False))
+            grid = signal_grid(base, dataframe['rsi'], values, above=True, combine=np.logical_or)
+            grids.append(grid_frame('exit_long', grid, values, dataframe.index))
+        
+        if not grids:
+            return dataframe
+        
+        return concat([dataframe, *grids], axis=1)
+    
+    def _populate_incremental(self, dataframe: DataFrame, pair: str) -> None:
+        """
+        Fill strategy indicators from the incremental engine and share them
+        with feature engineering through the indicator cache
+        """
+        indicators = self.indicator_engine.update(pair, self.timeframe, dataframe)
+        for column in indicators.columns:
+            dataframe[column] = indicators[column]
+        
+        cache = self.indicator_cache
+        tf = self.timeframe
+        cache.put(pair, tf, RSI_14, dataframe, indicators['rsi'].to_numpy())
+        cache.put(pair, tf, MACD_12_26_9, dataframe, {
+            'macd': indicators['macd'].to_numpy(),
+            'macdsignal': indicators['macdsignal'].to_numpy(),
+            'macdhist': (indicators['macd'] - indicators['macdsignal']).to_numpy(),
+        })
+        cache.put(pair, tf, BBANDS_20_2, dataframe, {
+            'lower': indicators['bb_lowerband'].to_numpy(),
+            'mid': indicators['bb_middleband'].to_numpy(),
+            'upper': indicators['bb_upperband'].to_numpy(),
+        })
+        cache.put(pair, tf, EMA_8, dataframe, indicators['ema_fast'].to_numpy())
+        cache.put(pair, tf, EMA_21, dataframe, indicators['ema_slow'].to_numpy())
+        cache.put(pair, tf, VOLUME_MEAN_20, dataframe, indicators['volume_mean_20'].to_numpy())
+        cache.put(pair, tf, ATR_14, dataframe, indicators['atr'].to_numpy())
+    
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Entry signal logic combining ML prediction with technical filters
         """
+        rows = self._live_signal_rows(dataframe)
+        
+        # Live fast path: evaluate the rules on the newest candle(s) only
+        if rows:
+            conditions = self._entry_conditions(self._signal_tail(dataframe, self.ENTRY_COLUMNS, rows))
+            entries = reduce(lambda x, y: x & y, conditions)[-rows:]
+            dataframe.loc[dataframe.index[-rows:][entries], 'enter_long'] = 1
+            return dataframe
+        
+        # Hyperopt: masks were precomputed for every buy_rsi value
+        column = grid_column('enter_long', self.buy_rsi.value)
+        if self.buy_rsi_enabled and column in dataframe.columns:
+            dataframe.loc[dataframe[column], 'enter_long'] = 1
+            return dataframe
+        
+        conditions = self._entry_conditions(dataframe)
+        
+        # Combine all conditions
+        if conditions:
+            dataframe.loc[
+                reduce(lambda x, y: x & y, conditions),
+                'enter_long'] = 1
+        
+        return dataframe
+    
+    def _entry_conditions(self, frame, include_rsi=True) -> list:
+        """
+        Entry rules. `frame` is the full dataframe, or a dict of numpy arrays
+        holding the last rows in the live fast path. The signal grid leaves
+        out the buy_rsi comparison (include_rsi=False) and applies it per value.
+        """
         conditions = []
         
         # === ML PREDICTION (MOST IMPORTANT) ===
         # FreqAI must predict a buy signal (1) with high confidence
-        conditions.append(dataframe['do_predict'] == 1)
-        conditions.append(dataframe['DI_values'] > 0.5)  # Data quality check
+        conditions.append(frame['do_predict'] == 1)
+        conditions.append(frame['DI_values'] > 0.5)  # Data quality check
         
         # === TECHNICAL FILTERS (SAFETY CHECKS) ===
         
         # 1. Volume filter: Ensure sufficient liquidity
-        conditions.append(dataframe['volume'] > dataframe['volume_mean_20'] * 0.7)
+        conditions.append(frame['volume'] > frame['volume_mean_20'] * 0.7)
         
         # 2. RSI filter: Not overbought (if enabled)
-        if self.buy_rsi_enabled:
-            conditions.append(dataframe['rsi'] < self.buy_rsi.value)
+        if self.buy_rsi_enabled and include_rsi:
+            conditions.append(frame['rsi'] < self.buy_rsi.value)
         
         # 3. Trend filter: Price above fast EMA (uptrend)
-        conditions.append(dataframe['close'] > dataframe['ema_fast'])
+        conditions.append(frame['close'] > frame['ema_fast'])
         
         # 4. Spread check: BB width not too narrow (avoid low volatility)
         conditions.append(
-            (dataframe['bb_upperband'] - dataframe['bb_lowerband']) / dataframe['bb_middleband'] > 0.01
+            (frame['bb_upperband'] - frame['bb_lowerband']) / frame['bb_middleband'] > 0.01
         )
         
         # 5. Not at top of BB (avoid buying peaks)
-        conditions.append(dataframe['close'] < dataframe['bb_upperband'] * 0.98)
+        conditions.append(frame['close'] < frame['bb_upperband'] * 0.98)
         
-        # Combine all conditions
-        if conditions:
-            dataframe.loc[
-                reduce(lambda x, y: x & y, conditions),
-                'enter_long'] = 1
-        
-        return dataframe
+        return conditions
     
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Exit signal logic
         """
+        rows = self._live_signal_rows(dataframe)
+        column = grid_column('exit_long', self.sell_rsi.value)
+        
+        # Live fast path: evaluate the rules on the newest candle(s) only
+        if rows:
+            conditions = self._exit_conditions(self._signal_tail(dataframe, self.EXIT_COLUMNS, rows))
+            exits = reduce(lambda x, y: x | y, conditions)[-rows:]
+            dataframe.loc[dataframe.index[-rows:][exits], 'exit_long'] = 1
+        elif self.sell_rsi_enabled and column in dataframe.columns:
+            # Hyperopt: masks were precomputed for every sell_rsi value
+            dataframe.loc[dataframe[column], 'exit_long'] = 1
+        else:
+            conditions = self._exit_conditions(dataframe)
+            
+            # Combine with OR logic (exit on any signal)
+            if conditions:
+                dataframe.loc[
+                    reduce(lambda x, y: x | y, conditions),
+                    'exit_long'] = 1
+        
+        # Analysis is complete: publish the last candle for the order callbacks
+        if self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN) and len(dataframe) > 0:
+            self._candle_snapshots[metadata['pair']] = take_snapshot(dataframe)
+        
+        return dataframe
+    
+    def _exit_conditions(self, frame, include_rsi=True) -> list:
+        """
+        Exit rules. `frame` is the full dataframe, or a dict of numpy arrays
+        holding the last rows in the live fast path. The signal grid leaves
+        out the sell_rsi comparison (include_rsi=False) and applies it per value.
+        """
         conditions = []
         
         # === EXIT CONDITIONS ===
         
         # 1. ML says exit (model predicts downtrend)
-        conditions.append(dataframe['do_predict'] == 0)
+        conditions.append(frame['do_predict'] == 0)
         
         # 2. RSI overbought (if enabled)
-        if self.sell_rsi_enabled:
-            conditions.append(dataframe['rsi'] > self.sell_rsi.value)
+        if self.sell_rsi_enabled and include_rsi:
+            conditions.append(frame['rsi'] > self.sell_rsi.value)
         
         # 3. Price crossed below fast EMA (trend reversal)
-        conditions.append(qtpylib.crossed_below(dataframe['close'], dataframe['ema_fast']))
+        conditions.append(self._crossed_below(frame['close'], frame['ema_fast']))
         
         # 4. MACD bearish cross
-        conditions.append(qtpylib.crossed_below(dataframe['macd'], dataframe['macdsignal']))
+        conditions.append(self._crossed_below(frame['macd'], frame['macdsignal']))
         
-        # Combine with OR logic (exit on any signal)
-        if conditions:
-            dataframe.loc[
-                reduce(lambda x, y: x | y, conditions),
-                'exit_long'] = 1
+        return conditions
+    
+    @staticmethod
+    def _crossed_below(series1, series2):
+        """
+        qtpylib.crossed_below for Series, same rule on plain numpy arrays
+        """
+        if isinstance(series1, np.ndarray):
+            crossed = np.zeros(len(series1), dtype=bool)
+            crossed[1:] = (series1[1:] < series2[1:]) & (series1[:-1] >= series2[:-1])
+            return crossed
+        return qtpylib.crossed_below(series1, series2)
+    
+    def _live_signal_rows(self, dataframe: DataFrame) -> int:
+        """
+        Number of trailing rows to evaluate in the live fast path (0 = full vectors)
         
-        return dataframe
+        Only live/dry-run with process_only_new_candles acts on the newest
+        candle; backtesting and hyperopt always evaluate the full history.
+        """
+        if not self.process_only_new_candles or self.live_signal_rows < 1:
+            return 0
+        if self.dp.runmode not in (RunMode.LIVE, RunMode.DRY_RUN):
+            return 0
+        return min(self.live_signal_rows, len(dataframe))
+    
+    @staticmethod
+    def _signal_tail(dataframe: DataFrame, columns, rows: int) -> dict:
+        """
+        Last `rows` candles (plus one for crossover rules) as numpy arrays
+        """
+        start = max(len(dataframe) - rows - 1, 0)
+        return {column: dataframe[column].to_numpy()[start:] for column in columns}
+    
+    def _latest_candle(self, pair: str):
+        """
+        Snapshot of the last analyzed candle, or None when there is no data.
+        
+        Live/dry-run reads the snapshot published by populate_exit_trend. In
+        backtesting the analyzed dataframe is sliced per candle, so the
+        snapshot is built from the dataprovider instead.
+        """
+        snapshot = self._candle_snapshots.get(pair)
+        if snapshot is not None:
+            return snapshot
+        
+        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        if len(dataframe) < 1:
+            return None
+        return take_snapshot(dataframe)
     
     def custom_stake_amount(self, pair: str, current_time: datetime,
                            current_rate: float, proposed_stake: float,
@@ -340,15 +725,13 @@ class MLScalpingStrategy(IStrategy):
         Customize stake amount based on volatility.
         Lower stake in high volatility, higher in low volatility.
         """
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        current_candle = self._latest_candle(pair)
         
-        if len(dataframe) < 1:
+        if current_candle is None:
             return proposed_stake
         
-        current_candle = dataframe.iloc[-1]
-        
         # Get ATR (volatility measure)
-        atr = current_candle.get('atr', 0)
+        atr = current_candle.atr
         
         # If no ATR data, use proposed stake
         if atr == 0 or np.isnan(atr):
@@ -357,13 +740,11 @@ class MLScalpingStrategy(IStrategy):
         # Calculate ATR percentage
         atr_percent = (atr / current_rate) * 100
         
-        # Reduce stake if volatility is high (above 2%)
-        if atr_percent > 2.0:
-            return proposed_stake * 0.7  # 30% reduction
-        elif atr_percent > 1.5:
-            return proposed_stake * 0.85  # 15% reduction
-        else:
-            return proposed_stake
+        # Reduce stake if volatility is high (30% above 2%, 15% above 1.5%)
+        for above, factor in self.atr_stake_steps:
+            if atr_percent > above:
+                return proposed_stake * factor
+        return proposed_stake
     
     def confirm_trade_entry(self, pair: str, order_type: str, amount: float,
                            rate: float, time_in_force: str, current_time: datetime,
@@ -372,23 +753,21 @@ class MLScalpingStrategy(IStrategy):
         Final check before entering trade.
         Ensures ML confidence is above threshold.
         """
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        current_candle = self._latest_candle(pair)
         
-        if len(dataframe) < 1:
+        if current_candle is None:
             return False
         
-        current_candle = dataframe.iloc[-1]
-        
         # Check DI_values (data quality metric from FreqAI)
-        di_value = current_candle.get('DI_values', 0)
+        di_value = current_candle.di_values
         
         # Only enter if data quality is good
         if di_value < 0.5:
             return False
         
         # Additional safety: Don't trade if volume is suspiciously low
-        volume = current_candle.get('volume', 0)
-        volume_mean = current_candle.get('volume_mean_20', 1)
+        volume = current_candle.volume
+        volume_mean = current_candle.volume_mean_20
         
         if volume < volume_mean * 0.5:
             return False
@@ -408,7 +787,7 @@ class MLScalpingStrategy(IStrategy):
         # For other exits, check if we've held for minimum time (5 minutes)
         if trade.open_date_utc:
             trade_duration = (current_time - trade.open_date_utc).total_seconds() / 60
-            if trade_duration < 5:
+            if trade_duration < self.min_exit_signal_minutes:
                 return False  # Don't exit too quickly
         
         return True
@@ -0,0 +1,16 @@
+"""
+Helpers for MLScalpingStrategy
+==============================
+
+Support code imported by MLScalpingStrategy.py. Freqtrade only loads strategy
+classes from the *.py files directly inside user_data/strategies, so keeping
+the helpers in this package stops them from being scanned as strategies.
+"""
+
+from mlscalping.incremental import IncrementalIndicatorEngine
+from mlscalping.indicator_cache import IndicatorCache
+
+__all__ = [
+    'IncrementalIndicatorEngine',
+    'IndicatorCache',
+]
@@ -0,0 +1,192 @@
+"""
+Day-Block Feature Cache
+=======================
+
+Persistent cache of engineered feature blocks for training and backtesting.
+
+Consecutive FreqAI training windows overlap almost completely (30 training
+days, moved forward 7 days at a time), yet every window rebuilt its feature
+matrix from raw candles. This cache stores the features one complete UTC
+day at a time, keyed by pair, timeframe, feature-spec hash and day, as raw
+float64 .npy blocks (one row per candle, one column per feature). A new
+window loads the days it already knows and only computes the rest.
+
+Features of recursive indicators (EMAs, Wilder smoothing) depend on how
+much history preceded them, so a day is only stored once at least
+`warmup` candles of history were available when it was computed, and
+missing days are computed with the same warmup prefix. For the same
+reason cached days are never served for the first `warmup` rows of a
+window: a cold compute has NaN or unconverged values there, and so does
+the cache, whatever earlier windows left on disk. Past the warmup, cached
+and computed rows agree to the convergence of the indicators. Cumulative
+features (OBV, A/D) depend on where the window starts and are always
+recomputed over the full window.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame
+
+from mlscalping.incremental import _timeframe_to_ns
+
+
+DAY_NS = 86_400 * 1_000_000_000
+
+
+def feature_spec_hash(*parts):
+    """
+    Short hash identifying a feature definition.
+
+    Functions contribute their source code, anything else its repr, so
+    editing the feature code or its parameters starts a fresh cache.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        text = inspect.getsource(part) if callable(part) else repr(part)
+        digest.update(text.encode())
+    return digest.hexdigest()[:16]
+
+
+class DayBlockCache:
+    """Feature blocks on disk, one file per (pair, timeframe, spec, day)"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.day_hits = 0
+        self.day_misses = 0
+        self.days_stored = 0
+
+    def _spec_dir(self, pair, timeframe, spec_hash):
+        return self.root / timeframe / pair.replace('/', '_').replace(':', '_') / spec_hash
+
+    def _schema(self, spec_dir):
+        path = spec_dir / 'columns.json'
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def load_days(self, pair, timeframe, spec_hash, days):
+        """Return ({day: block}, schema) for the requested days found on disk"""
+        spec_dir = self._spec_dir(pair, timeframe, spec_hash)
+        schema = self._schema(spec_dir)
+        if schema is None:
+            return {}, None
+
+        blocks = {}
+        for day in days:
+            path = spec_dir / f"{day}.npy"
+            if path.exists():
+                blocks[day] = np.load(path, mmap_mode='r')
+        return blocks, schema
+
+    def store_days(self, pair, timeframe, spec_hash, blocks, columns, dtypes):
+        """Write {day: block} atomically (temp file + rename)"""
+        if not blocks:
+            return
+        spec_dir = self._spec_dir(pair, timeframe, spec_hash)
+        spec_dir.mkdir(parents=True, exist_ok=True)
+        schema_path = spec_dir / 'columns.json'
+        if not schema_path.exists():
+            tmp = schema_path.with_name(f"columns.json.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({'columns': columns, 'dtypes': dtypes}))
+            os.replace(tmp, schema_path)
+
+        for day, block in blocks.items():
+            tmp = spec_dir / f"{day}.{os.getpid()}.tmp.npy"
+            np.save(tmp, np.ascontiguousarray(block, dtype='float64'))
+            os.replace(tmp, spec_dir / f"{day}.npy")
+        with self._lock:
+            self.days_stored += len(blocks)
+
+    def features(self, pair, timeframe, spec_hash, dataframe: DataFrame,
+                 compute, warmup, recompute=None) -> DataFrame:
+        """
+        Features for `dataframe`, assembled from cached days where possible.
+
+        `compute(frame)` builds the features for a slice of `dataframe`
+        (indexed like the slice). `recompute(dataframe)` returns the columns
+        that must always be computed over the whole window (cumulative
+        features).
+        """
+        length = len(dataframe)
+        dates = dataframe['date'].values.astype('datetime64[ns]').view('int64')
+        candles_per_day = DAY_NS // _timeframe_to_ns(timeframe)
+
+        # Row ranges of each UTC day; only complete days are cached
+        day_ids = dates // DAY_NS
+        starts = np.r_[0, np.flatnonzero(np.diff(day_ids)) + 1]
+        ends = np.r_[starts[1:], length]
+        days = [(str(np.datetime64(int(day_ids[start]), 'D')), start, end)
+                for start, end in zip(starts, ends) if end - start == candles_per_day]
+
+        blocks, schema = self.load_days(pair, timeframe, spec_hash, [day for day, _, _ in days])
+
+        # Use cached days from the first complete day past the warmup up to
+        # the first gap. Features are causal, so the rows in front are
+        # computed on their own, exactly like a cold compute of the window.
+        lead = next((start for _, start, _ in days if start >= warmup), length)
+        first_missing = lead
+        for day, start, end in days:
+            if start < lead:
+                continue
+            if start != first_missing or day not in blocks:
+                break
+            first_missing = end
+        if first_missing == lead:
+            first_missing = 0
+        hits = sum(1 for _, start, _ in days if lead <= start < first_missing)
+        with self._lock:
+            self.day_hits += hits
+            self.day_misses += len(days) - hits
+
+        parts = []
+        if first_missing and lead:
+            parts.append(compute(dataframe.iloc[:lead]).to_numpy(dtype='float64'))
+        parts.extend(blocks[day] for day, start, _ in days if lead <= start < first_missing)
+
+        if first_missing == length:
+            columns, dtypes = schema['columns'], schema['dtypes']
+        else:
+            compute_from = max(0, first_missing - warmup)
+            computed = compute(dataframe.iloc[compute_from:])
+            columns = list(computed.columns)
+            dtypes = [str(dtype) for dtype in computed.dtypes]
+            if schema is not None and schema['columns'] != columns:
+                # Stale schema under the same spec hash: never mix the two
+                return compute(dataframe)
+
+            computed_values = computed.to_numpy(dtype='float64')
+            parts.append(computed_values[first_missing - compute_from:])
+
+            # Store the complete days that had enough history before them
+            self.store_days(pair, timeframe, spec_hash, {
+                day: computed_values[start - compute_from:end - compute_from]
+                for day, start, end in days
+                if start >= first_missing and start - compute_from >= warmup and day not in blocks
+            }, columns, dtypes)
+
+        values = np.concatenate(parts) if len(parts) > 1 else np.array(parts[0])
+        features = DataFrame(values, index=dataframe.index, columns=columns)
+        features = features.astype(dict(zip(columns, dtypes)))
+
+        if recompute is not None:
+            for column, column_values in recompute(dataframe).items():
+                features[column] = column_values
+        return features
+
+    def stats(self):
+        with self._lock:
+            lookups = self.day_hits + self.day_misses
+            return {
+                'day_hits': self.day_hits,
+                'day_misses': self.day_misses,
+                'hit_rate': round(self.day_hits / lookups, 3) if lookups else 0.0,
+                'days_stored': self.days_stored,
+            }
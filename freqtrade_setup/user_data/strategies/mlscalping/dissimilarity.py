@@ -0,0 +1,121 @@
+"""
+Indexed Dissimilarity Index
+===========================
+
+Drop-in replacement for FreqAI's dissimilarity index step ("di"), which
+produces the DI_values used by the strategy's entry gates.
+
+DI for a prediction row is its distance to the nearest training row,
+divided by the mean pairwise distance of the training set. datasieve
+computes both by brute force: an n x n distance matrix at fit time and a
+full scan of the training set for every prediction.
+
+This version:
+
+- estimates the mean pairwise distance and the principal axes on a random
+  subsample of at most `mean_samples` rows (exact when the training set is
+  smaller)
+- builds a KD-tree once per trained model, over the leading principal
+  components of the training features (enough to explain `variance`,
+  at most `max_components`)
+- per prediction row, takes the `candidates` nearest training rows in that
+  reduced space and returns the smallest exact distance among them
+
+The candidate distances are exact, so a DI value is never lower than the
+brute-force one: when the true nearest row is missed, DI comes out higher
+and the row is treated as more unusual, not less.
+"""
+
+import logging
+
+import numpy as np
+from datasieve.transforms import DissimilarityIndex
+from datasieve.utils import remove_outliers
+from sklearn.metrics.pairwise import pairwise_distances
+from sklearn.neighbors import KDTree
+
+
+logger = logging.getLogger(__name__)
+
+
+def _subsample(X, max_samples, seed):
+    if not max_samples or len(X) <= max_samples:
+        return X
+    rows = np.random.default_rng(seed).choice(len(X), size=max_samples, replace=False)
+    return X[np.sort(rows)]
+
+
+def mean_pairwise_distance(X, max_samples=None, seed=42):
+    """Mean distance between distinct rows, on at most `max_samples` random rows"""
+    X = _subsample(np.asarray(X), max_samples, seed)
+    n = len(X)
+    if n < 2:
+        return 0.0
+    # The diagonal is zero, so the plain sum only covers distinct pairs
+    return float(pairwise_distances(X).sum() / (n * (n - 1)))
+
+
+class IndexedDissimilarityIndex(DissimilarityIndex):
+    """DissimilarityIndex answering nearest-row queries from a prebuilt index"""
+
+    def __init__(self, di_threshold: float = 1, n_jobs=-1, backend="loky",
+                 variance=0.99, max_components=16, candidates=10, mean_samples=4000,
+                 leaf_size=40, chunk_size=1024, seed=42, **kwargs):
+        super().__init__(di_threshold=di_threshold, n_jobs=n_jobs, backend=backend)
+        self.variance = variance
+        self.max_components = max_components
+        self.candidates = candidates
+        self.mean_samples = mean_samples
+        self.leaf_size = leaf_size
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.center = None
+        self.components = None
+        self.tree = None
+
+    def fit(self, X, y=None, sample_weight=None, feature_list=None, **kwargs):
+        values = np.asarray(X, dtype='float64')
+        sample = _subsample(values, self.mean_samples, self.seed)
+        self.avg_mean_dist = mean_pairwise_distance(sample)
+        self.trained_data = values
+
+        # Principal axes from the SVD of the centred sample
+        self.center = sample.mean(axis=0)
+        _, singular, vt = np.linalg.svd(sample - self.center, full_matrices=False)
+        explained = np.cumsum(singular ** 2) / max(np.sum(singular ** 2), np.finfo(float).tiny)
+        n_components = int(np.searchsorted(explained, self.variance) + 1)
+        self.components = vt[:min(n_components, self.max_components, len(vt))]
+        self.tree = KDTree(self._project(values), leaf_size=self.leaf_size)
+        return X, y, sample_weight, feature_list
+
+    def _project(self, X):
+        return (X - self.center) @ self.components.T
+
+    def nearest_distances(self, X):
+        """Distance from each row of X to its nearest training row"""
+        values = np.asarray(X, dtype='float64')
+        k = min(self.candidates, len(self.trained_data))
+        distances = np.empty(len(values))
+        for start in range(0, len(values), self.chunk_size):
+            chunk = values[start:start + self.chunk_size]
+            idx = self.tree.query(self._project(chunk), k=k, return_distance=False)
+            diff = self.trained_data[idx] - chunk[:, None, :]
+            distances[start:start + len(chunk)] = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff).min(axis=1))
+        return distances
+
+    def transform(self, X, y=None, sample_weight=None,
+                  feature_list=None, outlier_check=False, **kwargs):
+        self.di_values = self.nearest_distances(X) / self.avg_mean_dist
+        y_pred = np.where(self.di_values < self.di_threshold, 1, 0)
+
+        if not outlier_check:
+            X, y, sample_weight = remove_outliers(X, y, sample_weight, y_pred)
+        else:
+            y += y_pred
+            y -= 1
+
+        num_tossed = len(y_pred) - len(X)
+        if num_tossed > 0:
+            logger.info(f"DI tossed {num_tossed} predictions for being too far from training data.")
+
+        return X, y, sample_weight, feature_list
@@ -0,0 +1,81 @@
+"""
+Compact Feature Store
+=====================
+
+Stores FreqAI's engineered `%-` feature columns in a compact columnar layout.
+
+The merged feature frame (about 40 features x 3 timeframes x shifted candles x
+corr pairs) is all float64 by default. compact_features() packs the features
+into one contiguous float32 block. Integer-valued features (candle patterns,
+EMA cross flags) go into an int8 block. That roughly halves the memory held
+per pair. Non-feature columns (date, OHLCV, `&-` targets, ...) keep their
+dtype.
+
+The compact dtypes are for holding the frames only. float64_features()
+widens the features back before FreqAI's pipeline and model see them: its
+scaler, SVM and DI steps run in the input dtype, and in float32 they flag
+other rows as outliers than in float64.
+"""
+
+import numpy as np
+from pandas import DataFrame, concat
+
+
+# Features that only take small integer values (TA-Lib CDL* returns -100/0/100)
+INT8_FEATURES = ('%-cdl_', '%-ema_cross')
+
+
+def _fits_int8(values):
+    if not np.isfinite(values).all():
+        return False
+    if values.size and (values.min() < -128 or values.max() > 127):
+        return False
+    return bool((values == np.round(values)).all())
+
+
+def feature_bytes(dataframe: DataFrame):
+    """Memory held by the `%-` feature columns of a dataframe"""
+    columns = [c for c in dataframe.columns if c.startswith('%-')]
+    return int(dataframe[columns].memory_usage(index=False).sum()) if columns else 0
+
+
+def compact_features(dataframe: DataFrame):
+    """
+    Return (compacted dataframe, report).
+
+    Column order is preserved so FreqAI's feature list is unaffected. The
+    report holds the feature count and the bytes before and after.
+    """
+    features = [c for c in dataframe.columns if c.startswith('%-')]
+    report = {'features': len(features), 'rows': len(dataframe), 'bytes_before': feature_bytes(dataframe)}
+
+    int_columns, float_columns = [], []
+    for column in features:
+        if any(marker in column for marker in INT8_FEATURES) and \
+                _fits_int8(dataframe[column].to_numpy(dtype='float64')):
+            int_columns.append(column)
+        else:
+            float_columns.append(column)
+
+    # One 2-D buffer per dtype; Fortran order so each feature is contiguous
+    blocks = [dataframe[[c for c in dataframe.columns if not c.startswith('%-')]]]
+    if float_columns:
+        buffer = np.asfortranarray(dataframe[float_columns].to_numpy(dtype='float32'))
+        blocks.append(DataFrame(buffer, columns=float_columns, index=dataframe.index, copy=False))
+    if int_columns:
+        buffer = np.asfortranarray(dataframe[int_columns].to_numpy(dtype='int8'))
+        blocks.append(DataFrame(buffer, columns=int_columns, index=dataframe.index, copy=False))
+
+    compacted = concat(blocks, axis=1)[list(dataframe.columns)]
+    report['bytes_after'] = feature_bytes(compacted)
+    return compacted, report
+
+
+def float64_features(dataframe: DataFrame):
+    """
+    Dataframe with the `%-` feature columns as float64 (a copy), or the
+    dataframe itself when they already are
+    """
+    narrow = {c: 'float64' for c, dtype in dataframe.dtypes.items()
+              if c.startswith('%-') and dtype != np.float64}
+    return dataframe.astype(narrow) if narrow else dataframe
@@ -0,0 +1,338 @@
+"""
+Incremental Indicators
+======================
+
+Streaming versions of the indicators used by MLScalpingStrategy.populate_indicators.
+
+Each indicator keeps its running state and is updated one closed candle at a
+time in O(1), instead of re-running TA-Lib over the whole dataframe every
+cycle. The recurrences (and their SMA seeding) follow TA-Lib, so a stream that
+is replayed from the first candle reproduces the full recompute to float
+tolerance.
+
+State is kept per (pair, timeframe). When the incoming dataframe does not
+continue the stored history (bot restart, missing candles, data reload) the
+stream is rebuilt from scratch by replaying the whole dataframe.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+from pandas import DataFrame
+
+
+# Columns produced by the engine, in populate_indicators order
+INDICATOR_COLUMNS = [
+    'rsi', 'macd', 'macdsignal',
+    'bb_lowerband', 'bb_middleband', 'bb_upperband',
+    'ema_fast', 'ema_slow', 'volume_mean_20', 'atr',
+]
+
+
+def _timeframe_to_ns(timeframe):
+    """Convert a freqtrade timeframe string ('5m', '1h', ...) to nanoseconds"""
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    return int(timeframe[:-1]) * units[timeframe[-1]] * 1_000_000_000
+
+
+class EMA:
+    """Exponential moving average, seeded with the SMA of the first `period` values"""
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.value = math.nan
+        self._seed = []
+
+    def update(self, x):
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = None
+            return self.value
+
+        self.value = (x - self.value) * self.k + self.value
+        return self.value
+
+
+class WilderRSI:
+    """Relative Strength Index with Wilder smoothing of gains and losses"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self._prev = None
+        self._count = 0
+
+    def update(self, x):
+        if self._prev is None:
+            self._prev = x
+            return math.nan
+
+        change = x - self._prev
+        self._prev = x
+        self._count += 1
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self._count < self.period:
+            self.avg_gain += gain
+            self.avg_loss += loss
+            return math.nan
+
+        if self._count == self.period:
+            self.avg_gain = (self.avg_gain + gain) / self.period
+            self.avg_loss = (self.avg_loss + loss) / self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        total = self.avg_gain + self.avg_loss
+        if -1e-8 < total < 1e-8:
+            return 0.0
+        return 100.0 * (self.avg_gain / total)
+
+
+class ATR:
+    """Average True Range with Wilder smoothing"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.value = math.nan
+        self._prev_close = None
+        self._seed = []
+
+    def update(self, high, low, close):
+        if self._prev_close is None:
+            self._prev_close = close
+            return math.nan
+
+        true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+
+        if self._seed is not None:
+            self._seed.append(true_range)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = None
+            return self.value
+
+        self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+
+class MACD:
+    """
+    MACD line, signal and histogram.
+
+    Like TA-Lib, the fast EMA is seeded so that it starts on the same candle as
+    the slow EMA, and nothing is emitted until the signal line exists.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self._fast_start = slow - fast
+        self._count = 0
+
+    def update(self, x):
+        index = self._count
+        self._count += 1
+
+        slow = self.slow.update(x)
+        if index < self._fast_start:
+            return math.nan, math.nan, math.nan
+        fast = self.fast.update(x)
+        if math.isnan(slow):
+            return math.nan, math.nan, math.nan
+
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return math.nan, math.nan, math.nan
+        return macd, signal, macd - signal
+
+
+class RollingMeanStd:
+    """
+    Rolling mean and sample standard deviation over a fixed window.
+
+    Uses a sliding Welford update, so each candle costs O(1) regardless of the
+    window length. `min_periods` mirrors the pandas rolling argument.
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x):
+        self._values.append(x)
+        n = len(self._values)
+
+        if n > self.window:
+            old = self._values.popleft()
+            n -= 1
+            old_mean = self._mean
+            self._mean += (x - old) / n
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+        else:
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+
+        if n < self.min_periods:
+            return math.nan, math.nan
+        std = math.sqrt(max(self._m2, 0.0) / (n - 1)) if n > 1 else math.nan
+        return self._mean, std
+
+
+class IndicatorStream:
+    """Running indicator state and output history for one (pair, timeframe)"""
+
+    def __init__(self):
+        self.rsi = WilderRSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = RollingMeanStd(20, min_periods=1)
+        self.ema_fast = EMA(8)
+        self.ema_slow = EMA(21)
+        self.volume_mean = RollingMeanStd(20)
+        self.atr = ATR(14)
+
+        self.dates = np.empty(0, dtype='int64')
+        self.values = np.empty((0, len(INDICATOR_COLUMNS)))
+        self._size = 0
+
+    @property
+    def last_date(self):
+        return self.dates[self._size - 1] if self._size else None
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self.dates):
+            return
+        capacity = max(needed, 2 * len(self.dates), 256)
+        dates = np.empty(capacity, dtype='int64')
+        values = np.empty((capacity, len(INDICATOR_COLUMNS)))
+        dates[:self._size] = self.dates[:self._size]
+        values[:self._size] = self.values[:self._size]
+        self.dates, self.values = dates, values
+
+    def push(self, dates, high, low, close, volume):
+        """Feed closed candles (plain arrays) through every indicator"""
+        self._reserve(len(dates))
+        for i in range(len(dates)):
+            c = close[i]
+            macd, macdsignal, _ = self.macd.update(c)
+            bb_mid, bb_std = self.bollinger.update(c)
+            volume_mean, _ = self.volume_mean.update(volume[i])
+
+            row = self.values[self._size]
+            row[0] = self.rsi.update(c)
+            row[1] = macd
+            row[2] = macdsignal
+            row[3] = bb_mid - 2 * bb_std
+            row[4] = bb_mid
+            row[5] = bb_mid + 2 * bb_std
+            row[6] = self.ema_fast.update(c)
+            row[7] = self.ema_slow.update(c)
+            row[8] = volume_mean
+            row[9] = self.atr.update(high[i], low[i], c)
+            self.dates[self._size] = dates[i]
+            self._size += 1
+
+    def trim(self, keep):
+        """Drop stored history older than the last `keep` candles"""
+        if self._size <= 2 * keep:
+            return
+        start = self._size - keep
+        self.dates[:keep] = self.dates[start:self._size]
+        self.values[:keep] = self.values[start:self._size]
+        self._size = keep
+
+    def window(self, dates):
+        """Return stored values for exactly `dates`, or None if not covered"""
+        start = int(np.searchsorted(self.dates[:self._size], dates[0]))
+        end = start + len(dates)
+        if end > self._size or not np.array_equal(self.dates[start:end], dates):
+            return None
+        return self.values[start:end]
+
+
+class IncrementalIndicatorEngine:
+    """
+    Keeps one IndicatorStream per (pair, timeframe).
+
+    update() appends only the candles that closed since the previous call and
+    falls back to a full replay whenever the dataframe does not continue the
+    stored history.
+    """
+
+    def __init__(self):
+        self._streams = {}
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+
+    def reset(self, pair=None):
+        """Forget stored state for one pair (or every pair)"""
+        if pair is None:
+            self._streams.clear()
+        else:
+            for key in [k for k in self._streams if k[0] == pair]:
+                del self._streams[key]
+
+    def update(self, pair, timeframe, dataframe: DataFrame) -> DataFrame:
+        """Return the indicator columns for `dataframe`, indexed like it"""
+        dates = dataframe['date'].values.astype('datetime64[ns]').view('int64')
+        key = (pair, timeframe)
+        stream = self._streams.get(key)
+
+        values = None
+        if stream is not None and stream.last_date is not None:
+            values = self._extend(stream, dates, dataframe, _timeframe_to_ns(timeframe))
+
+        if values is None:
+            stream = IndicatorStream()
+            stream.push(
+                dates,
+                dataframe['high'].to_numpy(dtype='float64'),
+                dataframe['low'].to_numpy(dtype='float64'),
+                dataframe['close'].to_numpy(dtype='float64'),
+                dataframe['volume'].to_numpy(dtype='float64'),
+            )
+            self._streams[key] = stream
+            self.full_recomputes += 1
+            values = stream.window(dates)
+        else:
+            self.incremental_updates += 1
+
+        result = DataFrame(values.copy(), columns=INDICATOR_COLUMNS, index=dataframe.index)
+        stream.trim(len(dates))
+        return result
+
+    def _extend(self, stream, dates, dataframe, timeframe_ns):
+        position = int(np.searchsorted(dates, stream.last_date))
+        if position >= len(dates) or dates[position] != stream.last_date:
+            return None
+
+        start = position + 1
+        new_dates = dates[start:]
+        if len(new_dates):
+            steps = np.diff(dates[position:])
+            if not (steps == timeframe_ns).all():
+                return None
+            stream.push(
+                new_dates,
+                dataframe['high'].to_numpy(dtype='float64')[start:],
+                dataframe['low'].to_numpy(dtype='float64')[start:],
+                dataframe['close'].to_numpy(dtype='float64')[start:],
+                dataframe['volume'].to_numpy(dtype='float64')[start:],
+            )
+
+        return stream.window(dates)
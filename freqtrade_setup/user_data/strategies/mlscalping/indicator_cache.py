@@ -0,0 +1,185 @@
+"""
+Indicator Cache
+===============
+
+Per-candle cache for the indicators that both populate_indicators and the
+FreqAI feature engineering methods need (RSI, MACD, Bollinger Bands, EMAs,
+ATR, volume mean).
+
+Entries are keyed by (pair, timeframe, indicator spec) and tagged with the
+candle window they were computed on (first candle, last candle, row count).
+A lookup only hits when the window matches exactly, so each indicator is
+computed once per new candle no matter how many code paths ask for it.
+Seeded indicators such as EMAs depend on where the window starts, which is
+why the row count is part of the window and not just the last timestamp.
+
+Besides the named indicator specs, get() accepts any callable, which is how
+the strategy memoizes whole feature blocks.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import talib.abstract as ta
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+from pandas import DataFrame
+
+
+# Indicators shared between populate_indicators and feature engineering
+RSI_14 = ('rsi', 14)
+MACD_12_26_9 = ('macd', 12, 26, 9)
+BBANDS_20_2 = ('bbands', 20, 2)
+EMA_8 = ('ema', 8)
+EMA_21 = ('ema', 21)
+ATR_14 = ('atr', 14)
+VOLUME_MEAN_20 = ('volume_mean', 20)
+
+
+def compute_indicator(dataframe: DataFrame, spec):
+    """
+    Compute one indicator spec on a dataframe.
+
+    Returns a numpy array, or a dict of numpy arrays for multi-output
+    indicators (MACD, Bollinger Bands).
+    """
+    name = spec[0]
+
+    if name == 'rsi':
+        return ta.RSI(dataframe, timeperiod=spec[1]).to_numpy()
+    if name == 'ema':
+        return ta.EMA(dataframe, timeperiod=spec[1]).to_numpy()
+    if name == 'atr':
+        return ta.ATR(dataframe, timeperiod=spec[1]).to_numpy()
+    if name == 'volume_mean':
+        return dataframe['volume'].rolling(window=spec[1]).mean().to_numpy()
+    if name == 'macd':
+        macd = ta.MACD(dataframe, fastperiod=spec[1], slowperiod=spec[2], signalperiod=spec[3])
+        return {
+            'macd': macd['macd'].to_numpy(),
+            'macdsignal': macd['macdsignal'].to_numpy(),
+            'macdhist': macd['macdhist'].to_numpy(),
+        }
+    if name == 'bbands':
+        bollinger = qtpylib.bollinger_bands(dataframe['close'], window=spec[1], stds=spec[2])
+        return {
+            'lower': bollinger['lower'].to_numpy(),
+            'mid': bollinger['mid'].to_numpy(),
+            'upper': bollinger['upper'].to_numpy(),
+        }
+
+    raise ValueError(f"Unknown indicator spec: {spec}")
+
+
+def candle_window(dataframe: DataFrame):
+    """Identify the candle window a dataframe covers"""
+    dates = dataframe['date']
+    if len(dates) == 0:
+        return (None, None, 0)
+    return (dates.iloc[0], dates.iloc[-1], len(dates))
+
+
+class IndicatorCache:
+    """
+    Indicator values for the latest candle windows of each (pair, timeframe).
+
+    At most `windows_per_key` windows are kept per (pair, timeframe, spec),
+    least recently used first out. Two is enough for the live prediction
+    window and a retrain window (FreqAI trains in a background thread) to
+    stop evicting each other, while keeping memory bounded by
+    pairs x timeframes x specs. Call evict_pairs() when the pairlist changes
+    to drop pairs that are no longer traded.
+    """
+
+    def __init__(self, windows_per_key=2):
+        self.windows_per_key = windows_per_key
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0, 'compute_seconds': 0.0, 'saved_seconds': 0.0})
+
+    def get(self, pair, timeframe, spec, dataframe: DataFrame, compute=None):
+        """
+        Return the cached value for this window, computing it on a miss.
+
+        `compute` is an optional zero-argument callable used instead of the
+        built-in indicator for `spec`.
+        """
+        key = (pair, timeframe, spec)
+        window = candle_window(dataframe)
+        counters = self._counters[spec[0]]
+
+        with self._lock:
+            windows = self._entries.get(key)
+            if windows is not None and window in windows:
+                windows.move_to_end(window)
+                value, elapsed = windows[window]
+                counters['hits'] += 1
+                counters['saved_seconds'] += elapsed
+                return value
+
+        start = time.perf_counter()
+        value = compute() if compute is not None else compute_indicator(dataframe, spec)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            counters['misses'] += 1
+            counters['compute_seconds'] += elapsed
+            self._store(key, window, value, elapsed)
+        return value
+
+    def put(self, pair, timeframe, spec, dataframe: DataFrame, value, window=None):
+        """
+        Store a value computed elsewhere (e.g. by the incremental engine).
+
+        `window` can be passed when the caller already knows candle_window(dataframe).
+        """
+        if window is None:
+            window = candle_window(dataframe)
+        with self._lock:
+            self._store((pair, timeframe, spec), window, value, 0.0)
+
+    def _store(self, key, window, value, elapsed):
+        windows = self._entries.setdefault(key, OrderedDict())
+        windows[window] = (value, elapsed)
+        windows.move_to_end(window)
+        while len(windows) > self.windows_per_key:
+            windows.popitem(last=False)
+
+    def evict_pairs(self, keep_pairs):
+        """Drop every entry whose pair is not in `keep_pairs`; returns the count"""
+        keep_pairs = set(keep_pairs)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] not in keep_pairs]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self, spec_name=None):
+        """
+        Hit/miss counters for logging, for all specs or one spec name.
+
+        `saved_seconds` adds up the original compute time of every hit, i.e.
+        the wall time that recomputing would have cost.
+        """
+        with self._lock:
+            names = [spec_name] if spec_name is not None else list(self._counters)
+            hits = sum(self._counters[name]['hits'] for name in names)
+            misses = sum(self._counters[name]['misses'] for name in names)
+            spent = sum(self._counters[name]['compute_seconds'] for name in names)
+            saved = sum(self._counters[name]['saved_seconds'] for name in names)
+            entries = sum(len(windows) for key, windows in self._entries.items()
+                          if spec_name is None or key[2][0] == spec_name)
+
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'entries': entries,
+            'compute_seconds': round(spent, 3),
+            'saved_seconds': round(saved, 3),
+        }
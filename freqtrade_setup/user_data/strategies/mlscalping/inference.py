@@ -0,0 +1,75 @@
+"""
+Inference Latency
+=================
+
+Per-candle prediction time of the LightGBMScalpingClassifier FreqAI model.
+
+Predictions are not batched across pairs: FreqAI trains one booster per
+pair under the ml_scalping_model identifier and calls predict() for each
+pair from that pair's populate_indicators, so the newest rows of two pairs
+never share a model or a call. What grows with the pairlist is the sum of
+those per-pair calls. InferenceLatency collects the per-pair prediction
+time of each live candle and compares the per-candle total against the
+process_throttle_secs budget, so a growing pairlist shows up in the logs
+before it delays the bot loop.
+"""
+
+import logging
+import math
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceLatency:
+    """
+    Per-candle inference time across all pairs.
+
+    record() is called once per pair prediction. A candle is closed out when
+    the first prediction for the next candle arrives; totals above
+    `warn_fraction` of the budget are logged as warnings right away.
+    """
+
+    def __init__(self, budget_seconds, warn_fraction=0.5, history=288):
+        self.budget_seconds = budget_seconds
+        self.warn_fraction = warn_fraction
+        self._candle = None
+        self._current = {}
+        self._totals = deque(maxlen=history)
+        self._pairs = deque(maxlen=history)
+
+    def record(self, candle, pair, seconds):
+        if candle != self._candle:
+            self._finish_candle()
+            self._candle = candle
+        self._current[pair] = self._current.get(pair, 0.0) + seconds
+
+    def _finish_candle(self):
+        if not self._current:
+            return
+        total = sum(self._current.values())
+        self._totals.append(total)
+        self._pairs.append(len(self._current))
+        if total > self.budget_seconds * self.warn_fraction:
+            slowest = max(self._current, key=self._current.get)
+            logger.warning(f"Inference for candle {self._candle} took {total:.2f}s over "
+                           f"{len(self._current)} pairs ({total / self.budget_seconds:.0%} of the "
+                           f"{self.budget_seconds}s process_throttle_secs budget, slowest {slowest} "
+                           f"{self._current[slowest] * 1000:.0f}ms)")
+        self._current = {}
+
+    def summary(self):
+        """Latency statistics over the finished candles kept in the history"""
+        if not self._totals:
+            return None
+        totals = sorted(self._totals)
+        p95 = totals[min(len(totals) - 1, math.ceil(0.95 * len(totals)) - 1)]
+        return {
+            'candles': len(totals),
+            'pairs': self._pairs[-1],
+            'mean_ms': round(1000 * sum(totals) / len(totals), 1),
+            'p95_ms': round(1000 * p95, 1),
+            'max_ms': round(1000 * totals[-1], 1),
+            'budget_used': round(p95 / self.budget_seconds, 3),
+        }
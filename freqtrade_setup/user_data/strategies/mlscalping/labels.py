@@ -0,0 +1,71 @@
+"""
+Forward-Window Labels
+=====================
+
+Label kernels for set_freqai_targets.
+
+forward_max()/forward_min() return, for every candle, the extreme close of
+the next `horizon` candles. They use the van Herk / Gil-Werman algorithm:
+the series is cut into blocks of `horizon` values, and prefix/suffix running
+maxima inside each block give any window's maximum with one comparison. That
+is O(n) per horizon, fully vectorized, and needs no intermediate pandas
+Series.
+"""
+
+import numpy as np
+
+
+def _sliding_extreme(values, window, combine, fill):
+    """out[j] = combine-reduction of values[j:j + window] for j in 0..n-window"""
+    n = len(values)
+    padded = np.concatenate([values, np.full((-n) % window, fill)])
+    blocks = padded.reshape(-1, window)
+    prefix = combine.accumulate(blocks, axis=1).ravel()
+    suffix = combine.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # Both scans only cover values inside the window, so a NaN in the
+    # window (and only there) propagates to the result, like pandas rolling
+    return combine(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def _forward(values, horizon, combine, fill):
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    if horizon < 1 or len(values) <= horizon:
+        return out
+    # Window for candle i covers i+1 .. i+horizon
+    out[:len(values) - horizon] = _sliding_extreme(values, horizon, combine, fill)[1:]
+    return out
+
+
+def forward_max(values, horizon):
+    """Highest value of the next `horizon` candles (NaN where the window runs off the end)"""
+    return _forward(values, horizon, np.maximum, -np.inf)
+
+
+def forward_min(values, horizon):
+    """Lowest value of the next `horizon` candles (NaN where the window runs off the end)"""
+    return _forward(values, horizon, np.minimum, np.inf)
+
+
+def forward_return_labels(close, horizons, thresholds):
+    """
+    Binary "price rises by at least threshold within horizon" labels.
+
+    Returns {(horizon, threshold): int array} together with the forward max
+    per horizon, so one call covers a whole horizon x threshold grid. Candles
+    whose window runs off the end of the data are labelled 0, like the
+    original pandas comparison against NaN.
+    """
+    close = np.asarray(close, dtype='float64')
+    thresholds = np.asarray(thresholds, dtype='float64')
+
+    maxima = {}
+    labels = {}
+    for horizon in horizons:
+        future_max = forward_max(close, horizon)
+        maxima[horizon] = future_max
+        with np.errstate(invalid='ignore'):
+            hits = (future_max / close)[:, None] > (1.0 + thresholds)[None, :]
+        for column, threshold in enumerate(thresholds):
+            labels[(horizon, float(threshold))] = hits[:, column].astype(int)
+    return labels, maxima
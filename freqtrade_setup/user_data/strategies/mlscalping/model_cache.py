@@ -0,0 +1,129 @@
+"""
+Model Cache
+===========
+
+Warm, shared model storage for the LightGBMScalpingClassifier FreqAI model.
+
+Every trained model is also written as one uncompressed joblib "bundle"
+(booster, feature pipeline, label pipeline, feature and label lists) next
+to FreqAI's own files. Loading a bundle with mmap_mode='r' memory-maps its
+numpy arrays, most notably the training data kept by the dissimilarity
+index. Those pages come from the OS page cache and stay read-only, so
+pairs and worker processes loading the same file share them instead of
+each holding a private copy.
+
+Bundles are deduplicated by content hash, and each pair's entry is replaced
+in a single assignment under a lock. A prediction therefore always sees a
+complete model + pipeline pair, even while a retrain is swapping in a new
+version.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import joblib
+
+
+class ModelBundle(NamedTuple):
+    """Everything needed to predict for one pair"""
+    model: Any
+    feature_pipeline: Any
+    label_pipeline: Any
+    training_features_list: list
+    label_list: list
+
+
+def bundle_path(data_path, model_filename) -> Path:
+    """Bundle file stored next to FreqAI's model files"""
+    return Path(data_path) / f"{model_filename}_bundle.joblib"
+
+
+def save_bundle(path: Path, bundle: ModelBundle) -> None:
+    """Write a bundle atomically (temp file + rename) so readers never see half a file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    joblib.dump(tuple(bundle), tmp)
+    os.replace(tmp, path)
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Current ModelBundle per pair.
+
+    load() memory-maps a bundle file, reusing the already loaded bundle when
+    another pair has the same content. publish() swaps in a freshly trained
+    bundle. get() is lock-free: it returns whichever complete bundle was
+    published last.
+    """
+
+    def __init__(self):
+        self._bundles = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.shared_loads = 0
+        self.load_seconds = 0.0
+
+    def get(self, pair):
+        return self._bundles.get(pair)
+
+    def publish(self, pair, bundle: ModelBundle, digest=None, replace=True) -> bool:
+        """
+        Make `bundle` the pair's current model.
+
+        With replace=False an existing entry wins, so a slow startup load
+        cannot overwrite a model that a retrain has already published.
+        """
+        with self._lock:
+            if not replace and pair in self._bundles:
+                return False
+            self._bundles[pair] = bundle
+            if digest is not None:
+                self._digests[digest] = bundle
+            # Forget digests whose bundle is no longer used by any pair
+            live = {id(b) for b in self._bundles.values()}
+            self._digests = {d: b for d, b in self._digests.items() if id(b) in live}
+        return True
+
+    def load(self, pair, path: Path, replace=False):
+        """Memory-map a bundle file for `pair`; returns the pair's current bundle"""
+        digest = file_digest(path)
+        with self._lock:
+            bundle = self._digests.get(digest)
+
+        if bundle is None:
+            start = time.perf_counter()
+            bundle = ModelBundle(*joblib.load(path, mmap_mode='r'))
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += elapsed
+        else:
+            with self._lock:
+                self.shared_loads += 1
+
+        self.publish(pair, bundle, digest, replace=replace)
+        return self._bundles[pair]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pairs': len(self._bundles),
+                'unique_models': len({id(b) for b in self._bundles.values()}),
+                'loads': self.loads,
+                'shared_loads': self.shared_loads,
+                'load_seconds': round(self.load_seconds, 3),
+            }
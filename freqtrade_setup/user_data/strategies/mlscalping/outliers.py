@@ -0,0 +1,168 @@
+"""
+Outlier Filters
+===============
+
+Drop-in replacements for FreqAI's SVM outlier step
+(use_SVM_to_remove_outliers), opted into with the feature_parameters key
+"outlier_filter":
+
+- "svm": FreqAI's SGDOneClassSVM on every training row (default)
+- "svm_subsample": the same SVM fitted on a random subsample of rows
+- "isolation_forest": scikit-learn IsolationForest on small subsamples
+- "robust_zscore": median/MAD z-scores per feature; a row is an outlier
+  when its largest |z| is in the top `contamination` fraction of the
+  training rows
+
+All filters follow the datasieve transform contract: during training they
+remove outlier rows from X, y and sample weights; at prediction time
+(outlier_check=True) they zero the do_predict flags of outlier rows.
+Parameters come from "outlier_filter_params".
+
+FreqAI's SVM is already linear in the training rows, so on short training
+windows the replacements save nothing (python scripts/benchmark.py outliers:
+svm_subsample is at most 1.3x at 30 days, 2.6x at 60, 4x at 180). A configured
+filter is therefore only used from "outlier_filter_min_days" of training
+data (default MIN_TRAIN_DAYS); shorter windows keep FreqAI's SVM.
+"""
+
+import logging
+
+import numpy as np
+from datasieve.transforms.base_transform import BaseTransform
+from datasieve.utils import remove_outliers
+from sklearn.ensemble import IsolationForest
+from sklearn.linear_model import SGDOneClassSVM
+
+
+logger = logging.getLogger(__name__)
+
+# Shortest train_period_days for which a configured filter replaces the SVM
+MIN_TRAIN_DAYS = 60
+
+
+class OutlierFilter(BaseTransform):
+    """Shared transform logic; subclasses implement fit() and inliers()"""
+
+    def inliers(self, X):
+        """1 for inliers, 0 for outliers"""
+        raise NotImplementedError
+
+    def fit_transform(self, X, y=None, sample_weight=None, feature_list=None, **kwargs):
+        self.fit(X, y, sample_weight=sample_weight)
+        return self.transform(X, y, sample_weight, feature_list)
+
+    def transform(self, X, y=None, sample_weight=None, feature_list=None,
+                  outlier_check=False, **kwargs):
+        y_pred = self.inliers(X)
+        if not outlier_check:
+            X, y, sample_weight = remove_outliers(X, y, sample_weight, y_pred)
+            num_tossed = len(y_pred) - len(X)
+            if num_tossed > 0:
+                logger.info(f"{self.name} detected {num_tossed} data points as outliers.")
+        else:
+            y += y_pred
+            y -= 1
+        return X, y, sample_weight, feature_list
+
+
+def _subsample(X, max_samples, seed):
+    if len(X) <= max_samples:
+        return X
+    rows = np.random.default_rng(seed).choice(len(X), size=max_samples, replace=False)
+    rows.sort()
+    return X[rows]
+
+
+class SubsampledSVMFilter(OutlierFilter):
+    """SGDOneClassSVM fitted on at most `max_samples` random training rows"""
+
+    def __init__(self, max_samples=5000, seed=42, **svm_params):
+        super().__init__("svm_subsample")
+        self.max_samples = max_samples
+        self.seed = seed
+        self._svm = SGDOneClassSVM(**{"shuffle": False, "nu": 0.01, **svm_params})
+
+    def fit(self, X, y=None, sample_weight=None, feature_list=None, **kwargs):
+        self._svm.fit(_subsample(np.asarray(X), self.max_samples, self.seed))
+        return X, y, sample_weight, feature_list
+
+    def inliers(self, X):
+        return np.where(self._svm.predict(X) == -1, 0, 1)
+
+
+class IsolationForestFilter(OutlierFilter):
+    """IsolationForest; each tree is grown on `max_samples` rows, so fitting is sub-linear"""
+
+    def __init__(self, contamination=0.01, n_estimators=100, max_samples=256, seed=42, n_jobs=-1):
+        super().__init__("isolation_forest")
+        self._forest = IsolationForest(n_estimators=n_estimators, max_samples=max_samples,
+                                       contamination=contamination, random_state=seed, n_jobs=n_jobs)
+
+    def fit(self, X, y=None, sample_weight=None, feature_list=None, **kwargs):
+        self._forest.fit(X)
+        return X, y, sample_weight, feature_list
+
+    def inliers(self, X):
+        return np.where(self._forest.predict(X) == -1, 0, 1)
+
+
+class RobustZScoreFilter(OutlierFilter):
+    """
+    Per-feature median/MAD z-scores.
+
+    fit() stores the medians, the MADs and the (1 - contamination) quantile
+    of the training rows' largest |z|, estimated on at most `max_samples`
+    rows; rows above that cut-off are outliers. No model to train.
+    """
+
+    def __init__(self, contamination=0.01, max_samples=20000, seed=42):
+        super().__init__("robust_zscore")
+        self.contamination = contamination
+        self.max_samples = max_samples
+        self.seed = seed
+        self.median = None
+        self.scale = None
+        self.cutoff = np.inf
+
+    def _max_abs_z(self, X):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.abs((np.asarray(X, dtype='float64') - self.median) / self.scale)
+        return np.nan_to_num(z, nan=0.0).max(axis=1)
+
+    def fit(self, X, y=None, sample_weight=None, feature_list=None, **kwargs):
+        values = _subsample(np.asarray(X, dtype='float64'), self.max_samples, self.seed)
+        self.median = np.median(values, axis=0)
+        mad = np.median(np.abs(values - self.median), axis=0)
+        # 1.4826 * MAD estimates the standard deviation for normal data;
+        # constant features get scale inf (z = 0)
+        self.scale = np.where(mad > 0, 1.4826 * mad, np.inf)
+        self.cutoff = np.quantile(self._max_abs_z(values), 1 - self.contamination)
+        return X, y, sample_weight, feature_list
+
+    def inliers(self, X):
+        return (self._max_abs_z(X) <= self.cutoff).astype(int)
+
+
+OUTLIER_FILTERS = {
+    "svm_subsample": SubsampledSVMFilter,
+    "isolation_forest": IsolationForestFilter,
+    "robust_zscore": RobustZScoreFilter,
+}
+
+
+def use_outlier_filter(name, train_days, min_days=None):
+    """Whether outlier_filter `name` replaces FreqAI's SVM for a `train_days` training window"""
+    if name == "svm":
+        return False
+    return train_days >= (MIN_TRAIN_DAYS if min_days is None else min_days)
+
+
+def make_outlier_filter(name, params=None, threads=-1):
+    """Build the outlier transform registered under `name`"""
+    if name not in OUTLIER_FILTERS:
+        raise ValueError(f"Unknown outlier_filter '{name}', expected one of: svm, "
+                         + ", ".join(OUTLIER_FILTERS))
+    params = dict(params or {})
+    if name == "isolation_forest":
+        params.setdefault("n_jobs", threads)
+    return OUTLIER_FILTERS[name](**params)
@@ -0,0 +1,47 @@
+"""
+Parameter Grid Signals
+======================
+
+Entry/exit masks for a whole hyperopt parameter grid at once.
+
+Each of the strategy's signal rules is a parameter-independent part (ML
+prediction, volume, trend and band filters) combined with one threshold
+comparison on a hyperopt parameter (buy_rsi, sell_rsi). signal_grid()
+evaluates that comparison for every candidate value in a single broadcast,
+giving a (candles x values) boolean matrix. A hyperopt epoch then only
+selects the column for its parameter value instead of re-running the rules.
+"""
+
+import numpy as np
+from pandas import DataFrame
+
+
+def threshold_grid(values, thresholds, above):
+    """(candles x thresholds) matrix of values > threshold (or < when not `above`)"""
+    values = np.asarray(values, dtype='float64')[:, None]
+    thresholds = np.asarray(thresholds, dtype='float64')[None, :]
+    # NaN compares False either way, like the pandas rules
+    with np.errstate(invalid='ignore'):
+        grid = values > thresholds if above else values < thresholds
+    return np.asfortranarray(grid)
+
+
+def signal_grid(base, values, thresholds, above, combine):
+    """
+    Combine a parameter-independent mask with every threshold comparison.
+
+    `combine` is np.logical_and for entry rules (all conditions must hold)
+    or np.logical_or for exit rules (any condition exits).
+    """
+    base = np.asarray(base, dtype=bool)[:, None]
+    return combine(base, threshold_grid(values, thresholds, above), order='F')
+
+
+def grid_column(prefix, value):
+    """Column name holding the mask for one parameter value"""
+    return f'grid_{prefix}_{value}'
+
+
+def grid_frame(prefix, grid, thresholds, index):
+    """Wrap a signal_grid() matrix as one boolean column per parameter value"""
+    return DataFrame(grid, columns=[grid_column(prefix, value) for value in thresholds], index=index)
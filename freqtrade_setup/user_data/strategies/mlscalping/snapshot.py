@@ -0,0 +1,49 @@
+"""
+Latest Candle Snapshot
+======================
+
+Plain-float copy of the last analyzed candle of a pair.
+
+The order callbacks (custom_stake_amount, confirm_trade_entry) only need a
+handful of values from the newest candle. Reading them through
+get_analyzed_dataframe(...).iloc[-1] builds a pandas Series for every order
+decision; the strategy instead publishes a CandleSnapshot once per analysis
+and the callbacks read attributes from it.
+"""
+
+from typing import NamedTuple
+
+from pandas import DataFrame
+
+
+class CandleSnapshot(NamedTuple):
+    date: object
+    volume: float
+    volume_mean_20: float
+    atr: float
+    di_values: float
+
+
+# Value used when a column is missing, same as the callbacks' .get() defaults
+_DEFAULTS = {
+    'volume': 0.0,
+    'volume_mean_20': 1.0,
+    'atr': 0.0,
+    'DI_values': 0.0,
+}
+
+
+def take_snapshot(dataframe: DataFrame) -> CandleSnapshot:
+    """Build a snapshot from the last row of an analyzed dataframe"""
+    def last(column):
+        if column not in dataframe.columns:
+            return _DEFAULTS[column]
+        return float(dataframe[column].iat[-1])
+
+    return CandleSnapshot(
+        date=dataframe['date'].iat[-1],
+        volume=last('volume'),
+        volume_mean_20=last('volume_mean_20'),
+        atr=last('atr'),
+        di_values=last('DI_values'),
+    )
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Concurrent OHLCV Downloader
+===========================
+
+Downloads candles for many pairs and timeframes straight from the
+exchange's REST API in one asyncio process, instead of one
+`freqtrade download-data` subprocess per pair and timeframe.
+
+- Every (pair, timeframe) range is split into pages of up to 1000 candles
+  and all pages are fetched concurrently, bounded by --concurrency
+- One token bucket (--rate requests/second) is shared by all requests,
+  so the exchange's request-weight limit is respected
+- One HTTP session reuses its keep-alive connections for every request
+- Failed pages are retried with exponential backoff and jitter; HTTP
+  429/418 responses honour the exchange's Retry-After header
+- Results are written in freqtrade's feather format (see candle_data.py)
+
+Sync mode (--sync) only fetches what is missing from the files already on
+disk: the candles after the last stored one, any internal gaps, and with
+--days the part of the window before the first stored candle. Candles
+after the end of a file are appended to it.
+
+The exchange URL is configurable, so the downloader can be pointed at a
+local mock server (scripts/mock_exchange.py) for testing.
+
+Usage:
+    python async_downloader.py                                # All pairs, 1m, 365 days
+    python async_downloader.py --pairs BTC/USDT --days 30
+    python async_downloader.py --sync                         # Bring every stored file up to date
+    python async_downloader.py --base-url http://127.0.0.1:8800 --days 30
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+
+from candle_data import (TIMEFRAME_MS, append_candles, candle_files, candle_path, load_candles,
+                         load_times, merge_candles, save_candles)
+
+
+BINANCE_URL = 'https://api.binance.com'
+PAGE_LIMIT = 1000
+DAY_MS = 86_400_000
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+class TokenBucket:
+    """Asyncio token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Drain the bucket so no request starts for `seconds` (server asked us to back off)"""
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class FetchError(Exception):
+    """A page could not be downloaded; `retry` tells whether trying again can help"""
+
+    def __init__(self, message, retry=True, wait=None):
+        super().__init__(message)
+        self.retry = retry
+        self.wait = wait
+
+
+class KlineClient:
+    """Binance-compatible /api/v3/klines client with rate limiting and retries"""
+
+    def __init__(self, session, bucket, base_url=BINANCE_URL, retries=5, backoff=1.0):
+        self.session = session
+        self.bucket = bucket
+        self.base_url = base_url.rstrip('/')
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.retried = 0
+
+    async def _get_page(self, symbol, interval, start_ms, end_ms):
+        await self.bucket.acquire()
+        self.requests += 1
+        params = {'symbol': symbol, 'interval': interval, 'startTime': start_ms,
+                  'endTime': end_ms, 'limit': PAGE_LIMIT}
+        try:
+            async with self.session.get(f"{self.base_url}/api/v3/klines", params=params) as response:
+                if response.status in (418, 429):
+                    wait = float(response.headers.get('Retry-After', 0)) or None
+                    if wait:
+                        self.bucket.pause(wait)
+                    raise FetchError(f"HTTP {response.status} (rate limited)", wait=wait)
+                if response.status >= 500:
+                    raise FetchError(f"HTTP {response.status}")
+                if response.status != 200:
+                    raise FetchError(f"HTTP {response.status}: {(await response.text())[:100]}", retry=False)
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FetchError(f"{type(e).__name__}: {e}")
+
+    async def page(self, symbol, interval, start_ms, end_ms):
+        """Candles with open time in [start_ms, end_ms], retried with backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                rows = await self._get_page(symbol, interval, start_ms, end_ms)
+                break
+            except FetchError as e:
+                if not e.retry or attempt == self.retries:
+                    raise
+                self.retried += 1
+                await asyncio.sleep(e.wait or self.backoff * 2 ** attempt * (0.5 + random.random()))
+        if not rows:
+            return None
+        return np.array([row[:6] for row in rows], dtype='float64')
+
+
+def exchange_symbol(pair):
+    """BTC/USDT -> BTCUSDT"""
+    return pair.split(':')[0].replace('/', '')
+
+
+def page_ranges(start_ms, end_ms, timeframe):
+    """Split [start_ms, end_ms) into request ranges of at most PAGE_LIMIT candles"""
+    step = TIMEFRAME_MS[timeframe]
+    start_ms -= start_ms % step
+    span = PAGE_LIMIT * step
+    return [(page_start, min(page_start + span, end_ms) - 1)
+            for page_start in range(start_ms, end_ms, span)]
+
+
+def closed_candles_end(now_ms, timeframe):
+    """End of the last closed candle: the currently forming candle is never stored"""
+    step = TIMEFRAME_MS[timeframe]
+    return now_ms - now_ms % step
+
+
+def missing_ranges(times, timeframe, start_ms, end_ms, fill_gaps=True):
+    """
+    Ranges [(start_ms, end_ms)] (end exclusive) of [start_ms, end_ms) not
+    covered by the sorted candle open times `times`
+    """
+    step = TIMEFRAME_MS[timeframe]
+    if not len(times):
+        return [(start_ms, end_ms)] if end_ms - start_ms >= step else []
+
+    first, last = int(times[0]), int(times[-1])
+    ranges = []
+    if first - start_ms >= step:
+        ranges.append((start_ms, first))
+    if fill_gaps:
+        gaps = np.flatnonzero(np.diff(times) > step)
+        ranges.extend((int(times[i]) + step, int(times[i + 1])) for i in gaps)
+    if end_ms - (last + step) >= step:
+        ranges.append((last + step, end_ms))
+    return ranges
+
+
+def stored_files(freqtrade_dir):
+    """(pair, timeframe) of every candle file in the data directory"""
+    stored = []
+    for path in candle_files(freqtrade_dir):
+        name, timeframe = path.stem.rsplit('-', 1)
+        base, _, quote = name.rpartition('_')
+        if base and timeframe in TIMEFRAME_MS:
+            stored.append((f"{base}/{quote}", timeframe))
+    return stored
+
+
+async def fetch_pages(client, pair, timeframe, ranges, semaphore):
+    """
+    Fetch the candles in `ranges` ([(start_ms, end_ms)], end exclusive) for
+    one pair. Returns (list of page arrays, first error or None).
+    """
+    symbol = exchange_symbol(pair)
+    pages = [page for start, end in ranges for page in page_ranges(start, end, timeframe)]
+
+    rejected = []
+
+    async def fetch(start, end):
+        async with semaphore:
+            # After a non-retryable answer (e.g. unknown symbol) skip the remaining pages
+            if rejected:
+                raise rejected[0]
+            try:
+                return await client.page(symbol, timeframe, start, end)
+            except FetchError as e:
+                if not e.retry:
+                    rejected.append(e)
+                raise
+
+    results = await asyncio.gather(*(fetch(start, end) for start, end in pages), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    fetched = [result for result in results if isinstance(result, np.ndarray)]
+    return fetched, str(errors[0]) if errors else None
+
+
+async def download_ranges(client, freqtrade_dir, pair, timeframe, ranges, semaphore, last_ms=None):
+    """
+    Fetch the candles in `ranges` for one pair and merge them into its file.
+    `last_ms` is the newest stored open time, if known.
+    Returns (candles added, error or None).
+    """
+    fetched, error = await fetch_pages(client, pair, timeframe, ranges, semaphore)
+    if error and not fetched:
+        return 0, error
+
+    # File IO in a worker thread so the other downloads keep going
+    added = await asyncio.to_thread(store_pages, candle_path(freqtrade_dir, pair, timeframe), fetched, last_ms)
+    return added, error
+
+
+def store_pages(path, pages, last_ms=None):
+    """
+    Merge downloaded pages into the file at `path`; returns the number of new candles.
+
+    Pages that all start after `last_ms` are appended without reading the file.
+    """
+    if last_ms is not None and pages and min(page[0, 0] for page in pages) > last_ms:
+        candles = merge_candles(*pages)
+        append_candles(path, candles)
+        return len(candles)
+
+    existing = load_candles(path)
+    candles = merge_candles(existing, *pages)
+    if pages:
+        save_candles(path, candles)
+    return len(candles) - len(existing)
+
+
+async def run_downloads(tasks, freqtrade_dir, concurrency=16, rate=40.0, base_url=BINANCE_URL,
+                        retries=5, timeout=30, last_stored=None, store=True):
+    """
+    Run download tasks [(pair, timeframe, [(start_ms, end_ms), ...])] concurrently.
+
+    `last_stored` maps (pair, timeframe) to the newest open time already on
+    disk, so candles after it can be appended in place.
+
+    Returns ({(pair, timeframe): (candles added, error or None)}, client).
+    With store=False nothing is written and the results hold the fetched
+    candle arrays instead of the number of candles added.
+    """
+    bucket = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    results = {}
+    total = len(tasks)
+    width = len(str(total))
+    start = time.monotonic()
+
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        client = KlineClient(session, bucket, base_url, retries=retries)
+
+        async def one(pair, timeframe, ranges):
+            try:
+                if store:
+                    result = await download_ranges(client, freqtrade_dir, pair, timeframe, ranges, semaphore,
+                                                   (last_stored or {}).get((pair, timeframe)))
+                else:
+                    pages, error = await fetch_pages(client, pair, timeframe, ranges, semaphore)
+                    result = (merge_candles(*pages), error)
+            except Exception as e:
+                result = (0 if store else merge_candles(), f"{type(e).__name__}: {e}")
+            results[(pair, timeframe)] = result
+            added = result[0] if store else len(result[0])
+            error = result[1]
+            status = '✗' if error else '✓'
+            detail = f"{error[:60]}" if error else f"+{added:,} candles"
+            print(f"[{len(results):>{width}}/{total}] {status} {pair:<12} {timeframe:>4}  {detail}"
+                  f"  | {time.monotonic() - start:.0f}s", flush=True)
+
+        await asyncio.gather(*(one(pair, timeframe, ranges) for pair, timeframe, ranges in tasks))
+
+    return results, client
+
+
+def fetch(tasks, concurrency=16, rate=40.0, base_url=BINANCE_URL):
+    """
+    Fetch candles into memory without touching the data files.
+
+    `tasks` is [(pair, timeframe, [(start_ms, end_ms), ...])]; returns
+    {(pair, timeframe): (candles, error or None)}.
+    """
+    results, _ = asyncio.run(run_downloads(tasks, None, concurrency, rate, base_url, store=False))
+    return results
+
+
+def download(freqtrade_dir, pairs, timeframes, days, concurrency=16, rate=40.0, base_url=BINANCE_URL):
+    """
+    Download `days` of candles for every pair and timeframe.
+
+    Returns the list of failed "PAIR (timeframe)" entries, like download_data.py.
+    """
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    start_ms = now_ms - days * 86_400_000
+    tasks = [(pair, timeframe, [(start_ms, closed_candles_end(now_ms, timeframe))])
+             for timeframe in timeframes for pair in pairs]
+
+    results, client = asyncio.run(run_downloads(tasks, freqtrade_dir, concurrency, rate, base_url))
+    print(f"\nRequests: {client.requests:,} ({client.retried:,} retried)")
+    return [f"{pair} ({timeframe}) - {error[:40]}" for (pair, timeframe), (_, error) in results.items() if error]
+
+
+def sync(freqtrade_dir, pairs=None, timeframes=None, days=None, fill_gaps=True,
+         concurrency=16, rate=40.0, base_url=BINANCE_URL, new_file_days=365):
+    """
+    Fetch only the candles missing from the stored files.
+
+    Covers every stored (pair, timeframe), narrowed to `pairs` / `timeframes`
+    when given; when both are given, files that do not exist yet are
+    downloaded too (`days`, or `new_file_days` of history). With `days`,
+    the window before the first stored candle is filled as well.
+
+    Returns (failed "PAIR (timeframe)" entries, filled ranges): the filled
+    ranges map (pair, timeframe) to the requested ranges [(start_ms, end_ms)]
+    before the newest stored candle (internal gaps and the window before the
+    first candle), i.e. everything merged into the file rather than appended.
+    """
+    combos = [(pair, timeframe) for pair, timeframe in stored_files(freqtrade_dir)
+              if (not pairs or pair in pairs) and (not timeframes or timeframe in timeframes)]
+    if pairs and timeframes:
+        combos += [(pair, timeframe) for timeframe in timeframes for pair in pairs
+                   if (pair, timeframe) not in combos]
+
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    tasks = []
+    last_stored = {}
+    filled = {}
+    gap_ranges = 0
+    for pair, timeframe in combos:
+        times = load_times(candle_path(freqtrade_dir, pair, timeframe))
+        if days:
+            start_ms = now_ms - days * DAY_MS
+        else:
+            start_ms = int(times[0]) if len(times) else now_ms - new_file_days * DAY_MS
+        ranges = missing_ranges(times, timeframe, start_ms, closed_candles_end(now_ms, timeframe), fill_gaps)
+        if ranges:
+            tasks.append((pair, timeframe, ranges))
+            if len(times):
+                last_stored[(pair, timeframe)] = int(times[-1])
+                gap_ranges += sum(1 for start, _ in ranges if times[0] < start <= times[-1])
+                inside = [(start, end) for start, end in ranges if start <= times[-1]]
+                if inside:
+                    filled[(pair, timeframe)] = inside
+
+    print(f"{len(combos)} files checked: {len(combos) - len(tasks)} up to date, "
+          f"{len(tasks)} to sync ({gap_ranges} internal gaps)")
+    if not tasks:
+        return [], {}
+
+    results, client = asyncio.run(run_downloads(tasks, freqtrade_dir, concurrency, rate, base_url,
+                                                last_stored=last_stored))
+    added = sum(result[0] for result in results.values())
+    print(f"\nRequests: {client.requests:,} ({client.retried:,} retried), {added:,} candles added")
+    failed = [f"{pair} ({timeframe}) - {error[:40]}" for (pair, timeframe), (_, error) in results.items() if error]
+    return failed, filled
+
+
+def main():
+    from download_data import DAYS_TO_DOWNLOAD, DOWNLOAD_TIMEFRAMES, PAIRS
+
+    parser = argparse.ArgumentParser(
+        description='Download OHLCV candles concurrently',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python async_downloader.py                              # All pairs, 365 days
+  python async_downloader.py --pairs BTC/USDT ETH/USDT --timeframes 5m --days 30
+  python async_downloader.py --sync                       # Only fetch missing candles
+  python async_downloader.py --sync --timeframes 5m       # ... for the stored 5m files
+  python async_downloader.py --base-url http://127.0.0.1:8800   # Local mock exchange
+        """
+    )
+    parser.add_argument('--pairs', nargs='+',
+                        help='Pairs (default: all; with --sync: every stored pair)')
+    parser.add_argument('--timeframes', nargs='+',
+                        help='Timeframes (default: 1m; with --sync: every stored timeframe)')
+    parser.add_argument('--days', type=int,
+                        help='Days of history (default: 365; with --sync: from the first stored candle)')
+    parser.add_argument('--sync', action='store_true',
+                        help='Only fetch candles missing from the stored files (tail and gaps)')
+    parser.add_argument('--no-gaps', action='store_true',
+                        help='With --sync: do not re-request internal gaps (e.g. exchange outages)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight (default: 16)')
+    parser.add_argument('--rate', type=float, default=40.0,
+                        help='Requests per second, shared by all downloads (default: 40)')
+    parser.add_argument('--base-url', default=BINANCE_URL, help=f'Exchange REST URL (default: {BINANCE_URL})')
+    parser.add_argument('--freqtrade-dir', type=Path, default=get_freqtrade_dir(),
+                        help='freqtrade_setup directory (default: ../freqtrade_setup)')
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    if args.sync:
+        failed, _ = sync(args.freqtrade_dir, args.pairs, args.timeframes, args.days, not args.no_gaps,
+                         args.concurrency, args.rate, args.base_url, new_file_days=DAYS_TO_DOWNLOAD)
+    else:
+        failed = download(args.freqtrade_dir, args.pairs or PAIRS, args.timeframes or DOWNLOAD_TIMEFRAMES,
+                          args.days or DAYS_TO_DOWNLOAD, args.concurrency, args.rate, args.base_url)
+    print(f"Duration: {time.monotonic() - start:.1f}s")
+    if failed:
+        print(f"\n⚠ {len(failed)} downloads failed:")
+        for item in failed:
+            print(f"  - {item}")
+        sys.exit(1)
+    print("✓ All downloads successful!")
+
+
+if __name__ == '__main__':
+    main()
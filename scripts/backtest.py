@@ -9,15 +9,27 @@ Usage:
     python backtest.py --period 3m    # Last 3 months
     python backtest.py --period 6m    # Last 6 months
     python backtest.py --period 1y    # Last 1 year
+    python backtest.py --period 3m 6m 1y    # One run, compared side by side
+    python backtest.py --period 1y --sharded    # Walk-forward windows in parallel
 """
 
+import json
+import math
+import shutil
 import subprocess
 import sys
 import argparse
 import webbrowser
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from backtest_cache import DEFAULT_MAX_MB, BacktestCache, CacheKeys, cache_root
+from job_pool import Job, format_duration, plan_workers, run_jobs
+
+
+STRATEGY = 'MLScalpingStrategy'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 def get_freqtrade_dir():
     """Get the freqtrade setup directory"""
@@ -45,6 +57,22 @@ def calculate_timerange(period):
     return f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
 
 
+def check_data_coverage(freqtrade_dir, timerange):
+    """Warn about pairs whose 5m data (per the candle index) does not cover the timerange"""
+    from candle_index import validate_timerange
+    
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    # FreqAI trains on train_period_days before the first backtest candle
+    uncovered = validate_timerange(
+        freqtrade_dir, timerange, timeframe='5m',
+        lead_days=config['freqai'].get('train_period_days', 0),
+        startup_candles=200,
+    )
+    for pair, reason in sorted(uncovered.items()):
+        print(f"⚠ {pair}: 5m data {reason}, does not cover {timerange} plus the training window")
+    return uncovered
+
+
 def run_backtest(freqtrade_dir, timerange):
     """Run the backtest"""
     print("\n" + "="*60)
@@ -114,6 +142,665 @@ def run_backtest(freqtrade_dir, timerange):
         os.chdir(original_dir)
 
 
+def parse_timerange(timerange):
+    """'YYYYMMDD-YYYYMMDD' -> (start, end) UTC datetimes"""
+    start, end = timerange.split('-')
+    return (datetime.strptime(start, '%Y%m%d').replace(tzinfo=timezone.utc),
+            datetime.strptime(end, '%Y%m%d').replace(tzinfo=timezone.utc))
+
+
+def format_timerange(start, end):
+    return f"{start:%Y%m%d}-{end:%Y%m%d}"
+
+
+def timerange_arg(value):
+    """argparse type for 'YYYYMMDD-YYYYMMDD'"""
+    try:
+        start, end = parse_timerange(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid timerange {value!r}, expected YYYYMMDD-YYYYMMDD")
+    if start >= end:
+        raise argparse.ArgumentTypeError(f"timerange {value!r} ends before it starts")
+    return value
+
+
+def requested_periods(periods, timeranges):
+    """[(label, timerange), ...] for every --period and --timerange (default: 3m)"""
+    requested = [(period, calculate_timerange(period)) for period in periods or []]
+    requested += [(timerange, timerange) for timerange in timeranges or []]
+    return requested or [('3m', calculate_timerange('3m'))]
+
+
+def spanning_timerange(timeranges):
+    """Smallest timerange containing all the given ones"""
+    starts, ends = zip(*(parse_timerange(timerange) for timerange in timeranges))
+    return format_timerange(min(starts), max(ends))
+
+
+def backtest_pairs(freqtrade_dir, pairs=None):
+    """Pairs to backtest: the requested ones, or every pair with 5m data"""
+    if pairs:
+        return pairs
+    from candle_index import entries, refresh
+    from download_data import PAIRS
+    available = {entry['pair'] for entry in entries(refresh(freqtrade_dir), '5m')}
+    return [pair for pair in PAIRS if pair in available]
+
+
+def align_start(timerange, window_days):
+    """
+    Move the timerange start back onto the window grid (multiples of
+    window_days since 1970-01-01), so FreqAI's windows fall on the same
+    dates in every run and cached windows can be reused
+    """
+    start, end = parse_timerange(timerange)
+    days = (start - EPOCH).days
+    return format_timerange(EPOCH + timedelta(days=days - days % int(window_days)), end)
+
+
+def window_ranges(start, end, window_days):
+    """FreqAI backtest windows [(start, end), ...] of start..end, counted from start"""
+    windows = []
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + timedelta(days=window_days), end)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def plan_window_shards(timerange, window_days, shard_count, overlap_days, limit=None):
+    """
+    Split the timerange into at most shard_count runs of whole FreqAI backtest
+    windows (window_days long, counted from the start like FreqAI does), so
+    every shard trains exactly the models the serial run trains.
+    
+    Each shard ending before `limit` (default: the timerange end) runs
+    overlap_days past its end, so trades opened before the boundary close
+    the way they do in the serial run; only trades opened before the
+    boundary are kept from it.
+    """
+    start, end = parse_timerange(timerange)
+    limit = limit or end
+    windows = max(1, math.ceil((end - start) / timedelta(days=window_days)))
+    span = timedelta(days=window_days * math.ceil(windows / max(1, shard_count)))
+    
+    shards = []
+    shard_start = start
+    while shard_start < end:
+        shard_end = min(shard_start + span, end)
+        run_end = min(shard_end + timedelta(days=overlap_days), limit)
+        shards.append({
+            'id': format_timerange(shard_start, shard_end),
+            'name': format_timerange(shard_start, shard_end),
+            'timerange': format_timerange(shard_start, shard_end),
+            'run_timerange': format_timerange(shard_start, run_end),
+            'keep_until': None if shard_end >= limit else int(shard_end.timestamp() * 1000),
+        })
+        shard_start = shard_end
+    return shards
+
+
+def open_at(trades, timestamp):
+    """[pair, open time, close time] of the trades still open at `timestamp`"""
+    return sorted([trade['pair'], trade['open_timestamp'], trade['close_timestamp']] for trade in trades
+                  if trade['open_timestamp'] < timestamp < trade['close_timestamp'])
+
+
+def window_key(keys, window_start, window_end, end, trades):
+    """
+    Cache key of a window, given the earlier `trades` of its run: the trades
+    still open when the window starts are part of its starting state
+    """
+    # The last window's open trades are force-exited at the end: only valid for runs ending there
+    kind = 'window' if window_end < end else 'final window'
+    return keys.key(window_start, window_end, kind, state=open_at(trades, window_start))
+
+
+def plan_cached_window_shards(timerange, window_days, shard_count, overlap_days, cache, keys):
+    """
+    Cached trades of the timerange's first windows, and shards for the rest.
+    
+    A window's trades depend on the trades its run still has open when it
+    starts, so windows are looked up in order, each keyed with the trades
+    the cached windows before it leave open; from the first miss on every
+    window is run. Wallet and slots are not part of the key: cached windows
+    come from runs that never reached either limit (serial_differences),
+    and the merged run is checked again. Returns (cached trade lists,
+    shards); every shard lists its windows as (start_ms, end_ms) for
+    storing the results window by window.
+    """
+    start, end = parse_timerange(timerange)
+    end_ms = int(end.timestamp() * 1000)
+    cached, earlier = [], []
+    first_missing = None
+    for window_start, window_end in window_ranges(start, end, window_days):
+        window = (int(window_start.timestamp() * 1000), int(window_end.timestamp() * 1000))
+        trades = cache.get(window_key(keys, *window, end_ms, earlier))
+        if trades is None:
+            first_missing = window_start
+            break
+        cached.append(trades)
+        earlier += trades
+    if first_missing is None:
+        return cached, []
+    
+    shards = plan_window_shards(format_timerange(first_missing, end), window_days, shard_count,
+                                overlap_days, limit=end)
+    for shard in shards:
+        shard_start, shard_end = parse_timerange(shard['timerange'])
+        shard['windows'] = [(int(window_start.timestamp() * 1000), int(window_end.timestamp() * 1000))
+                            for window_start, window_end in window_ranges(shard_start, shard_end, window_days)]
+    return cached, shards
+
+
+def store_windows(cache, keys, shard, trades, end_ms):
+    """Cache a shard's windows from the run's merged trades (by open time)"""
+    for window_start, window_end in shard.get('windows', []):
+        window_trades = [trade for trade in trades if window_start <= trade['open_timestamp'] < window_end]
+        earlier = [trade for trade in trades if trade['open_timestamp'] < window_start]
+        cache.put(window_key(keys, window_start, window_end, end_ms, earlier), window_trades,
+                  f"window {window_start}-{window_end}")
+
+
+def open_cache(freqtrade_dir, config, pairs, args):
+    """(BacktestCache, CacheKeys) for this setup, or (None, None) with --no-cache"""
+    if args.no_cache:
+        return None, None
+    cache = BacktestCache(cache_root(freqtrade_dir), int(args.cache_size_mb * 1024 ** 2))
+    return cache, CacheKeys(freqtrade_dir, config, pairs)
+
+
+def timerange_ms(timerange):
+    start, end = parse_timerange(timerange)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def plan_pair_shards(timerange, pairs, shard_count):
+    """Split the pairs into at most shard_count groups, each backtested over the whole timerange"""
+    groups = [pairs[i::shard_count] for i in range(min(shard_count, len(pairs)))]
+    return [{
+        'id': f"pairs{i + 1:02d}of{len(groups):02d}-{timerange}",
+        'name': f"pairs {i + 1}/{len(groups)} ({len(group)})",
+        'timerange': timerange,
+        'run_timerange': timerange,
+        'keep_until': None,
+        'pairs': group,
+    } for i, group in enumerate(groups)]
+
+
+def build_shard_jobs(freqtrade_dir, shards, pairs, threads_per_job):
+    """
+    One freqtrade backtest per shard, each in its own workspace.
+    
+    Like the training jobs, every shard gets an override config with a static
+    whitelist and a private FreqAI identifier (reused when the same shard runs
+    again), and exports its trades into its workspace.
+    """
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    identifier = config['freqai']['identifier']
+    workspace = freqtrade_dir / 'user_data' / 'backtest_jobs'
+    
+    jobs = []
+    for shard in shards:
+        job_dir = workspace / shard['id']
+        # Results of an earlier run must never be merged into this one
+        if job_dir.exists():
+            shutil.rmtree(job_dir)
+        job_dir.mkdir(parents=True)
+        
+        override = {
+            'exchange': {'pair_whitelist': shard.get('pairs', pairs)},
+            'pairlists': [{'method': 'StaticPairList'}],
+            'freqai': {
+                'identifier': f"{identifier}-bt-{shard['id']}",
+                'data_kitchen_thread_count': threads_per_job,
+                'model_training_parameters': {'n_jobs': threads_per_job},
+            },
+        }
+        (job_dir / 'config.json').write_text(json.dumps(override, indent=2))
+        
+        cmd = [
+            'freqtrade', 'backtesting',
+            '--strategy', STRATEGY,
+            '--config', 'config.json',
+            '--config', str(job_dir / 'config.json'),
+            '--timerange', shard['run_timerange'],
+            '--export', 'trades',
+            '--export-filename', str(job_dir),
+            '--cache', 'none',
+        ]
+        jobs.append(Job(shard['name'], cmd, freqtrade_dir, job_dir / 'backtest.log'))
+    
+    return jobs
+
+
+def load_job_trades(job):
+    """Trades exported by a finished backtest job, or None when it exported nothing"""
+    job_dir = job.log_path.parent
+    latest = job_dir / '.last_result.json'
+    if not latest.exists():
+        return None
+    result = json.loads((job_dir / json.loads(latest.read_text())['latest_backtest']).read_text())
+    return result['strategy'][STRATEGY]['trades']
+
+
+def trade_key(trade):
+    return (trade['open_timestamp'], trade['pair'], trade['close_timestamp'], trade['exit_reason'])
+
+
+def merge_trades(shard_trades):
+    """
+    Merge (trades, keep_until) per shard into one list in a fixed order
+    (open time, pair, close time), dropping trades opened after keep_until
+    """
+    merged = [trade for trades, keep_until in shard_trades for trade in trades
+              if keep_until is None or trade['open_timestamp'] < keep_until]
+    return sorted(merged, key=trade_key)
+
+
+def day_breakdown(trades):
+    """Per-day results by close date (UTC), like freqtrade's --breakdown day"""
+    days = {}
+    for trade in trades:
+        day = datetime.fromtimestamp(trade['close_timestamp'] / 1000, tz=timezone.utc).date()
+        days.setdefault(day, []).append(trade['profit_abs'])
+    return [{
+        'date': f"{day:%d/%m/%Y}",
+        # fsum: the total does not depend on the order the trades were merged in
+        'profit_abs': round(math.fsum(profits), 10),
+        'wins': sum(profit > 0 for profit in profits),
+        'draws': sum(profit == 0 for profit in profits),
+        'loses': sum(profit < 0 for profit in profits),
+    } for day, profits in sorted(days.items())]
+
+
+def print_report(trades, breakdown, stake_currency):
+    """Merged summary and day breakdown"""
+    wins = sum(trade['profit_abs'] > 0 for trade in trades)
+    total = math.fsum(trade['profit_abs'] for trade in trades)
+    mean_ratio = math.fsum(trade['profit_ratio'] for trade in trades) / len(trades) if trades else 0.0
+    
+    print(f"\n{'Day':<12}{'Profit ' + stake_currency:>16}{'Wins':>7}{'Draws':>7}{'Losses':>8}")
+    print("-"*50)
+    for day in breakdown:
+        print(f"{day['date']:<12}{day['profit_abs']:>16.4f}{day['wins']:>7}{day['draws']:>7}{day['loses']:>8}")
+    print("-"*50)
+    print(f"Trades: {len(trades)}  Win rate: {wins / len(trades) if trades else 0:.1%}  "
+          f"Avg profit: {mean_ratio:.2%}  Total: {total:.4f} {stake_currency}")
+
+
+def period_stats(trades):
+    """Summary of a trade list; drawdown is measured on profits in close order"""
+    ordered = sorted(trades, key=lambda trade: (trade['close_timestamp'], trade_key(trade)))
+    profits = [trade['profit_abs'] for trade in ordered]
+    equity = peak = drawdown = 0.0
+    for profit in profits:
+        equity += profit
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+    gains = math.fsum(profit for profit in profits if profit > 0)
+    losses = -math.fsum(profit for profit in profits if profit < 0)
+    return {
+        'trades': len(trades),
+        'win_rate': sum(profit > 0 for profit in profits) / len(trades) if trades else 0.0,
+        'avg_profit': math.fsum(trade['profit_ratio'] for trade in trades) / len(trades) if trades else 0.0,
+        'total': math.fsum(profits),
+        'max_drawdown': drawdown,
+        'profit_factor': gains / losses if losses else (math.inf if gains else 0.0),
+    }
+
+
+def print_period_table(periods, trades, stake_currency):
+    """Side-by-side results of every requested period, sliced from one run's trades by open time"""
+    print("\n" + "="*60)
+    print("  Period Comparison")
+    print("="*60)
+    print(f"\n{'Period':<20}{'Timerange':<19}{'Trades':>7}{'Win':>7}{'Avg':>8}"
+          f"{'Total ' + stake_currency:>14}{'Max DD':>10}{'PF':>6}")
+    print("-"*91)
+    for label, timerange in periods:
+        start_ms, end_ms = timerange_ms(timerange)
+        stats = period_stats([trade for trade in trades if start_ms <= trade['open_timestamp'] < end_ms])
+        print(f"{label:<20}{timerange:<19}{stats['trades']:>7}{stats['win_rate']:>7.1%}{stats['avg_profit']:>8.2%}"
+              f"{stats['total']:>14.4f}{stats['max_drawdown']:>10.4f}{stats['profit_factor']:>6.2f}")
+
+
+def shard_blockers(config):
+    """
+    Reasons why shards of this config can never reproduce a serial run,
+    whatever they trade: its stakes or entries depend on other shards' trades
+    """
+    reasons = []
+    if config.get('stake_amount') == 'unlimited':
+        reasons.append('stake_amount is "unlimited": every stake is sized from the wallet '
+                       'left by all earlier trades')
+    if config.get('protections'):
+        reasons.append("protections lock pairs based on the trades of other shards")
+    if config.get('position_adjustment_enable'):
+        reasons.append("position adjustment sizes orders from the wallet")
+    return reasons
+
+
+def entry_limit_reached(trades, config):
+    """
+    Where a run's entries could have been refused for want of an open-trade
+    slot (max_open_trades) or of balance (freqtrade's available stake:
+    (wallet + closed profit) * tradable_balance_ratio - open stakes), or None.
+    
+    A run that stays below both limits throughout has the same trades as any
+    longer run containing it, whatever wallet and slots that run had left.
+    """
+    max_open = config.get('max_open_trades', -1)
+    max_open = math.inf if max_open < 0 else max_open
+    stake = float(config['stake_amount'])
+    # Closes are processed before entries on the same candle
+    events = sorted([(trade['close_timestamp'], 0, trade) for trade in trades]
+                    + [(trade['open_timestamp'], 1, trade) for trade in trades],
+                    key=lambda event: (event[0], event[1], trade_key(event[2])))
+    open_trades = 0
+    open_stakes = closed_profit = 0.0
+    for timestamp, is_entry, trade in events:
+        if not is_entry:
+            open_trades -= 1
+            open_stakes -= trade['stake_amount']
+            closed_profit += trade['profit_abs']
+            continue
+        open_trades += 1
+        open_stakes += trade['stake_amount']
+        if 'available_capital' in config:
+            available = config['available_capital'] + closed_profit - open_stakes
+        else:
+            available = ((config.get('dry_run_wallet', 1000) + closed_profit)
+                         * config.get('tradable_balance_ratio', 0.99) - open_stakes)
+        opened = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+        if open_trades >= max_open:
+            return f"all {open_trades} max_open_trades slots taken at {opened:%Y-%m-%d %H:%M}"
+        if available < stake:
+            return f"available balance {available:.2f} below the stake {stake:g} at {opened:%Y-%m-%d %H:%M}"
+    return None
+
+
+def overlapping_trades(trades):
+    """Keys of trades opened while the same pair's previous trade was still open"""
+    overlapping = []
+    previous = {}
+    for trade in sorted(trades, key=lambda trade: (trade['pair'], trade['open_timestamp'])):
+        before = previous.get(trade['pair'])
+        if before is not None and trade['open_timestamp'] < before['close_timestamp']:
+            overlapping.append(trade_key(trade))
+        previous[trade['pair']] = trade
+    return overlapping
+
+
+def serial_differences(config, shards, results, trades):
+    """
+    Reasons why the merged `trades` of the shards may differ from a serial
+    run, or [] when they are the serial run's trades.
+    
+    Every shard starts with the full wallet, free slots and no open trades.
+    That does not change its trades when neither the shard nor the merged
+    run ever reaches max_open_trades or runs short of balance, no shard
+    opens a trade on a pair whose trade from the previous shard is still
+    open, and the overlap past each shard's end closes its trades.
+    """
+    reasons = shard_blockers(config)
+    if reasons:
+        return reasons
+    for shard, shard_trades in zip(shards, results):
+        limit = entry_limit_reached(shard_trades, config)
+        if limit:
+            reasons.append(f"shard {shard['name']}: {limit}")
+        if shard['keep_until'] is not None:
+            forced = [trade for trade in shard_trades
+                      if trade['open_timestamp'] < shard['keep_until'] and trade['exit_reason'] == 'force_exit']
+            if forced:
+                reasons.append(f"shard {shard['name']}: {len(forced)} trades still open at the end of "
+                               "its overlap (raise --overlap-days)")
+    limit = entry_limit_reached(trades, config)
+    if limit:
+        reasons.append(f"merged run: {limit}")
+    overlapping = overlapping_trades(trades)
+    if overlapping:
+        opened = datetime.fromtimestamp(overlapping[0][0] / 1000, tz=timezone.utc)
+        reasons.append(f"{len(overlapping)} trades opened while the pair's trade from the previous "
+                       f"shard was still open (first: {overlapping[0][1]} at {opened:%Y-%m-%d %H:%M})")
+    return reasons
+
+
+def compare_trades(sharded, serial, rtol=1e-9):
+    """
+    Trade-by-trade comparison of a sharded and a serial run.
+    
+    Returns (only in sharded, only in serial, keys whose profit differs).
+    """
+    a = {trade_key(trade): trade for trade in sharded}
+    b = {trade_key(trade): trade for trade in serial}
+    mismatched = sorted(key for key in a.keys() & b.keys()
+                        if not all(math.isclose(a[key][field], b[key][field], rel_tol=rtol, abs_tol=1e-12)
+                                   for field in ('profit_ratio', 'profit_abs')))
+    return sorted(a.keys() - b.keys()), sorted(b.keys() - a.keys()), mismatched
+
+
+def print_comparison(sharded, serial):
+    only_sharded, only_serial, mismatched = compare_trades(sharded, serial)
+    identical = not (only_sharded or only_serial or mismatched)
+    print("\n" + "="*60)
+    print("  Serial Verification")
+    print("="*60)
+    print(f"Sharded trades: {len(sharded)}  Serial trades: {len(serial)}")
+    if identical:
+        print("✓ Identical trades (pair, open/close time, exit reason, profit)")
+    for label, keys in (("Only in sharded run", only_sharded), ("Only in serial run", only_serial),
+                        ("Different profit", mismatched)):
+        if keys:
+            print(f"✗ {label}: {len(keys)}")
+            for open_ms, pair, close_ms, exit_reason in keys[:10]:
+                opened = datetime.fromtimestamp(open_ms / 1000, tz=timezone.utc)
+                print(f"    {pair:<12} opened {opened:%Y-%m-%d %H:%M}  {exit_reason}")
+    serial_total = math.fsum(trade['profit_abs'] for trade in serial)
+    sharded_total = math.fsum(trade['profit_abs'] for trade in sharded)
+    print(f"Total profit: sharded {sharded_total:.4f}, serial {serial_total:.4f}")
+    return identical
+
+
+def run_sharded(freqtrade_dir, timerange, args):
+    """
+    Backtest independent walk-forward windows (or pair groups) in parallel and
+    merge their trades and day breakdowns into one report. Returns (ok, trades).
+    
+    The merge is only reported as the backtest when it is the serial run's
+    result (see serial_differences); otherwise the run fails, or with
+    --approximate the report is marked as not equivalent.
+    """
+    print("\n" + "="*60)
+    print("  Running Backtest (sharded)")
+    print("="*60)
+    
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    pairs = backtest_pairs(freqtrade_dir, args.pairs)
+    if not pairs:
+        print("✗ ERROR: No pairs with 5m data found!")
+        return False, None
+    
+    blockers = shard_blockers(config)
+    if blockers and not args.approximate:
+        print("\n✗ Shards of this config cannot reproduce a serial run:")
+        for reason in blockers:
+            print(f"  - {reason}")
+        print("  Use a fixed stake_amount, run without --sharded, or pass --approximate to merge anyway")
+        return False, None
+    
+    workers = plan_workers(args.threads_per_job, args.memory_per_job, args.jobs)
+    shard_count = args.shards or workers
+    window_days = config['freqai'].get('backtest_period_days', 7)
+    # Cached windows are only valid in runs their results do not depend on
+    cache, keys = open_cache(freqtrade_dir, config, pairs, args) if not blockers else (None, None)
+    cached = []
+    # The range that is run; with the cache its start is moved onto the window grid,
+    # and trades opened before the requested start are dropped again after the run
+    run_timerange = timerange
+    if args.shard_by == 'pairs':
+        shards = plan_pair_shards(timerange, pairs, shard_count)
+    elif cache is not None:
+        run_timerange = align_start(timerange, window_days)
+        cached, shards = plan_cached_window_shards(run_timerange, window_days, shard_count, args.overlap_days,
+                                                   cache, keys)
+    else:
+        shards = plan_window_shards(timerange, window_days, shard_count, args.overlap_days)
+    start_ms = timerange_ms(timerange)[0]
+    
+    jobs = build_shard_jobs(freqtrade_dir, shards, pairs, args.threads_per_job)
+    serial_job = None
+    if args.verify_serial:
+        serial_shard = {'id': f"serial-{run_timerange}", 'name': 'serial (verification)',
+                        'run_timerange': run_timerange}
+        serial_job = build_shard_jobs(freqtrade_dir, [serial_shard], pairs, args.threads_per_job)[0]
+    
+    print(f"\nTimerange: {timerange}  Pairs: {len(pairs)}  Shards: {len(shards)} by {args.shard_by}")
+    if run_timerange != timerange:
+        print(f"Run from {run_timerange.split('-')[0]} so windows match cached runs; "
+              f"trades opened before {timerange.split('-')[0]} are left out")
+    if cache is not None and args.shard_by == 'windows':
+        print(f"Windows: {len(cached)} cached, {sum(len(shard['windows']) for shard in shards)} to run")
+    print(f"Workers: {workers} x {args.threads_per_job} threads")
+    print(f"Job logs: {freqtrade_dir / 'user_data' / 'backtest_jobs'}")
+    print("\n" + "-"*60 + "\n")
+    
+    start_time = datetime.now()
+    # The serial run goes first: it is the longest job
+    run_jobs(([serial_job] if serial_job else []) + jobs, workers, args.threads_per_job, args.memory_per_job)
+    wall = (datetime.now() - start_time).total_seconds()
+    
+    results = [load_job_trades(job) if job.ok else None for job in jobs]
+    failed = [job for job, trades in zip(jobs, results) if trades is None]
+    if failed:
+        print(f"\n✗ {len(failed)} shards failed:")
+        for job in failed:
+            print(f"  - {job.name}: {job.log_path}")
+        return False, None
+    
+    merged = merge_trades([(trades, shard['keep_until']) for trades, shard in zip(results, shards)]
+                          + [(trades, None) for trades in cached])
+    differences = serial_differences(config, shards, results, merged)
+    trades = [trade for trade in merged if trade['open_timestamp'] >= start_ms]
+    breakdown = day_breakdown(trades)
+    # Only windows of a run equivalent to the serial one are valid in other runs
+    if cache is not None and not differences:
+        for shard in shards:
+            store_windows(cache, keys, shard, merged, timerange_ms(run_timerange)[1])
+        cache.evict()
+    
+    report_path = freqtrade_dir / 'user_data' / 'backtest_results' / f"backtest-sharded-{timerange}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps({
+        'strategy': STRATEGY,
+        'timerange': timerange,
+        'run_timerange': run_timerange,
+        'shard_by': args.shard_by,
+        'equivalent_to_serial': not differences,
+        'serial_differences': differences,
+        'shards': [{'timerange': shard['timerange'], 'run_timerange': shard['run_timerange'],
+                    'pairs': shard.get('pairs', pairs), 'log': str(job.log_path)}
+                   for shard, job in zip(shards, jobs)],
+        'trades': trades,
+        'periodic_breakdown': {'day': breakdown},
+    }, indent=2))
+    
+    if differences:
+        print(f"\n{'⚠' if args.approximate else '✗'} The merged trades may differ from a serial run:")
+        for reason in differences:
+            print(f"  - {reason}")
+        if not args.approximate:
+            print(f"  Not reported as the backtest (marked in {report_path.name}); "
+                  "run without --sharded, or pass --approximate")
+            return False, None
+    
+    print("\n" + "="*60)
+    print(f"  Backtest Complete! ({format_duration(wall)})" if not differences
+          else f"  Backtest Complete, APPROXIMATE ({format_duration(wall)})")
+    print("="*60)
+    print_report(trades, breakdown, config.get('stake_currency', ''))
+    print(f"\nMerged report: {report_path}")
+    if cache is not None:
+        print(cache.summary())
+    
+    if serial_job is None:
+        return True, trades
+    serial_trades = load_job_trades(serial_job) if serial_job.ok else None
+    if serial_trades is None:
+        print(f"\n✗ Serial verification run failed: {serial_job.log_path}")
+        return False, trades
+    serial_trades = [trade for trade in serial_trades if trade['open_timestamp'] >= start_ms]
+    return print_comparison(trades, serial_trades), trades
+
+
+def run_serial(freqtrade_dir, timerange, args):
+    """
+    run_backtest(), answered from the result cache when nothing changed since
+    a previous run. Returns (ok, trades).
+    """
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    span = timerange_ms(timerange)
+    # freqtrade resolves the pairlist itself, so the run's key covers the pairs its
+    # last run of this setup traded (recorded from the export), not the pairs with data
+    cache, keys = open_cache(freqtrade_dir, config, [], args)
+    if cache is not None:
+        pairs = cache.get(keys.key(*span, 'run pairs'))
+        trades = None if pairs is None else cache.get(CacheKeys(freqtrade_dir, config, pairs).key(*span, 'run'))
+        if trades is not None:
+            print(f"\n✓ Cached result for {timerange} (strategy, config and data of {len(pairs)} pairs unchanged)")
+            print_report(trades, day_breakdown(trades), config.get('stake_currency', ''))
+            print(cache.summary())
+            return True, trades
+    
+    started = datetime.now().timestamp()
+    if not run_backtest(freqtrade_dir, timerange):
+        return False, None
+    
+    export = latest_export(freqtrade_dir, started)
+    trades = None if export is None else load_export_trades(export)
+    if cache is not None:
+        if trades is not None:
+            pairs = load_export_pairlist(export)
+            cache.put(keys.key(*span, 'run pairs'), pairs, f"pairs of run {timerange}")
+            cache.put(CacheKeys(freqtrade_dir, config, pairs).key(*span, 'run'), trades, f"run {timerange}")
+            cache.evict()
+        print(cache.summary())
+    return True, trades
+
+
+def latest_export(freqtrade_dir, since):
+    """freqtrade's latest backtest export (its .last_result.json), if it was written after `since` (epoch seconds)"""
+    latest = freqtrade_dir / 'user_data' / 'backtest_results' / '.last_result.json'
+    if not latest.exists() or latest.stat().st_mtime < since:
+        return None
+    return latest
+
+
+def load_export_pairlist(path):
+    """Pairs a freqtrade backtest export ran with, as resolved by its pairlist"""
+    path = Path(path)
+    result = json.loads(path.read_text())
+    if 'latest_backtest' in result:
+        return load_export_pairlist(path.parent / result['latest_backtest'])
+    return result['strategy'][STRATEGY]['pairlist']
+
+
+def load_export_trades(path):
+    """
+    Trades of a backtest export: a freqtrade result file (or its
+    .last_result.json pointer), a merged sharded report or a vector backtest report
+    """
+    path = Path(path)
+    result = json.loads(path.read_text())
+    if 'latest_backtest' in result:
+        return load_export_trades(path.parent / result['latest_backtest'])
+    if isinstance(result.get('strategy'), dict):
+        return result['strategy'][STRATEGY]['trades']
+    return result['trades']
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -124,14 +811,48 @@ Examples:
   python backtest.py --period 3m    # Test last 3 months
   python backtest.py --period 6m    # Test last 6 months
   python backtest.py --period 1y    # Test last year
+  python backtest.py --period 3m 6m 1y                      # One run, periods compared side by side
+  python backtest.py --timerange 20240101-20240401 20240401-20240701
+  python backtest.py --period 1y --sharded                  # Walk-forward windows in parallel
+  python backtest.py --period 1y --sharded --verify-serial  # Also run serially and compare
+  python backtest.py --period 3m --sharded --shard-by pairs # Pair groups in parallel
+  python backtest.py --period 1y --sharded --approximate    # Merge even if shards depend on each other
+  python backtest.py --period 1y --no-cache                 # Ignore cached results
         """
     )
     parser.add_argument(
         '--period',
+        nargs='+',
         choices=['3m', '6m', '1y'],
-        default='3m',
-        help='Period to backtest (default: 3m)'
+        help='Periods to backtest, compared side by side when several (default: 3m)'
     )
+    parser.add_argument('--timerange', nargs='+', type=timerange_arg,
+                        help='Timeranges to backtest (YYYYMMDD-YYYYMMDD), alone or with --period')
+    parser.add_argument('--sharded', action='store_true',
+                        help='Split the backtest into shards run in parallel and merge the results')
+    parser.add_argument('--shard-by', choices=['windows', 'pairs'], default='windows',
+                        help='Shard by walk-forward windows or by pair groups (default: windows)')
+    parser.add_argument('--shards', type=int,
+                        help='Number of shards (default: number of workers)')
+    parser.add_argument('--overlap-days', type=float, default=1,
+                        help='Days each window shard runs past its end to close open trades (default: 1)')
+    parser.add_argument('--verify-serial', action='store_true',
+                        help='Also run the whole timerange serially and compare the trades')
+    parser.add_argument('--approximate', action='store_true',
+                        help='Merge shards even when they cannot reproduce a serial run (report marked as such)')
+    parser.add_argument('--pairs', nargs='+',
+                        help='Pairs to backtest when sharded (default: all pairs with 5m data)')
+    parser.add_argument('--jobs', type=int,
+                        help='Maximum parallel jobs (default: cores / threads-per-job)')
+    parser.add_argument('--threads-per-job', type=int, default=2,
+                        help='CPU threads per backtest job (default: 2)')
+    parser.add_argument('--memory-per-job', type=float, default=0,
+                        help='Virtual memory (RLIMIT_DATA) cap per job in GB, also caps workers '
+                             'at RAM / this; allow for reserved but unused memory (default: no limit)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always rerun instead of reusing cached results')
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_MAX_MB,
+                        help=f'Size cap of the result cache in MB (default: {DEFAULT_MAX_MB})')
     
     args = parser.parse_args()
     
@@ -148,11 +869,28 @@ Examples:
         print("  Please ensure the strategy file exists.")
         sys.exit(1)
     
-    # Calculate timerange
-    timerange = calculate_timerange(args.period)
+    # Calculate timeranges: one run over all of them, sliced per period afterwards
+    periods = requested_periods(args.period, args.timerange)
+    timerange = spanning_timerange([period_timerange for _, period_timerange in periods])
+    if len(periods) > 1:
+        print(f"Periods: {', '.join(label for label, _ in periods)} (one run over {timerange})")
+    check_data_coverage(freqtrade_dir, timerange)
     
     # Run backtest
-    if not run_backtest(freqtrade_dir, timerange):
+    if args.sharded or args.verify_serial:
+        ok, trades = run_sharded(freqtrade_dir, timerange, args)
+    else:
+        ok, trades = run_serial(freqtrade_dir, timerange, args)
+    
+    if ok and len(periods) > 1:
+        if trades is None:
+            print("\n✗ No exported trades found, cannot compare the periods")
+            ok = False
+        else:
+            config = json.loads((freqtrade_dir / 'config.json').read_text())
+            print_period_table(periods, trades, config.get('stake_currency', ''))
+    
+    if not ok:
         print("\nFor help interpreting results, see: docs/BACKTEST_GUIDE.md")
         sys.exit(1)
     
@@ -0,0 +1,193 @@
+"""
+Backtest Result Cache
+=====================
+
+Content-addressed cache of backtest trades, under user_data/backtest_cache/.
+
+An entry's key is a hash of everything its trades depend on:
+- the strategy code: MLScalpingStrategy.py, the mlscalping package and the
+  FreqAI model classes
+- the config, minus sections that cannot change a backtest (credentials,
+  Telegram, API server, thread counts)
+- the pairs, and for every pair and timeframe the range of candle data the
+  run reads (first/last candle and gaps inside its training + backtest
+  span, taken from the candle index), so new candles appended after the
+  span do not invalidate it
+- the timerange, and for a window the trades still open when it starts
+
+backtest.py caches whole serial runs, and single FreqAI backtest windows
+of sharded runs that reproduce the serial run, so a later timerange
+reuses the windows it shares with earlier runs from the same start
+state. Hits refresh an entry's mtime; once the cache grows past its size
+cap the least recently used entries are removed.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from candle_data import TIMEFRAME_MS
+from candle_index import DAY_MS, entries, refresh
+
+
+DEFAULT_MAX_MB = 256
+
+# Config keys that never change a backtest's trades
+IGNORED_CONFIG_KEYS = ['api_server', 'telegram', 'bot_name', 'initial_state', 'internals',
+                       'db_url', 'force_entry_enable', 'dataformat_ohlcv', 'dataformat_trades']
+IGNORED_EXCHANGE_KEYS = ['key', 'secret', 'password', 'uid', 'ccxt_config', 'ccxt_async_config', 'sandbox']
+IGNORED_FREQAI_KEYS = ['data_kitchen_thread_count', 'identifier']
+
+
+def cache_root(freqtrade_dir):
+    return Path(freqtrade_dir) / 'user_data' / 'backtest_cache'
+
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def code_digest(freqtrade_dir):
+    """Hash of the strategy, its mlscalping package and the FreqAI model classes"""
+    user_data = Path(freqtrade_dir) / 'user_data'
+    files = ([user_data / 'strategies' / 'MLScalpingStrategy.py']
+             + sorted((user_data / 'strategies' / 'mlscalping').glob('*.py'))
+             + sorted((user_data / 'freqaimodels').glob('*.py')))
+    digest = hashlib.sha256()
+    for path in files:
+        if path.exists():
+            digest.update(path.name.encode() + b'\0' + path.read_bytes() + b'\0')
+    return digest.hexdigest()
+
+
+def relevant_config(config):
+    """Copy of the config without the keys that cannot change a backtest"""
+    config = copy.deepcopy(config)
+    for key in IGNORED_CONFIG_KEYS:
+        config.pop(key, None)
+    for key in IGNORED_EXCHANGE_KEYS:
+        config.get('exchange', {}).pop(key, None)
+    freqai = config.get('freqai', {})
+    for key in IGNORED_FREQAI_KEYS:
+        freqai.pop(key, None)
+    freqai.get('model_training_parameters', {}).pop('n_jobs', None)
+    return config
+
+
+def data_ranges(index, pairs, timeframes, start_ms, end_ms):
+    """
+    {'PAIR tf': [first, last, gaps]} of the candles inside [start_ms, end_ms)
+    per pair and timeframe; None when the index has no file for it
+    """
+    by_name = {(entry['pair'], entry['timeframe']): entry for entry in entries(index)}
+    ranges = {}
+    for pair in pairs:
+        for timeframe in timeframes:
+            entry = by_name.get((pair, timeframe))
+            if entry is None or not entry['rows'] or entry['first'] >= end_ms or entry['last'] < start_ms:
+                ranges[f"{pair} {timeframe}"] = None
+                continue
+            gaps = [gap for gap in entry['gaps'] if gap[1] > start_ms and gap[0] < end_ms]
+            ranges[f"{pair} {timeframe}"] = [max(entry['first'], start_ms), min(entry['last'], end_ms), gaps]
+    return ranges
+
+
+class CacheKeys:
+    """Cache keys for one backtest setup (code, config, pairs) over any timerange"""
+
+    def __init__(self, freqtrade_dir, config, pairs, startup_candles=200):
+        freqai = config.get('freqai', {})
+        features = freqai.get('feature_parameters', {})
+        self.pairs = sorted(set(pairs) | set(features.get('include_corr_pairlist', [])))
+        self.timeframes = sorted(set(features.get('include_timeframes', [])) | {config.get('timeframe', '5m')},
+                                 key=TIMEFRAME_MS.get)
+        self.lead_ms = int(freqai.get('train_period_days', 0) * DAY_MS)
+        self.startup_candles = startup_candles
+        self.index = refresh(freqtrade_dir)
+        self.setup = _digest(code_digest(freqtrade_dir), relevant_config(config), sorted(pairs))
+
+    def key(self, start_ms, end_ms, kind, state=None):
+        """
+        Key of the `kind` ('run' or 'window') result for [start_ms, end_ms),
+        starting from `state` (e.g. the trades open at start_ms)
+        """
+        ranges = {}
+        for timeframe in self.timeframes:
+            # Training data and startup candles before the start are read too
+            first = start_ms - self.lead_ms - self.startup_candles * TIMEFRAME_MS[timeframe]
+            ranges.update(data_ranges(self.index, self.pairs, [timeframe], first, end_ms))
+        return _digest(self.setup, ranges, start_ms, end_ms, kind, state)[:32]
+
+
+class BacktestCache:
+    """Trade lists on disk, one JSON file per key, capped at max_bytes (LRU by mtime)"""
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_MB * 1024 ** 2):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+    def _path(self, key):
+        return self.root / f"{key}.json"
+
+    def get(self, key):
+        """Cached trades for the key, or None"""
+        path = self._path(key)
+        try:
+            trades = json.loads(path.read_text())['trades']
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)  # Recently used: evicted last
+        self.hits += 1
+        return trades
+
+    def put(self, key, trades, description=''):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({'description': description, 'created': time.time(), 'trades': trades}))
+        os.replace(tmp, path)
+        self.stored += 1
+
+    def size(self):
+        return sum(path.stat().st_size for path in self.root.glob('*.json')) if self.root.exists() else 0
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        if not self.root.exists():
+            return 0
+        files = sorted(self.root.glob('*.json'), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        removed = 0
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stored': self.stored,
+            'evicted': self.evicted,
+        }
+
+    def summary(self):
+        """One-line report, e.g. for the end of a backtest"""
+        return (f"Cache: {self.hits} hits, {self.misses} misses, {self.stored} stored, "
+                f"{self.evicted} evicted ({self.size() / 1024 ** 2:.1f} of {self.max_bytes / 1024 ** 2:.0f} MB)")
@@ -0,0 +1,1109 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+======================
+
+Micro-benchmarks for the performance-sensitive parts of the strategy.
+Each benchmark runs on synthetic candles so no downloaded data is needed.
+
+Usage:
+    python benchmark.py incremental         # Streamed live indicators vs a TA-Lib recompute
+    python benchmark.py compact             # Model decisions on float64 vs compact features
+    python benchmark.py daycache            # Feature day cache vs a cold compute of each window
+    python benchmark.py labels              # Label kernel vs pandas, 1 year of 5m candles
+    python benchmark.py labels --days 30    # Shorter series
+    python benchmark.py live                # Live fast-path signals vs the full-vector rules
+    python benchmark.py outliers            # Outlier filters vs FreqAI's SVM step
+    python benchmark.py di                  # Indexed DI vs brute force, with tolerance check
+    python benchmark.py store               # Candle file loading: freqtrade, load_candles, memory map
+    python benchmark.py vector              # Vectorized backtest vs a candle-by-candle loop
+    python benchmark.py montecarlo          # Batched Monte Carlo runs vs a per-run loop
+"""
+
+import json
+import math
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+# Strategy helpers live next to the strategy
+sys.path.insert(0, str(get_freqtrade_dir() / 'user_data' / 'strategies'))
+
+
+def print_header(title):
+    """Print a section header"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def synthetic_candles(days, timeframe_minutes=5, seed=42, volatility=0.002):
+    """Random-walk OHLCV dataframe covering `days` days"""
+    rng = np.random.default_rng(seed)
+    count = days * 24 * 60 // timeframe_minutes
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, count)))
+    spread = rng.random(count) * 0.003
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=count, freq=f'{timeframe_minutes}min', tz='UTC'),
+        'open': np.r_[close[0], close[:-1]],
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'volume': rng.random(count) * 1000,
+    })
+
+
+def best_time(func, repeat):
+    """Best wall time of `repeat` runs, and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_incremental(args):
+    """Streamed live indicators vs a full TA-Lib recompute"""
+    import talib
+    from mlscalping.incremental import INDICATOR_COLUMNS, IncrementalIndicatorEngine
+
+    print_header("Incremental Indicator Benchmark")
+    dataframe = synthetic_candles(args.days)
+    window, steps = args.window, args.steps
+    if len(dataframe) < window + steps:
+        print(f"✗ {args.days} days hold fewer than window + steps = {window + steps:,} candles")
+        return False
+    print(f"Window: {window:,} candles  Streamed: {steps:,} candles (5m)\n")
+
+    def recompute(frame):
+        high, low = frame['high'].to_numpy(), frame['low'].to_numpy()
+        close = frame['close'].to_numpy()
+        macd, macdsignal, _ = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+        mid = frame['close'].rolling(20, min_periods=1).mean().to_numpy()
+        std = frame['close'].rolling(20, min_periods=1).std().to_numpy()
+        return np.column_stack([
+            talib.RSI(close, timeperiod=14), macd, macdsignal,
+            mid - 2 * std, mid, mid + 2 * std,
+            talib.EMA(close, timeperiod=8), talib.EMA(close, timeperiod=21),
+            frame['volume'].rolling(20).mean().to_numpy(),
+            talib.ATR(high, low, close, timeperiod=14),
+        ])
+
+    # Live: freqtrade hands over the newest `window` candles every cycle
+    engine = IncrementalIndicatorEngine()
+    engine.update('BTC/USDT', '5m', dataframe.iloc[:window])
+    streamed = []
+    start = time.perf_counter()
+    for end in range(window + 1, window + steps + 1):
+        streamed.append(engine.update('BTC/USDT', '5m', dataframe.iloc[end - window:end]).to_numpy()[-1])
+    stream_time = (time.perf_counter() - start) / steps
+    recompute_time, _ = best_time(lambda: recompute(dataframe.iloc[steps:window + steps]), args.repeat)
+
+    # The stream carries state from the first candle, so recompute over the whole history
+    expected = recompute(dataframe.iloc[:window + steps])[-steps:]
+    streamed = np.array(streamed)
+    errors = {}
+    for i, column in enumerate(INDICATOR_COLUMNS):
+        same_nan = np.array_equal(np.isnan(expected[:, i]), np.isnan(streamed[:, i]))
+        scale = np.maximum(np.abs(expected[:, i]), 1.0)
+        errors[column] = np.nanmax(np.abs(streamed[:, i] - expected[:, i]) / scale) if same_nan else math.inf
+
+    print(f"{'':28}{'recompute':>10}{'stream':>10}{'speedup':>10}")
+    print("-"*58)
+    print(f"{'per candle':28}{recompute_time * 1000:>8.2f}ms{stream_time * 1000:>8.2f}ms"
+          f"{recompute_time / stream_time:>9.1f}x")
+    print(f"\n{'column':<16}{'max rel error':>14}")
+    for column, error in errors.items():
+        print(f"{column:<16}{error:>14.1e}")
+    matches = all(error <= args.tolerance for error in errors.values())
+    print(f"\n{'✓' if matches else '✗'} Last {steps:,} streamed rows {'match' if matches else 'DIFFER from'} "
+          f"the TA-Lib recompute (tolerance {args.tolerance:g})")
+    return matches
+
+
+def bench_batch(args):
+    """Per-candle cost of the shared indicators for growing pairlists: per pair, full panel, panel tail"""
+    from mlscalping.batch_features import PanelIndicators, compute_panel_indicators, pair_view, stack_ohlcv
+    from mlscalping.indicator_cache import (
+        RSI_14, MACD_12_26_9, BBANDS_20_2, EMA_8, EMA_21, ATR_14, VOLUME_MEAN_20, compute_indicator,
+    )
+
+    print_header("Batched Indicator Benchmark")
+    specs = [RSI_14, MACD_12_26_9, BBANDS_20_2, EMA_8, EMA_21, ATR_14, VOLUME_MEAN_20]
+    window, steps = args.window, args.steps
+    frames = {f"PAIR{index}/USDT": synthetic_candles(args.days, seed=42 + index) for index in range(max(args.pairs))}
+    if len(next(iter(frames.values()))) < window + steps:
+        print(f"✗ {args.days} days hold fewer than window + steps = {window + steps:,} candles")
+        return False
+    print(f"Window: {window:,} candles  Candles timed: {steps:,} (5m)\n")
+
+    def flatten(results):
+        return {(spec, name): values for spec, value in results.items()
+                for name, values in (value.items() if isinstance(value, dict) else [(None, value)])}
+
+    timings = {}
+    matches = True
+    for count in args.pairs:
+        names = list(frames)[:count]
+        # Live: freqtrade hands over the newest `window` candles of every pair each cycle
+        cycles = [{pair: frames[pair].iloc[end - window:end] for pair in names}
+                  for end in range(window, window + steps + 1)]
+        sample = cycles[-args.repeat:]
+
+        per_pair_time, _ = best_time(lambda: [compute_indicator(df, spec) for dataframes in sample
+                                              for df in dataframes.values() for spec in specs], 1)
+        panel_time, _ = best_time(lambda: [PanelIndicators().update(dataframes) for dataframes in sample], 1)
+        panel = PanelIndicators()
+        panel.update(cycles[0])
+        start = time.perf_counter()
+        for dataframes in cycles[1:]:
+            pairs, _, results, _ = panel.update(dataframes)
+        tail_time = (time.perf_counter() - start) / steps
+        timings[count] = (per_pair_time / len(sample), panel_time / len(sample), tail_time)
+
+        # The tail carries state from the first panel, so recompute over the whole history
+        history, _ = stack_ohlcv({pair: frames[pair].iloc[:window + steps] for pair in names})
+        expected = flatten(compute_panel_indicators(history))
+        tail_ok = panel.full_recomputes == 1 and panel.tail_updates == steps
+        for key, values in flatten(results).items():
+            reference = expected[key][-window:]
+            same_nan = np.array_equal(np.isnan(values), np.isnan(reference))
+            scale = np.maximum(np.abs(reference), 1.0)
+            tail_ok = tail_ok and same_nan and np.nanmax(np.abs(values - reference) / scale) <= args.tolerance
+        # The full panel re-seeds on the window like TA-Lib does per pair
+        dataframes = cycles[-1]
+        full = PanelIndicators().update(dataframes)[2]
+        panel_ok = True
+        for column, pair in enumerate(pairs):
+            for spec, value in pair_view(full, column).items():
+                single = compute_indicator(dataframes[pair], spec)
+                for name, values in (value.items() if isinstance(value, dict) else [(None, value)]):
+                    reference = single[name] if name else single
+                    scale = np.maximum(np.abs(reference), 1.0)
+                    panel_ok = panel_ok and np.array_equal(np.isnan(values), np.isnan(reference)) and (
+                        np.nanmax(np.abs(values - reference) / scale) <= args.tolerance)
+        timings[count] += (tail_ok, panel_ok)
+        matches = matches and tail_ok and panel_ok
+
+    print(f"{'pairs':>6}{'per pair':>11}{'panel':>11}{'tail':>11}{'speedup':>10}{'tail/pair':>12}")
+    print("-"*61)
+    for count, (per_pair, full, tail, _, _) in timings.items():
+        print(f"{count:>6}{per_pair * 1000:>9.2f}ms{full * 1000:>9.2f}ms{tail * 1000:>9.2f}ms"
+              f"{per_pair / tail:>9.1f}x{tail / count * 1e6:>10.1f}us")
+    first, last = min(timings), max(timings)
+    print(f"\nPer-candle cost from {first} to {last} pairs ({last / first:g}x the pairs): "
+          + ", ".join(f"{name} {timings[last][i] / timings[first][i]:.1f}x"
+                      for i, name in enumerate(['per pair', 'panel', 'tail'])))
+
+    for count, (_, _, _, tail_ok, panel_ok) in timings.items():
+        print(f"{'✓' if panel_ok else '✗'} {count} pairs: full panel {'matches' if panel_ok else 'DIFFERS from'} "
+              f"TA-Lib per pair (tolerance {args.tolerance:g})")
+        print(f"{'✓' if tail_ok else '✗'} {count} pairs: tail updates {'match' if tail_ok else 'DIFFER from'} "
+              f"a panel over the whole history")
+    return matches
+
+
+def load_strategy(runmode, **settings):
+    """MLScalpingStrategy with config.json, for checks that run the strategy's own code"""
+    from freqtrade.data.dataprovider import DataProvider
+    from freqtrade.enums import RunMode
+    from MLScalpingStrategy import MLScalpingStrategy
+
+    config = json.loads((get_freqtrade_dir() / 'config.json').read_text())
+    config.update(runmode=RunMode(runmode), user_data_dir=str(get_freqtrade_dir() / 'user_data'))
+    strategy = MLScalpingStrategy(config)
+    for name, value in settings.items():
+        setattr(strategy, name, value)
+    strategy.dp = DataProvider(config, None)
+    strategy.freqai_info = config['freqai']
+    strategy.bot_start()
+    return strategy
+
+
+def strategy_indicators(dataframe):
+    """The columns populate_indicators adds in backtesting, from the same indicator specs"""
+    from mlscalping.indicator_cache import (ATR_14, BBANDS_20_2, EMA_8, EMA_21, MACD_12_26_9, RSI_14,
+                                            VOLUME_MEAN_20, compute_indicator)
+
+    dataframe = dataframe.copy()
+    macd = compute_indicator(dataframe, MACD_12_26_9)
+    bollinger = compute_indicator(dataframe, BBANDS_20_2)
+    dataframe['rsi'] = compute_indicator(dataframe, RSI_14)
+    dataframe['macd'], dataframe['macdsignal'] = macd['macd'], macd['macdsignal']
+    dataframe['bb_lowerband'] = bollinger['lower']
+    dataframe['bb_middleband'] = bollinger['mid']
+    dataframe['bb_upperband'] = bollinger['upper']
+    dataframe['ema_fast'] = compute_indicator(dataframe, EMA_8)
+    dataframe['ema_slow'] = compute_indicator(dataframe, EMA_21)
+    dataframe['volume_mean_20'] = compute_indicator(dataframe, VOLUME_MEAN_20)
+    dataframe['atr'] = compute_indicator(dataframe, ATR_14)
+    return dataframe
+
+
+def _freqai_features(strategy, dataframe, metadata, shifted_candles):
+    """
+    Feature frame built like FreqAI does for one timeframe: the strategy's
+    expand_all and expand_basic features, shifted copies, then feature_engineering_standard
+    """
+    dataframe = strategy.feature_engineering_expand_all(dataframe.copy(), 10, metadata)
+    dataframe = strategy.feature_engineering_expand_basic(dataframe, metadata)
+    features = [column for column in dataframe.columns if column.startswith('%-')]
+    shifted = [dataframe[features].shift(shift).add_suffix(f'_shift-{shift}') for shift in range(1, shifted_candles + 1)]
+    dataframe = pd.concat([dataframe] + shifted, axis=1)
+    return strategy.feature_engineering_standard(dataframe, metadata)
+
+
+def _freqai_predictions(features, targets, train_rows, freqai):
+    """
+    Train FreqAI's data pipeline and a LightGBM classifier on the first
+    `train_rows` rows, as LightGBMScalpingClassifier does, then predict the
+    rest: (labels, do_predict, DI_values)
+    """
+    import datasieve.transforms as ds
+    from datasieve.pipeline import Pipeline
+    from datasieve.transforms import SKLearnWrapper
+    from lightgbm import LGBMClassifier
+    from mlscalping.feature_store import float64_features
+    from sklearn.preprocessing import MinMaxScaler
+
+    features = float64_features(features)
+    columns = [column for column in features.columns if column.startswith('%-')]
+    parameters = freqai['feature_parameters']
+    # FreqAI drops training rows with NaNs and zero-fills them for prediction (do_predict 0)
+    train = features.iloc[:train_rows][columns].replace([np.inf, -np.inf], np.nan)
+    keep = (train.notna().all(axis=1) & targets.iloc[:train_rows].notna()).to_numpy()
+    X, y = train[keep], targets.iloc[:train_rows][keep].to_frame()
+    fit_rows = int(len(X) * (1 - freqai['data_split_parameters']['test_size']))
+
+    pipeline = Pipeline([
+        ('const', ds.VarianceThreshold(threshold=0)),
+        ('scaler', SKLearnWrapper(MinMaxScaler(feature_range=(-1, 1)))),
+        ('svm', ds.SVMOutlierExtractor(shuffle=False, nu=0.01)),
+        ('di', ds.DissimilarityIndex(di_threshold=parameters['DI_threshold'], n_jobs=1)),
+    ])
+    X_fit, y_fit, _ = pipeline.fit_transform(X.iloc[:fit_rows], y.iloc[:fit_rows], np.ones(fit_rows))
+    model = LGBMClassifier(**dict(freqai['model_training_parameters'], n_estimators=200))
+    model.fit(X_fit, y_fit.iloc[:, 0])
+
+    predict = features.iloc[train_rows:][columns].replace([np.inf, -np.inf], np.nan)
+    missing = predict.isna().any(axis=1).to_numpy()
+    X_predict, outliers, _ = pipeline.transform(predict.fillna(0), outlier_check=True)
+    do_predict = np.where(missing, 0, outliers)
+    return model.predict(X_predict), do_predict, pipeline['di'].di_values
+
+
+def bench_compact(args):
+    """Model decisions trained on float64 features vs the compact float32/int8 store"""
+    from freqtrade.enums import RunMode
+
+    print_header("Compact Feature Store Check")
+    candles = strategy_indicators(synthetic_candles(args.days))
+    metadata = {'pair': 'BTC/USDT', 'tf': '5m'}
+    train_rows = int(len(candles) * args.train_share)
+    results = {}
+    for name, compact in [('float64', False), ('compact', True)]:
+        strategy = load_strategy(RunMode.BACKTEST, compact_feature_store=compact, use_feature_day_cache=False)
+        shifted = strategy.config['freqai']['feature_parameters'].get('include_shifted_candles', 0)
+        start = time.perf_counter()
+        features = _freqai_features(strategy, candles, metadata, shifted)
+        targets = strategy.set_freqai_targets(candles.copy(), metadata)['&-s_target']
+        predicted, do_predict, di_values = _freqai_predictions(features, targets, train_rows,
+                                                               strategy.config['freqai'])
+        seconds = time.perf_counter() - start
+
+        # Entry and exit rules of the strategy on the predicted rows
+        frame = candles.iloc[train_rows:].copy()
+        frame['do_predict'], frame['DI_values'] = do_predict, di_values
+        # The part of the entry rule that reads the model: do_predict == 1 and DI_values > 0.5
+        ml_gate = np.logical_and.reduce(strategy._entry_conditions(frame)[:2])
+        frame = strategy.populate_entry_trend(frame, metadata)
+        frame = strategy.populate_exit_trend(frame, metadata)
+        results[name] = {
+            'seconds': seconds,
+            'bytes': sum(features[c].nbytes for c in features.columns if c.startswith('%-')),
+            'labels': predicted,
+            'do_predict': do_predict,
+            'ml_gate': ml_gate,
+            'enter_long': frame.get('enter_long', pd.Series(np.nan, index=frame.index)).fillna(0).to_numpy(),
+            'exit_long': frame.get('exit_long', pd.Series(np.nan, index=frame.index)).fillna(0).to_numpy(),
+            'features': sum(c.startswith('%-') for c in features.columns),
+        }
+
+    expected, result = results['float64'], results['compact']
+    rows = len(expected['do_predict'])
+    print(f"Candles: {len(candles):,} ({args.days} days of 5m)  Features: {expected['features']}  "
+          f"Predicted rows: {rows:,}\n")
+    print(f"{'':12}{'features':>12}{'train+predict':>15}{'do_predict=1':>14}{'ML gate':>9}"
+          f"{'entries':>9}{'exits':>7}")
+    print("-"*78)
+    for name, run in results.items():
+        print(f"{name:<12}{run['bytes'] / 1e6:>10.1f}MB{run['seconds']:>14.1f}s"
+              f"{int((run['do_predict'] == 1).sum()):>14,}{int(run['ml_gate'].sum()):>9,}"
+              f"{int(run['enter_long'].sum()):>9,}{int(run['exit_long'].sum()):>7,}")
+    print("\nML gate: rows passing the model part of the entry rule (do_predict == 1, DI_values > 0.5)")
+
+    same = {name: np.array_equal(expected[name], result[name])
+            for name in ['do_predict', 'ml_gate', 'enter_long', 'exit_long']}
+    label_agreement = np.mean(expected['labels'] == result['labels'])
+    print(f"Model labels agree on {label_agreement:.2%} of rows (the entry/exit rules do not read them)\n")
+    for name, equal in same.items():
+        print(f"{'✓' if equal else '✗'} {name} {'identical' if equal else 'DIFFERS'} with compact features")
+    return all(same.values())
+
+
+def bench_daycache(args):
+    """Fixed features from a warm day-block cache vs a cold compute of each window"""
+    import tempfile
+    from freqtrade.enums import RunMode
+    from mlscalping.day_cache import DayBlockCache
+
+    print_header("Feature Day Cache Check")
+    candles = synthetic_candles(args.days)
+    metadata = {'pair': 'BTC/USDT', 'tf': '5m'}
+    cold = load_strategy(RunMode.BACKTEST, use_feature_day_cache=False)
+    warm = load_strategy(RunMode.BACKTEST, use_feature_day_cache=True)
+    warmup = warm.feature_cache_warmup_candles
+    per_day = 24 * 12
+    window = args.window * per_day
+    starts = range(0, len(candles) - window + 1, args.step * per_day)
+    print(f"Candles: {len(candles):,} ({args.days} days of 5m)  Windows: {len(starts)} x {args.window} days, "
+          f"every {args.step} days  Warmup: {warmup:,} candles\n")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        warm.feature_day_cache = DayBlockCache(cache_dir)
+        # Seed the cache from the whole series, so cached days carry more history than any window
+        warm._build_fixed_features(candles, metadata)
+
+        print(f"{'window':<24}{'cold':>9}{'warm':>9}{'day hits':>10}{'warmup rows':>13}{'max rel error':>15}")
+        print("-"*80)
+        matches = True
+        for start in starts:
+            frame = candles.iloc[start:start + window].reset_index(drop=True)
+            warm.indicator_cache.clear()
+            hits = warm.feature_day_cache.day_hits
+            cold_time, expected = best_time(lambda: cold._build_fixed_features(frame, metadata), 1)
+            warm_time, result = best_time(lambda: warm._build_fixed_features(frame, metadata), 1)
+            hits = warm.feature_day_cache.day_hits - hits
+
+            expected, result = expected[list(result.columns)].to_numpy(), result.to_numpy()
+            # The warmup rows must be exactly what a cold compute gives, NaNs included
+            head_equal = np.array_equal(expected[:warmup], result[:warmup], equal_nan=True)
+            tail_nan = np.array_equal(np.isnan(expected[warmup:]), np.isnan(result[warmup:]))
+            scale = np.maximum(np.abs(expected[warmup:]), 1.0)
+            error = np.nanmax(np.abs(result[warmup:] - expected[warmup:]) / scale) if tail_nan else math.inf
+            ok = head_equal and error <= args.tolerance
+            matches = matches and ok
+            label = f"{frame['date'].iloc[0]:%Y-%m-%d} .. {frame['date'].iloc[-1]:%Y-%m-%d}"
+            print(f"{label:<24}{cold_time:>8.2f}s{warm_time:>8.2f}s{hits:>10}"
+                  f"{'identical' if head_equal else 'DIFFER':>13}{error:>15.1e}")
+
+    print(f"\n{'✓' if matches else '✗'} Warm-cache features {'match' if matches else 'DIFFER from'} a cold compute "
+          f"(warmup rows identical, later rows within {args.tolerance:g})")
+    return matches
+
+
+def bench_labels(args):
+    """Forward-window label kernel vs the original pandas expression"""
+    from mlscalping.labels import forward_max, forward_return_labels
+
+    print_header("Label Kernel Benchmark")
+    dataframe = synthetic_candles(args.days)
+    close = dataframe['close']
+    values = close.to_numpy()
+    horizons = [10, 20, 40]
+    thresholds = [0.005, 0.01, 0.02]
+    print(f"Candles: {len(dataframe):,} ({args.days} days of 5m)")
+    print(f"Horizons: {horizons}  Thresholds: {thresholds}\n")
+
+    def pandas_single():
+        future = close.shift(-20).rolling(20).max()
+        return future, (future / close > 1.01).astype(int)
+
+    def kernel_single():
+        future = forward_max(values, 20)
+        with np.errstate(invalid='ignore'):
+            return future, (future / values > 1.01).astype(int)
+
+    def pandas_grid():
+        labels = {}
+        for horizon in horizons:
+            future = close.shift(-horizon).rolling(horizon).max()
+            for threshold in thresholds:
+                labels[(horizon, threshold)] = (future / close > 1 + threshold).astype(int)
+        return labels
+
+    def kernel_grid():
+        return forward_return_labels(values, horizons, thresholds)[0]
+
+    pandas_time, (expected, _) = best_time(pandas_single, args.repeat)
+    kernel_time, (result, _) = best_time(kernel_single, args.repeat)
+    valid = ~np.isnan(expected.to_numpy())
+    matches = np.array_equal(expected.to_numpy()[valid], result[valid])
+
+    grid_pandas_time, _ = best_time(pandas_grid, args.repeat)
+    grid_kernel_time, _ = best_time(kernel_grid, args.repeat)
+
+    print(f"{'':28}{'pandas':>10}{'kernel':>10}{'speedup':>10}")
+    print("-"*58)
+    print(f"{'20-candle max + label':28}{pandas_time * 1000:>8.1f}ms{kernel_time * 1000:>8.1f}ms"
+          f"{pandas_time / kernel_time:>9.1f}x")
+    print(f"{'3 horizons x 3 thresholds':28}{grid_pandas_time * 1000:>8.1f}ms{grid_kernel_time * 1000:>8.1f}ms"
+          f"{grid_pandas_time / grid_kernel_time:>9.1f}x")
+    print(f"\n{'✓' if matches else '✗'} Kernel output {'matches' if matches else 'DIFFERS from'} "
+          f"the pandas expression")
+    return matches
+
+
+def synthetic_features(rows, features, outlier_fraction, seed=42):
+    """
+    Correlated feature matrix scaled to [-1, 1] like FreqAI's pipeline,
+    with a known set of injected outlier rows
+    """
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, 8))
+    X = latent @ rng.normal(size=(8, features)) + 0.3 * rng.normal(size=(rows, features))
+    outliers = rng.choice(rows, size=int(rows * outlier_fraction), replace=False)
+    X[outliers] += rng.normal(0, 6, size=(len(outliers), features))
+    X = 2 * (X - X.min(axis=0)) / (X.max(axis=0) - X.min(axis=0)) - 1
+    return X, outliers
+
+
+def bench_live_signals(args):
+    """Live fast-path signals on the newest candles vs the full-vector rules"""
+    from freqtrade.enums import RunMode
+
+    print_header("Live Signal Path Check")
+    rng = np.random.default_rng(7)
+    # Volatile enough that the Bollinger width and RSI entry filters pass now and then
+    frame = strategy_indicators(synthetic_candles(args.days, volatility=0.01))
+    frame['do_predict'] = rng.choice([1, 0, -1], size=len(frame), p=[0.8, 0.15, 0.05])
+    frame['DI_values'] = rng.uniform(0.2, 1.0, len(frame))
+    metadata = {'pair': 'BTC/USDT'}
+    full = load_strategy(RunMode.BACKTEST, use_feature_day_cache=False)
+    # Entries are rare on a random walk at the default buy_rsi, so loosen it for both paths
+    full.buy_rsi.value = args.buy_rsi
+    window, steps = args.window, min(args.steps, len(frame) - args.window)
+    print(f"Window: {window:,} candles  Cycles: {steps:,} per row count\n")
+
+    def signals(strategy, dataframe):
+        dataframe = strategy.populate_exit_trend(strategy.populate_entry_trend(dataframe, metadata), metadata)
+        return {column: dataframe[column].fillna(0).to_numpy() if column in dataframe.columns
+                else np.zeros(len(dataframe)) for column in ('enter_long', 'exit_long')}
+
+    print(f"{'rows':>6}{'full':>10}{'live':>10}{'speedup':>10}{'entries':>9}{'exits':>7}"
+          f"{'boundary crosses':>18}{'differ':>8}")
+    print("-"*78)
+    matches = True
+    for rows in args.rows:
+        live = load_strategy(RunMode.DRY_RUN, live_signal_rows=rows, use_feature_day_cache=False)
+        live.buy_rsi.value = args.buy_rsi
+        full_time = live_time = 0.0
+        entries = exits = crosses = differ = 0
+        for end in range(window, window + steps):
+            candles = frame.iloc[end - window:end].reset_index(drop=True)
+            start = time.perf_counter()
+            expected = signals(full, candles.copy())
+            full_time += time.perf_counter() - start
+            start = time.perf_counter()
+            result = signals(live, candles.copy())
+            live_time += time.perf_counter() - start
+
+            differ += sum(not np.array_equal(expected[column][-rows:], result[column][-rows:]) for column in expected)
+            entries += int(expected['enter_long'][-rows:].sum())
+            exits += int(expected['exit_long'][-rows:].sum())
+            # Crossovers on the first evaluated row need the candle before the tail
+            first = len(candles) - rows
+            crosses += int(any(
+                candles[a].iloc[first] < candles[b].iloc[first] and candles[a].iloc[first - 1] >= candles[b].iloc[first - 1]
+                for a, b in [('close', 'ema_fast'), ('macd', 'macdsignal')]))
+        matches = matches and differ == 0 and crosses > 0
+        print(f"{rows:>6}{full_time / steps * 1000:>8.2f}ms{live_time / steps * 1000:>8.2f}ms"
+              f"{full_time / live_time:>9.1f}x{entries:>9,}{exits:>7,}{crosses:>18,}{differ:>8,}")
+
+    print("\nboundary crosses: cycles with a crossover on the first evaluated row")
+    print(f"{'✓' if matches else '✗'} Live enter_long/exit_long {'match' if matches else 'DIFFER from'} "
+          f"the full-vector rules on the newest candles")
+    return matches
+
+
+def bench_outliers(args):
+    """Training-time outlier filters vs FreqAI's SVM step"""
+    from datasieve.transforms import SVMOutlierExtractor
+    from mlscalping.outliers import MIN_TRAIN_DAYS, make_outlier_filter
+
+    print_header("Outlier Filter Benchmark")
+    rows = args.days * 288
+    X, injected = synthetic_features(rows, args.features, 0.01)
+    injected = set(injected.tolist())
+    print(f"Rows: {rows:,} ({args.days} days of 5m)  Features: {args.features}  "
+          f"Injected outliers: {len(injected)}\n")
+
+    filters = {
+        'svm (current)': lambda: SVMOutlierExtractor(shuffle=False, nu=0.01),
+        'svm_subsample': lambda: make_outlier_filter('svm_subsample'),
+        'isolation_forest': lambda: make_outlier_filter('isolation_forest'),
+        'robust_zscore': lambda: make_outlier_filter('robust_zscore'),
+    }
+
+    results = {}
+    for name, factory in filters.items():
+        def run():
+            transform = factory()
+            transform.fit(X)
+            # outlier_check mode turns the do_predict flags of outlier rows into 0
+            return transform.transform(X, np.ones(rows), outlier_check=True)[1]
+        seconds, keep = best_time(run, args.repeat)
+        results[name] = (seconds, set(np.flatnonzero(keep == 0).tolist()))
+
+    svm_seconds, svm_removed = results['svm (current)']
+    print(f"{'filter':<18}{'time':>10}{'speedup':>9}{'removed':>10}{'caught':>9}{'overlap':>9}")
+    print("-"*65)
+    for name, (seconds, removed) in results.items():
+        caught = len(removed & injected) / len(injected)
+        union = removed | svm_removed
+        overlap = len(removed & svm_removed) / len(union) if union else 1.0
+        print(f"{name:<18}{seconds * 1000:>8.0f}ms{svm_seconds / seconds:>8.1f}x"
+              f"{len(removed) / rows:>10.2%}{caught:>9.0%}{overlap:>9.0%}")
+    print("\nremoved: fraction of rows dropped  caught: injected outliers found  "
+          "overlap: Jaccard vs current SVM")
+    print(f"A configured outlier_filter replaces the SVM from {MIN_TRAIN_DAYS} training days: "
+          f"{'used' if args.days >= MIN_TRAIN_DAYS else 'not used'} at {args.days} days")
+    return True
+
+
+def bench_di(args):
+    """Indexed dissimilarity index vs datasieve's brute-force DI"""
+    from datasieve.transforms import DissimilarityIndex
+    from mlscalping.dissimilarity import IndexedDissimilarityIndex
+
+    print_header("Dissimilarity Index Benchmark")
+    train_rows = args.days * 288
+    X, _ = synthetic_features(train_rows + args.predict_rows, args.features, 0.01)
+    train, predict = X[:train_rows], X[train_rows:]
+    print(f"Training rows: {train_rows:,} ({args.days} days of 5m)  Features: {args.features}  "
+          f"Prediction rows: {len(predict):,}\n")
+
+    def fitted(cls):
+        di = cls(di_threshold=0.9, n_jobs=1)
+        di.fit(train)
+        return di
+
+    def batch(di):
+        di.transform(predict, np.ones(len(predict)), outlier_check=True)
+        return di.di_values
+
+    def per_candle(di):
+        for row in range(min(len(predict), 100)):
+            di.transform(predict[row:row + 1], np.ones(1), outlier_check=True)
+
+    timings = {}
+    for name, cls in [('brute force', DissimilarityIndex), ('indexed', IndexedDissimilarityIndex)]:
+        fit_time, di = best_time(lambda: fitted(cls), args.repeat)
+        batch_time, values = best_time(lambda: batch(di), args.repeat)
+        candle_time, _ = best_time(lambda: per_candle(di), args.repeat)
+        timings[name] = (fit_time, batch_time, candle_time / min(len(predict), 100), values)
+
+    print(f"{'':14}{'fit':>10}{'batch':>10}{'per candle':>12}")
+    print("-"*46)
+    for name, (fit_time, batch_time, candle_time, _) in timings.items():
+        print(f"{name:<14}{fit_time * 1000:>8.0f}ms{batch_time * 1000:>8.0f}ms{candle_time * 1000:>10.2f}ms")
+
+    expected, result = timings['brute force'][3], timings['indexed'][3]
+    relative = np.abs(result - expected) / expected
+    agree = np.mean((expected < 0.9) == (result < 0.9))
+    ok = relative.max() <= args.tolerance
+    print(f"\nDI relative error: max {relative.max():.4f}, median {np.median(relative):.4f}  "
+          f"threshold decisions agree: {agree:.2%}")
+    print(f"{'✓' if ok else '✗'} DI values {'within' if ok else 'OUTSIDE'} tolerance {args.tolerance}")
+    return ok
+
+
+def _rss_bytes():
+    """Resident set size of this process (Linux), or 0 when unknown"""
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _load_candles_case(source, path, since=None):
+    """
+    (rows, close column) loaded from a candle file by freqtrade's loader,
+    candle_data.load_candles or a CandleStore, keeping rows with open time >= since
+    """
+    from candle_data import load_candles
+    from candle_store import CandleStore
+
+    if source == 'freqtrade':
+        from freqtrade.data.history import load_pair_history
+        frame = load_pair_history(pair='BTC/USDT', timeframe='1m', datadir=path.parent, data_format='feather')
+        return len(frame), frame['close'].to_numpy()
+    if source == 'store':
+        store = CandleStore(path)
+        first, last = store.bounds(since)
+        return last - first, store.columns['close'][first:last]
+    candles = load_candles(path)
+    candles = candles if since is None else candles[candles[:, 0] >= since]
+    return len(candles), candles[:, 4]
+
+
+def _measure_load(*case):
+    """Time and resident memory added by loading `case`, run in a fresh child process"""
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    rows, close = _load_candles_case(*case)
+    seconds = time.perf_counter() - start
+    # Touching the data makes memory-mapped pages count as resident
+    checksum = float(np.asarray(close).sum()) if rows else 0.0
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - rss
+    except ImportError:
+        peak = 0
+    return seconds, _rss_bytes() - rss, max(peak, 0), rows, checksum
+
+
+def bench_store(args):
+    """Loading candle files: freqtrade's loader, load_candles and the memory map"""
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from candle_data import save_candles
+    from candle_store import CandleStore
+    # Imported here so the forked children do not time freqtrade's import
+    from freqtrade.data.history import load_pair_history  # noqa: F401
+
+    print_header("Candle Store Benchmark")
+    frame = synthetic_candles(args.days, timeframe_minutes=1)
+    candles = np.column_stack([frame['date'].values.astype('datetime64[ms]').astype('int64'),
+                               frame[['open', 'high', 'low', 'close', 'volume']].to_numpy()]).astype('float64')
+    slice_start = candles[-args.slice_days * 1440, 0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # This repository's layout, and freqtrade's own (lz4, as written by download-data)
+        candle_path = Path(tmp) / 'repo' / 'BTC_USDT-1m.feather'
+        lz4_path = Path(tmp) / 'lz4' / 'BTC_USDT-1m.feather'
+        save_candles(candle_path, candles)
+        lz4_path.parent.mkdir()
+        frame.to_feather(lz4_path, compression='lz4', compression_level=9)
+        mapped = CandleStore(candle_path).mapped
+        print(f"Candles: {len(candles):,} ({args.days} days of 1m)  File: "
+              f"{candle_path.stat().st_size / 1e6:.0f} MB, {'memory-mapped' if mapped else 'NOT mappable'}\n")
+
+        cases = [
+            ('freqtrade, lz4 file', ('freqtrade', lz4_path)),
+            ('freqtrade, repo file', ('freqtrade', candle_path)),
+            ('load_candles', ('feather', candle_path)),
+            ('memory map, full', ('store', candle_path)),
+            (f'load_candles, last {args.slice_days}d', ('feather', candle_path, slice_start)),
+            (f'memory map, last {args.slice_days}d', ('store', candle_path, slice_start)),
+        ]
+        results = {}
+        context = multiprocessing.get_context('fork')
+        for name, case in cases:
+            runs = []
+            for _ in range(args.repeat):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    runs.append(pool.submit(_measure_load, *case).result())
+            results[name] = min(runs)
+
+    print(f"{'':26}{'time':>10}{'RSS added':>12}{'peak':>10}{'rows':>11}")
+    print("-"*69)
+    for name, (seconds, rss, peak, rows, _) in results.items():
+        print(f"{name:<26}{seconds * 1000:>8.1f}ms{rss / 1e6:>10.1f}MB{peak / 1e6:>8.0f}MB{rows:>11,}")
+    print("\nfreqtrade's loader reads both files the same way; the memory map serves this repository's scripts")
+
+    checksums = [result[4] for result in results.values()]
+    ok = mapped and len(set(checksums[:4])) == 1 and checksums[4] == checksums[5]
+    print(f"\n{'✓' if ok else '✗'} Memory-mapped content {'matches' if ok else 'DIFFERS from'} "
+          f"what freqtrade loads")
+    return ok
+
+
+def synthetic_signals(pairs, days, entry_rate, exit_rate, seed=42):
+    """PairSignals with random-walk candles and random entry/exit signals"""
+    from vector_backtest import PairSignals
+
+    signals = []
+    for index in range(pairs):
+        frame = synthetic_candles(days, seed=seed + index)
+        rng = np.random.default_rng(seed + index)
+        count = len(frame)
+        signals.append(PairSignals(
+            f"PAIR{index}/USDT",
+            frame['date'].values.astype('datetime64[ms]').astype('int64'),
+            frame['open'].to_numpy(), frame['high'].to_numpy(), frame['low'].to_numpy(),
+            rng.random(count) < entry_rate, rng.random(count) < exit_rate,
+            frame['close'].to_numpy() * rng.uniform(0.005, 0.025, count),
+        ))
+    return signals
+
+
+def _reference_backtest(pairs, settings, fee, max_open_trades, wallet, tradable_balance_ratio):
+    """
+    Candle-by-candle replay in the order of freqtrade's backtest loop: per
+    candle, pairs with open trades first, entry before the exit checks, the
+    stop adjusted and checked candle by candle like freqtrade's
+    ft_stoploss_adjust
+    """
+    import vector_backtest as vb
+
+    timeframe_ms = vb.TIMEFRAME_MS[vb.TIMEFRAME]
+    rows = [dict(zip(signals.times.tolist(), range(len(signals)))) for signals in pairs]
+    times = sorted(set().union(*rows))
+    last_time = times[-1]
+    open_trades = {}
+    trades = []
+    closed_profit = 0.0
+    rejected = 0
+    for now in times:
+        slots_used = len(open_trades)
+        for index in list(dict.fromkeys(list(open_trades) + list(range(len(pairs))))):
+            signals = pairs[index]
+            row = rows[index].get(now)
+            if row is None:
+                continue
+            if index not in open_trades and now < last_time and signals.entries[row]:
+                if slots_used >= max_open_trades:
+                    rejected += 1
+                else:
+                    tied_up = sum(trade['stake'] for trade in open_trades.values())
+                    balance = wallet + closed_profit
+                    available = min(balance * tradable_balance_ratio - tied_up, balance - tied_up)
+                    stake = min(balance * tradable_balance_ratio / max_open_trades, available)
+                    stake = min(stake * vb.stake_factor(signals, row, settings.atr_stake_steps), available)
+                    if stake > 0:
+                        open_rate = signals.open[row]
+                        open_trades[index] = {'open': now, 'rate': open_rate, 'stake': stake,
+                                              'stop': open_rate * (1 + settings.stoploss), 'trailing': False}
+                        slots_used += 1
+            trade = open_trades.get(index)
+            if trade is None:
+                continue
+
+            open_, high, low = signals.open[row], signals.high[row], signals.low[row]
+            minutes = (now - trade['open']) // 60_000
+            best = float(vb.profit_ratio(trade['rate'], high, fee))
+            offset = settings.trailing_stop_positive_offset
+            if (settings.trailing_stop and trade['stop'] < low
+                    and not (settings.trailing_only_offset_is_reached and best < offset)):
+                if settings.trailing_stop_positive is not None and best > offset:
+                    distance = abs(settings.trailing_stop_positive)
+                else:
+                    distance = abs(settings.stoploss)
+                if high * (1 - distance) > trade['stop']:
+                    trade['stop'] = high * (1 - distance)
+                    trade['trailing'] = True
+            stop_hit = trade['stop'] >= low
+            roi = settings.roi_at(minutes)
+            exits = []
+            if signals.exits[row] and minutes >= settings.min_exit_signal_minutes:
+                exits.append(('exit_signal', open_))
+            if stop_hit and not trade['trailing']:
+                exits.append(('stop_loss', vb.stoploss_close_rate(settings, trade['stop'], False, minutes,
+                                                                  open_, low, high)))
+            if best > roi:
+                exits.append(('roi', vb.roi_close_rate(settings, trade['rate'], minutes, fee, open_, low, high)))
+            if stop_hit and trade['trailing']:
+                exits.append(('trailing_stop_loss',
+                              vb.stoploss_close_rate(settings, trade['stop'], True, minutes, open_, low, high)))
+            if exits:
+                exit_reason, close_rate = exits[0]
+                closed = vb.make_trade(signals.pair, trade['open'], now, trade['rate'], close_rate,
+                                       trade['stake'], fee, exit_reason)
+                trades.append(closed)
+                closed_profit += closed['profit_abs']
+                del open_trades[index]
+                if now - trade['open'] > timeframe_ms:
+                    slots_used -= 1
+    for index, trade in open_trades.items():
+        signals = pairs[index]
+        trades.append(vb.make_trade(signals.pair, trade['open'], int(signals.times[-1]), trade['rate'],
+                                    signals.open[-1], trade['stake'], fee, 'force_exit'))
+    return sorted(trades, key=lambda trade: (trade['open_timestamp'], trade['pair'])), rejected
+
+
+def _reconcile_export(freqtrade_dir, config, strategy_settings, export, tolerance):
+    """
+    Replay a freqtrade export's timerange, pairs and fee from its saved
+    FreqAI predictions and reconcile with its trades; None when there is
+    nothing to replay
+    """
+    import vector_backtest as vb
+
+    timerange, pairs, fee = vb.export_setup(export)
+    start_ms, end_ms = vb.timerange_ms(timerange)
+    freqai = config.get('freqai', {})
+    lead_ms = (int(freqai.get('train_period_days', 0) * 86_400_000)
+               + vb.STARTUP_CANDLES * vb.TIMEFRAME_MS[vb.TIMEFRAME])
+    prepared, skipped = vb.prepare_pairs(freqtrade_dir, vb.backtest_pairs(freqtrade_dir, pairs), start_ms, end_ms,
+                                         lead_ms, freqai.get('identifier', ''), strategy_settings)
+    for pair, reason in skipped.items():
+        print(f"⚠ {pair}: {reason}, skipped")
+    if not prepared:
+        return None
+    print(f"Export: {export}  Timerange: {timerange}  Pairs: {len(prepared)}")
+    trades, _ = vb.simulate(prepared, strategy_settings, vb.DEFAULT_FEE if fee is None else fee,
+                            config.get('max_open_trades', 3), config.get('dry_run_wallet', 1000),
+                            config.get('tradable_balance_ratio', 1.0), config.get('stake_amount', 'unlimited'))
+    return vb.compare_export(trades, prepared, export, start_ms, end_ms, tolerance,
+                             config.get('stake_currency', ''))
+
+
+def bench_vector(args):
+    """
+    Vectorized backtest speed against a candle-by-candle loop over synthetic
+    signals; the check is the reconciliation with a freqtrade export
+    """
+    sys.path.insert(0, str(Path(__file__).parent))
+    from vector_backtest import load_settings, simulate
+
+    print_header("Vectorized Backtest Benchmark")
+    freqtrade_dir = get_freqtrade_dir()
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    strategy_settings = load_settings(freqtrade_dir, config)
+    print(f"Settings: {strategy_settings.describe()}")
+    settings = dict(fee=0.001, max_open_trades=args.max_open_trades, wallet=1000.0, tradable_balance_ratio=0.05)
+    pairs = synthetic_signals(args.pairs, args.days, args.entry_rate, args.exit_rate)
+    candles = sum(len(signals) for signals in pairs)
+    print(f"Pairs: {args.pairs}  Candles: {candles:,} ({args.days} days of 5m)  "
+          f"max_open_trades: {args.max_open_trades}\n")
+
+    vector_time, (trades, rejected) = best_time(lambda: simulate(pairs, strategy_settings, **settings), args.repeat)
+    check = pairs[:args.check_pairs]
+    loop_time, (expected, expected_rejected) = best_time(
+        lambda: _reference_backtest(check, strategy_settings, **settings), 1)
+    check_vector_time, (result, result_rejected) = best_time(
+        lambda: simulate(check, strategy_settings, **settings), args.repeat)
+
+    reasons = {}
+    for trade in trades:
+        reasons[trade['exit_reason']] = reasons.get(trade['exit_reason'], 0) + 1
+    print(f"{'':28}{'loop':>10}{'vector':>10}{'speedup':>10}")
+    print("-"*58)
+    print(f"{f'{len(check)} pairs (checked)':28}{loop_time:>9.2f}s{check_vector_time:>9.2f}s"
+          f"{loop_time / check_vector_time:>9.1f}x")
+    print(f"{f'{args.pairs} pairs':28}{'':>10}{vector_time:>9.2f}s")
+    print(f"\nTrades: {len(trades):,}  Rejected entry signals: {rejected:,}")
+    print("Exit reasons: " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+
+    # Stakes are sums over the open trades, taken in a different order: compare profit_abs to rounding
+    fields = ['pair', 'open_timestamp', 'close_timestamp', 'exit_reason', 'close_rate', 'profit_ratio']
+    matches = (result_rejected == expected_rejected and len(result) == len(expected)
+               and all(all(a[field] == b[field] for field in fields)
+                       and math.isclose(a['profit_abs'], b['profit_abs'], rel_tol=1e-9, abs_tol=2e-8)
+                       for a, b in zip(result, expected)))
+    print(f"\n{'✓' if matches else '✗'} Vectorized trades {'match' if matches else 'DIFFER from'} "
+          f"the candle-by-candle loop ({len(expected):,} trades)")
+
+    # Both replays read the same settings: only freqtrade itself can tell whether they are right
+    export = (freqtrade_dir / 'user_data' / 'backtest_results' / '.last_result.json'
+              if args.export == 'latest' else Path(args.export))
+    print()
+    if not export.exists():
+        print(f"✗ Not verified against freqtrade: no export at {export} (run python backtest.py first)")
+        return False
+    identical = _reconcile_export(freqtrade_dir, config, strategy_settings, export, args.tolerance)
+    if identical is None:
+        print(f"✗ Not verified against freqtrade: no FreqAI predictions for {export}")
+        return False
+    return matches and identical
+
+
+def _reference_metrics(profits, wallet, ruin_balance):
+    """Drawdown, profit factor and ruin of one run, trade by trade"""
+    equity = peak = drawdown = drawdown_pct = lowest = 0.0
+    for profit in profits:
+        equity += profit
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+        drawdown_pct = max(drawdown_pct, (peak - equity) / (wallet + peak))
+        lowest = min(lowest, equity)
+    gains = math.fsum(profit for profit in profits if profit > 0)
+    losses = -math.fsum(profit for profit in profits if profit < 0)
+    return {
+        'total': equity,
+        'max_drawdown': drawdown,
+        'max_drawdown_pct': drawdown_pct,
+        'profit_factor': gains / losses if losses else (math.inf if gains else 0.0),
+        'ruined': wallet + lowest <= ruin_balance,
+    }
+
+
+def bench_montecarlo(args):
+    """Batched Monte Carlo runs vs a trade-by-trade loop per run"""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from monte_carlo import sample_runs, simulate, simulate_task
+
+    print_header("Monte Carlo Benchmark")
+    wallet, ruin_balance = 1000.0, 500.0
+    profits = np.random.default_rng(0).normal(0.05, 3.0, args.trades)
+    print(f"Trades: {args.trades:,}  Runs: {args.runs:,} per method  Workers: {args.workers or os.cpu_count()}\n")
+
+    rng = np.random.default_rng(1)
+    samples = sample_runs(profits, 'bootstrap', args.check_runs, rng)
+    loop_time, expected = best_time(
+        lambda: [_reference_metrics(row.tolist(), wallet, ruin_balance) for row in samples], 1)
+    batch_time, result = best_time(lambda: simulate_task('bootstrap', args.check_runs, 1, wallet, ruin_balance,
+                                                         profits), args.repeat)
+    full_time, distributions = best_time(
+        lambda: simulate(profits, args.runs, wallet, ruin_balance, seed=0, workers=args.workers), 1)
+
+    print(f"{'':28}{'loop':>10}{'vector':>10}{'speedup':>10}")
+    print("-"*58)
+    print(f"{f'{args.check_runs} runs (checked)':28}{loop_time:>9.2f}s{batch_time:>9.2f}s"
+          f"{loop_time / batch_time:>9.1f}x")
+    print(f"{f'{2 * args.runs:,} runs':28}{'':>10}{full_time:>9.2f}s")
+
+    # simulate_task with seed 1 draws the same samples as rng above
+    matches = all(
+        math.isclose(result[name][i], run[name], rel_tol=1e-9, abs_tol=1e-9) if name != 'ruined'
+        else result[name][i] == run[name]
+        for i, run in enumerate(expected) for name in run
+    )
+    total = math.fsum(profits)
+    invariant = bool(np.allclose(distributions['permutation']['total'], total)
+                     and np.allclose(distributions['permutation']['profit_factor'],
+                                     distributions['permutation']['profit_factor'][0]))
+    print(f"\n{'✓' if matches else '✗'} Batched metrics {'match' if matches else 'DIFFER from'} "
+          f"the trade-by-trade loop ({args.check_runs} runs)")
+    print(f"{'✓' if invariant else '✗'} Permutations keep the total and profit factor")
+    return matches and invariant
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark performance-sensitive parts of the ML strategy',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    incremental = subparsers.add_parser('incremental', help='Streamed live indicators vs a TA-Lib recompute')
+    incremental.add_argument('--days', type=int, default=30, help='Days of 5m candles (default: 30)')
+    incremental.add_argument('--window', type=int, default=1000,
+                             help='Candles per live dataframe (default: 1000)')
+    incremental.add_argument('--steps', type=int, default=2000, help='Candles streamed (default: 2000)')
+    incremental.add_argument('--tolerance', type=float, default=1e-9,
+                             help='Max relative error (default: 1e-9)')
+    incremental.add_argument('--repeat', type=int, default=5, help='Runs per measurement (default: 5)')
+    incremental.set_defaults(func=bench_incremental)
+
+    compact = subparsers.add_parser('compact', help='Model decisions on float64 vs compact features')
+    compact.add_argument('--days', type=int, default=30, help='Days of 5m candles (default: 30)')
+    compact.add_argument('--train-share', type=float, default=0.8,
+                         help='Share of the candles used for training (default: 0.8)')
+    compact.set_defaults(func=bench_compact)
+
+    daycache = subparsers.add_parser('daycache', help='Feature day cache vs a cold compute of each window')
+    daycache.add_argument('--days', type=int, default=90, help='Days of 5m candles (default: 90)')
+    daycache.add_argument('--window', type=int, default=30, help='Training window in days (default: 30)')
+    daycache.add_argument('--step', type=int, default=7, help='Days between windows (default: 7)')
+    daycache.add_argument('--tolerance', type=float, default=1e-6,
+                          help='Max relative error past the warmup (default: 1e-6)')
+    daycache.set_defaults(func=bench_daycache)
+
+    labels = subparsers.add_parser('labels', help='Forward-window label kernel vs pandas')
+    labels.add_argument('--days', type=int, default=365, help='Days of 5m candles (default: 365)')
+    labels.add_argument('--repeat', type=int, default=5, help='Runs per measurement (default: 5)')
+    labels.set_defaults(func=bench_labels)
+
+    live = subparsers.add_parser('live', help='Live fast-path signals vs the full-vector rules')
+    live.add_argument('--days', type=int, default=30, help='Days of 5m candles (default: 30)')
+    live.add_argument('--window', type=int, default=500, help='Candles per live dataframe (default: 500)')
+    live.add_argument('--steps', type=int, default=2000, help='Live cycles per row count (default: 2000)')
+    live.add_argument('--rows', type=int, nargs='+', default=[1, 2, 3],
+                      help='live_signal_rows values to check (default: 1 2 3)')
+    live.add_argument('--buy-rsi', type=int, default=55, help='buy_rsi for both paths (default: 55)')
+    live.set_defaults(func=bench_live_signals)
+
+    outliers = subparsers.add_parser('outliers', help='Outlier filters vs FreqAI\'s SVM step')
+    outliers.add_argument('--days', type=int, default=30, help='Days of 5m training rows (default: 30)')
+    outliers.add_argument('--features', type=int, default=300, help='Feature columns (default: 300)')
+    outliers.add_argument('--repeat', type=int, default=3, help='Runs per measurement (default: 3)')
+    outliers.set_defaults(func=bench_outliers)
+
+    di = subparsers.add_parser('di', help='Indexed DI vs brute force')
+    di.add_argument('--days', type=int, default=30, help='Days of 5m training rows (default: 30)')
+    di.add_argument('--features', type=int, default=300, help='Feature columns (default: 300)')
+    di.add_argument('--predict-rows', type=int, default=2000, help='Prediction rows (default: 2000)')
+    di.add_argument('--tolerance', type=float, default=0.02,
+                    help='Max relative DI error (default: 0.02)')
+    di.add_argument('--repeat', type=int, default=3, help='Runs per measurement (default: 3)')
+    di.set_defaults(func=bench_di)
+
+    store = subparsers.add_parser('store', help='Candle file loading: freqtrade, load_candles, memory map')
+    store.add_argument('--days', type=int, default=365, help='Days of 1m candles (default: 365)')
+    store.add_argument('--slice-days', type=int, default=30, help='Days in the range slice (default: 30)')
+    store.add_argument('--repeat', type=int, default=3, help='Runs per measurement (default: 3)')
+    store.set_defaults(func=bench_store)
+
+    vector = subparsers.add_parser('vector', help='Vectorized backtest vs a candle-by-candle loop')
+    vector.add_argument('--pairs', type=int, default=50, help='Pairs (default: 50)')
+    vector.add_argument('--days', type=int, default=365, help='Days of 5m candles (default: 365)')
+    vector.add_argument('--check-pairs', type=int, default=10,
+                        help='Pairs also replayed by the loop for the check (default: 10)')
+    vector.add_argument('--max-open-trades', type=int, default=3, help='max_open_trades (default: 3)')
+    vector.add_argument('--entry-rate', type=float, default=0.01,
+                        help='Fraction of candles with an entry signal (default: 0.01)')
+    vector.add_argument('--exit-rate', type=float, default=0.02,
+                        help='Fraction of candles with an exit signal (default: 0.02)')
+    vector.add_argument('--repeat', type=int, default=3, help='Runs per measurement (default: 3)')
+    vector.add_argument('--export', default='latest',
+                        help='freqtrade export to reconcile with (default: the latest backtest)')
+    vector.add_argument('--tolerance', type=float, default=1e-4,
+                        help='Profit ratio difference still counted as identical (default: 0.0001)')
+    vector.set_defaults(func=bench_vector)
+
+    batch = subparsers.add_parser('batch', help='Per-candle cost of batched indicators as the pairlist grows')
+    batch.add_argument('--pairs', type=int, nargs='+', default=[20, 50, 100],
+                       help='Pairlist sizes (default: 20 50 100)')
+    batch.add_argument('--days', type=int, default=7, help='Days of 5m candles (default: 7)')
+    batch.add_argument('--window', type=int, default=1000,
+                       help='Candles per live dataframe (default: 1000)')
+    batch.add_argument('--steps', type=int, default=200, help='Candles timed on the tail path (default: 200)')
+    batch.add_argument('--tolerance', type=float, default=1e-9,
+                       help='Max relative error (default: 1e-9)')
+    batch.add_argument('--repeat', type=int, default=5,
+                       help='Candles timed on the per-pair and full panel paths (default: 5)')
+    batch.set_defaults(func=bench_batch)
+
+    montecarlo = subparsers.add_parser('montecarlo', help='Batched Monte Carlo runs vs a per-run loop')
+    montecarlo.add_argument('--trades', type=int, default=100_000, help='Trades (default: 100000)')
+    montecarlo.add_argument('--runs', type=int, default=2000, help='Runs per method (default: 2000)')
+    montecarlo.add_argument('--check-runs', type=int, default=20,
+                            help='Runs also computed by the loop for the check (default: 20)')
+    montecarlo.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    montecarlo.add_argument('--repeat', type=int, default=3, help='Runs per measurement (default: 3)')
+    montecarlo.set_defaults(func=bench_montecarlo)
+
+    args = parser.parse_args()
+    if not args.func(args):
+        sys.exit(1)
+    print()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nBenchmark interrupted by user.")
+        sys.exit(1)
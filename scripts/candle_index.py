@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Candle Data Index
+=================
+
+Small sidecar index (user_data/data/binance/index.json) describing every
+candle file without opening it:
+
+    "BTC_USDT-5m": {"pair": "BTC/USDT", "timeframe": "5m", "rows": 105120,
+                    "first": ms, "last": ms, "gap_count": 1,
+                    "gaps": [[first missing ms, next present ms], ...],
+                    "mtime": file mtime when indexed}
+
+candle_data.py updates the entry on every write (appends extend it from
+the new rows only), so data checks, pair selection and timerange
+validation read one small JSON file instead of parsing candle files.
+Entries whose file changed behind the index's back (different mtime) are
+re-indexed from the file's timestamps by refresh().
+
+Usage:
+    python candle_index.py check                          # Gaps, stale tails, short history (5m)
+    python candle_index.py check --timerange 20240101-    # Does the data cover a timerange?
+    python candle_index.py rebuild                        # Re-index every file
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from candle_data import TIMEFRAME_MS, candle_files, data_dir, load_times
+
+
+INDEX_FILE = 'index.json'
+MAX_GAPS = 1000  # Gap ranges kept per entry; gap_count is always exact
+DAY_MS = 86_400_000
+
+_lock = threading.Lock()
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+def _parse_name(name):
+    """'BTC_USDT-5m' -> ('BTC/USDT', '5m'), or None for other files"""
+    if '-' not in name:
+        return None
+    stem, timeframe = name.rsplit('-', 1)
+    base, _, quote = stem.rpartition('_')
+    if not base or timeframe not in TIMEFRAME_MS:
+        return None
+    return f"{base}/{quote}", timeframe
+
+
+def find_gaps(times, timeframe):
+    """[[first missing open time, next present open time], ...] for sorted open times"""
+    step = TIMEFRAME_MS[timeframe]
+    times = np.asarray(times, dtype='int64')
+    breaks = np.flatnonzero(np.diff(times) > step)
+    return [[int(times[i]) + step, int(times[i + 1])] for i in breaks]
+
+
+def _entry(name, times, mtime):
+    pair, timeframe = _parse_name(name)
+    gaps = find_gaps(times, timeframe)
+    return {
+        'pair': pair,
+        'timeframe': timeframe,
+        'rows': int(len(times)),
+        'first': int(times[0]) if len(times) else None,
+        'last': int(times[-1]) if len(times) else None,
+        'gap_count': len(gaps),
+        'gaps': gaps[:MAX_GAPS],
+        'mtime': mtime,
+    }
+
+
+def _extend(name, entry, times, mtime):
+    """Entry after appending `times` (all newer than entry['last'])"""
+    if not entry['rows']:
+        return _entry(name, times, mtime)
+    gaps = find_gaps(np.r_[entry['last'], times], entry['timeframe'])
+    return dict(
+        entry,
+        rows=entry['rows'] + int(len(times)),
+        last=int(times[-1]),
+        gap_count=entry['gap_count'] + len(gaps),
+        gaps=(entry['gaps'] + gaps)[:MAX_GAPS],
+        mtime=mtime,
+    )
+
+
+def _read(directory):
+    path = Path(directory) / INDEX_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return {}
+
+
+def _write(directory, index):
+    path = Path(directory) / INDEX_FILE
+    tmp = path.with_name(f"{INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(index, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def record_write(path, candles, appended_to_mtime=None):
+    """
+    Update the index after candle_data wrote `candles` to `path`.
+
+    For appends, `appended_to_mtime` is the file's mtime before the append;
+    when the entry was indexed from that version it is extended with the new
+    rows, otherwise the file is re-indexed. An update lost to a concurrent
+    writer in another process leaves a stale mtime, which refresh() repairs.
+    """
+    path = Path(path)
+    if _parse_name(path.stem) is None:
+        return
+    mtime = path.stat().st_mtime
+    with _lock:
+        index = _read(path.parent)
+        entry = index.get(path.stem)
+        if appended_to_mtime is None:
+            index[path.stem] = _entry(path.stem, candles[:, 0], mtime)
+        elif entry is not None and entry['mtime'] == appended_to_mtime:
+            index[path.stem] = _extend(path.stem, entry, candles[:, 0], mtime)
+        else:
+            index[path.stem] = _entry(path.stem, load_times(path), mtime)
+        _write(path.parent, index)
+
+
+def refresh(freqtrade_dir, force=False):
+    """
+    Index for the data directory, re-indexing files that are new or changed
+    since they were indexed (all files with force) and dropping removed ones
+    """
+    directory = data_dir(freqtrade_dir)
+    if not directory.exists():
+        return {}
+    with _lock:
+        index = _read(directory)
+        files = {path.stem: path for path in candle_files(freqtrade_dir) if _parse_name(path.stem)}
+        changed = False
+        for name in set(index) - set(files):
+            del index[name]
+            changed = True
+        for name, path in files.items():
+            mtime = path.stat().st_mtime
+            if force or name not in index or index[name]['mtime'] != mtime:
+                index[name] = _entry(name, load_times(path), mtime)
+                changed = True
+        if changed:
+            _write(directory, index)
+    return index
+
+
+def entries(index, timeframe=None, pairs=None):
+    """Index entries, optionally narrowed to a timeframe and pairs"""
+    return [entry for entry in index.values()
+            if (timeframe is None or entry['timeframe'] == timeframe)
+            and (pairs is None or entry['pair'] in pairs)]
+
+
+def find_problems(index, timeframe, min_rows=0, stale_after_ms=DAY_MS, now_ms=None, pairs=None):
+    """
+    {pair: [problem, ...]} for the `timeframe` files: fewer than `min_rows`
+    candles, last candle older than `stale_after_ms` (None: not checked),
+    or internal gaps
+    """
+    now_ms = now_ms or int(datetime.now(timezone.utc).timestamp() * 1000)
+    problems = {}
+    for entry in entries(index, timeframe, pairs):
+        found = []
+        if entry['rows'] < min_rows:
+            found.append(f"{entry['rows']:,} candles (< {min_rows:,})")
+        if stale_after_ms is not None and (entry['last'] is None or now_ms - entry['last'] > stale_after_ms):
+            found.append(f"stale, last candle {format_ms(entry['last'])}")
+        if entry['gap_count']:
+            missing = sum((end - start) // TIMEFRAME_MS[timeframe] for start, end in entry['gaps'])
+            found.append(f"{entry['gap_count']} gaps ({missing:,} candles missing)")
+        if found:
+            problems[entry['pair']] = found
+    return problems
+
+
+def uncovered_pairs(index, pairs, timeframe, start_ms=None, end_ms=None, startup_candles=0):
+    """
+    Pairs whose `timeframe` data does not cover [start_ms - startup candles, end_ms],
+    as {pair: reason}
+    """
+    step = TIMEFRAME_MS[timeframe]
+    by_pair = {entry['pair']: entry for entry in entries(index, timeframe)}
+    uncovered = {}
+    for pair in pairs:
+        entry = by_pair.get(pair)
+        if entry is None or not entry['rows']:
+            uncovered[pair] = "no data"
+        elif start_ms is not None and entry['first'] > start_ms - startup_candles * step:
+            uncovered[pair] = f"starts {format_ms(entry['first'])}"
+        elif end_ms is not None and entry['last'] + step < end_ms:
+            uncovered[pair] = f"ends {format_ms(entry['last'])}"
+    return uncovered
+
+
+def validate_timerange(freqtrade_dir, timerange, pairs=None, timeframe='5m', lead_days=0, startup_candles=0):
+    """
+    Pairs whose data does not cover a freqtrade timerange, as {pair: reason}.
+
+    `lead_days` of data are also required before the start (FreqAI trains on
+    train_period_days before the first backtest candle), plus `startup_candles`.
+    """
+    index = refresh(freqtrade_dir)
+    start_ms, end_ms = parse_timerange(timerange)
+    if start_ms is not None:
+        start_ms -= int(lead_days * DAY_MS)
+    pairs = pairs or sorted(entry['pair'] for entry in entries(index, timeframe))
+    return uncovered_pairs(index, pairs, timeframe, start_ms, end_ms, startup_candles)
+
+
+def parse_timerange(timerange):
+    """freqtrade timerange 'YYYYMMDD-YYYYMMDD' (either side optional) -> (start_ms, end_ms)"""
+    start, _, end = timerange.partition('-')
+
+    def to_ms(day):
+        if not day:
+            return None
+        return int(datetime.strptime(day, '%Y%m%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    return to_ms(start), to_ms(end)
+
+
+def format_ms(ms):
+    if ms is None:
+        return '-'
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Candle data index: gaps, stale tails and coverage without opening candle files',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python candle_index.py check                            # 5m data problems
+  python candle_index.py check --timeframe 1m --min-days 365
+  python candle_index.py check --timerange 20231101-      # Coverage of a timerange
+  python candle_index.py rebuild
+        """
+    )
+    parser.add_argument('--freqtrade-dir', type=Path, default=get_freqtrade_dir(),
+                        help='freqtrade_setup directory (default: ../freqtrade_setup)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    check = subparsers.add_parser('check', help='Report data problems')
+    check.add_argument('--timeframe', default='5m', help='Timeframe to check (default: 5m)')
+    check.add_argument('--min-days', type=float, default=0, help='Required days of history')
+    check.add_argument('--timerange', help='freqtrade timerange the data must cover')
+    check.add_argument('--startup-candles', type=int, default=200,
+                       help='Candles needed before the timerange start (default: 200)')
+    subparsers.add_parser('rebuild', help='Re-index every candle file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = refresh(args.freqtrade_dir, force=args.command == 'rebuild')
+    elapsed = (time.perf_counter() - start) * 1000
+    if not index:
+        print("✗ No candle files found. Run: python scripts/download_data.py")
+        sys.exit(1)
+    print(f"✓ {len(index)} files indexed ({elapsed:.0f}ms)")
+    if args.command == 'rebuild':
+        return
+
+    min_rows = int(args.min_days * DAY_MS // TIMEFRAME_MS[args.timeframe])
+    problems = find_problems(index, args.timeframe, min_rows)
+    pairs = sorted(entry['pair'] for entry in entries(index, args.timeframe))
+    print(f"  {args.timeframe}: {len(pairs)} pairs, {len(problems)} with problems")
+    for pair, found in sorted(problems.items()):
+        print(f"  ⚠ {pair:<12} {'; '.join(found)}")
+
+    uncovered = {}
+    if args.timerange:
+        start_ms, end_ms = parse_timerange(args.timerange)
+        uncovered = uncovered_pairs(index, pairs, args.timeframe, start_ms, end_ms, args.startup_candles)
+        print(f"\n  Timerange {args.timerange}: {len(pairs) - len(uncovered)}/{len(pairs)} pairs covered")
+        for pair, reason in sorted(uncovered.items()):
+            print(f"  ✗ {pair:<12} {reason}")
+
+    sys.exit(1 if problems or uncovered else 0)
+
+
+if __name__ == '__main__':
+    main()
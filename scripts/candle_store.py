@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Candle Files
+==========================
+
+Zero-copy access to the candle files at freqtrade's data path
+(user_data/data/binance/BTC_USDT-5m.feather, ...).
+
+candle_data.py writes every file as uncompressed feather (the Arrow IPC
+file format) with a single record batch, so each column is one contiguous
+array inside the file. Opening a file maps it into memory and the columns
+are numpy views on the mapping: nothing is parsed or decompressed, and the
+OS pages in only the parts that are read. Time ranges are located by
+binary search on the date column, so slicing the last 30 days of a year of
+1m candles touches about 30 days' worth of pages.
+
+freqtrade reads the very same files with its own feather data handler,
+so backtesting, FreqAI training and bot startup use one copy of the data;
+the memory map is what this repository's scripts (vector_backtest.py,
+benchmark.py) get on top. Files written by other tools, e.g.
+`freqtrade download-data` (lz4, several record batches), still open but
+are decompressed into memory; `convert` rewrites them in the mappable
+layout.
+
+A mapped file cannot be replaced on Windows, so keep a CandleStore only as
+long as it is needed.
+
+Usage:
+    python candle_store.py convert            # Rewrite files that cannot be mapped
+    python candle_store.py convert --force    # Rewrite every candle file
+    python candle_store.py info               # Rows, time range and layout per file
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from candle_data import COLUMNS, candle_files, candle_path, data_dir, empty_candles, load_candles, save_candles
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+def _numpy(column):
+    """A pyarrow column as a numpy array; a view on the file when it is a single uncompressed chunk"""
+    if column.num_chunks == 0:
+        return np.empty(0, dtype=column.type.to_pandas_dtype())
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
+
+
+def _dates_ns(column):
+    """Open times as int64 ns: a view for freqtrade's nanosecond timestamps, converted otherwise"""
+    if not pa.types.is_timestamp(column.type):
+        return _numpy(column).astype('int64') * 1_000_000
+    dates = _numpy(column.cast(pa.int64()))
+    if column.type.unit != 'ns':
+        dates = dates * {'s': 10**9, 'ms': 10**6, 'us': 10**3}[column.type.unit]
+    return dates
+
+
+class CandleStore:
+    """Memory-mapped columns of one candle file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No candle file at {self.path}")
+        allocated = pa.total_allocated_bytes()
+        table = pa.ipc.open_file(pa.memory_map(str(self.path))).read_all()
+        self.rows = table.num_rows
+        self._dates = _dates_ns(table.column('date'))
+        self.columns = {column: _numpy(table.column(column)) for column in COLUMNS[1:]}
+        # Nothing allocated: every column is a view on the mapping
+        self.mapped = pa.total_allocated_bytes() == allocated
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def dates(self):
+        """Open times in ms"""
+        return self._dates // 1_000_000
+
+    def bounds(self, start_ms=None, end_ms=None):
+        """Row range [first, last) of candles with start_ms <= open time < end_ms"""
+        first = 0 if start_ms is None else int(np.searchsorted(self._dates, start_ms * 1_000_000, side='left'))
+        last = self.rows if end_ms is None else int(np.searchsorted(self._dates, end_ms * 1_000_000, side='left'))
+        return first, max(first, last)
+
+    def candles(self, start_ms=None, end_ms=None):
+        """(n, 6) float64 array like candle_data.load_candles, for the time range"""
+        first, last = self.bounds(start_ms, end_ms)
+        if first == last:
+            return empty_candles()
+        return np.column_stack([self._dates[first:last] // 1_000_000]
+                               + [self.columns[column][first:last] for column in COLUMNS[1:]]).astype('float64')
+
+    def dataframe(self, start_ms=None, end_ms=None):
+        """freqtrade-style OHLCV DataFrame (UTC dates) for the time range"""
+        first, last = self.bounds(start_ms, end_ms)
+        frame = pd.DataFrame({column: np.asarray(self.columns[column][first:last]) for column in COLUMNS[1:]})
+        frame.insert(0, 'date', pd.to_datetime(self._dates[first:last], unit='ns', utc=True))
+        return frame
+
+
+def open_store(freqtrade_dir, pair, timeframe):
+    return CandleStore(candle_path(freqtrade_dir, pair, timeframe))
+
+
+def convert_file(path, force=False):
+    """
+    Rewrite a candle file in the mappable layout unless it already is in it
+    (always with force). Returns the action taken.
+    """
+    if not force and CandleStore(path).mapped:
+        return 'fresh'
+    save_candles(path, load_candles(path))
+    return 'rewritten'
+
+
+def convert(freqtrade_dir, force=False):
+    """Bring every candle file in the data directory into the mappable layout; returns {action: count}"""
+    counts = {}
+    files = candle_files(freqtrade_dir)
+    start = time.monotonic()
+    for path in files:
+        action = convert_file(path, force)
+        counts[action] = counts.get(action, 0) + 1
+        if action != 'fresh':
+            print(f"✓ {path.stem:<20} {action}")
+    print(f"\n{len(files)} files in {time.monotonic() - start:.1f}s: "
+          + ", ".join(f"{count} {action}" for action, count in sorted(counts.items())))
+    return counts
+
+
+def _format_ms(ms):
+    if ms is None:
+        return '-'
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def info(freqtrade_dir):
+    files = candle_files(freqtrade_dir)
+    print(f"{'file':<20}{'rows':>10}  {'first':<17} {'last':<17} {'layout':<8}")
+    print("-"*75)
+    for path in files:
+        store = CandleStore(path)
+        first, last = (int(store.dates[0]), int(store.dates[-1])) if store.rows else (None, None)
+        print(f"{path.stem:<20}{store.rows:>10,}  {_format_ms(first):<17} {_format_ms(last):<17} "
+              f"{'mapped' if store.mapped else 'copied':<8}")
+    print(f"\n{len(files)} files in {data_dir(freqtrade_dir)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Memory-mapped access to the candle files',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python candle_store.py convert           # Rewrite files that cannot be mapped (e.g. lz4)
+  python candle_store.py convert --force   # Rewrite every file
+  python candle_store.py info
+        """
+    )
+    parser.add_argument('--freqtrade-dir', type=Path, default=get_freqtrade_dir(),
+                        help='freqtrade_setup directory (default: ../freqtrade_setup)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert_parser = subparsers.add_parser('convert', help='Rewrite candle files in the mappable layout')
+    convert_parser.add_argument('--force', action='store_true', help='Rewrite files that are already mappable')
+    subparsers.add_parser('info', help='List candle files')
+    args = parser.parse_args()
+
+    if not data_dir(args.freqtrade_dir).exists():
+        print("✗ No data directory found. Run: python scripts/download_data.py")
+        sys.exit(1)
+    if args.command == 'convert':
+        convert(args.freqtrade_dir, args.force)
+    else:
+        info(args.freqtrade_dir)
+
+
+if __name__ == '__main__':
+    main()
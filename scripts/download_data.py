@@ -7,13 +7,24 @@ This script downloads historical price data for cryptocurrency pairs
 to train the ML model and run backtests.
 
 Downloads:
-- 1 year of 1-minute, 5-minute, and 15-minute candle data
+- 1 year of 1-minute candle data
 - Top 50 trading pairs by volume on Binance
-- Stores data in freqtrade_setup/user_data/data/binance/
+- Stores data in freqtrade_setup/user_data/data/binance/, in freqtrade's
+  default feather format
 
-Estimated time: 15-20 minutes
+Candles are fetched concurrently from the exchange API by
+async_downloader.py (one process, shared rate limit, retries). The
+5-minute, 15-minute and 1-hour candles are derived locally from the
+1-minute ones by resample.py instead of being downloaded.
+
+Estimated time: about 10 minutes
+
+Usage:
+    python download_data.py          # Full download (1 year)
+    python download_data.py --sync   # Only fetch candles missing from the stored files
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -22,7 +33,8 @@ from pathlib import Path
 
 
 # Configuration
-TIMEFRAMES = ['1m', '5m', '15m']
+TIMEFRAMES = ['1m', '5m', '15m', '1h']
+DOWNLOAD_TIMEFRAMES = ['1m']  # The others are resampled from these
 DAYS_TO_DOWNLOAD = 365  # 1 year
 EXCHANGE = 'binance'
 
@@ -48,7 +60,7 @@ def print_header():
     print("="*60)
     print(f"\nThis will download {DAYS_TO_DOWNLOAD} days of data for {len(PAIRS)} pairs")
     print(f"Timeframes: {', '.join(TIMEFRAMES)}")
-    print(f"Estimated time: 15-20 minutes")
+    print(f"Estimated time: about 10 minutes")
     print(f"Estimated size: ~500-800 MB")
     print("\n" + "="*60 + "\n")
 
@@ -84,86 +96,85 @@ def get_freqtrade_dir():
 
 
 def download_data(freqtrade_dir, pairs, timeframes, days):
-    """Download historical data using freqtrade"""
+    """
+    Download the DOWNLOAD_TIMEFRAMES candles with the concurrent downloader
+    (async_downloader.py) and derive the other timeframes (resample.py)
+    """
+    from async_downloader import download
+    from resample import base_pairs, update_derived
     
     # Calculate date range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
+    downloaded = [timeframe for timeframe in timeframes if timeframe in DOWNLOAD_TIMEFRAMES]
+    derived = [timeframe for timeframe in timeframes if timeframe not in DOWNLOAD_TIMEFRAMES]
     
     print(f"Downloading data from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+    print(f"{len(pairs) * len(downloaded)} pair/timeframe combinations, fetched concurrently")
     print()
     
-    total_downloads = len(pairs) * len(timeframes)
-    current = 0
-    failed = []
-    
-    for timeframe in timeframes:
-        print(f"\n{'='*60}")
-        print(f"  Downloading {timeframe} data...")
-        print(f"{'='*60}\n")
-        
-        for pair in pairs:
-            current += 1
-            progress = f"[{current}/{total_downloads}]"
-            
-            # Format pair for filename (replace / with _)
-            pair_filename = pair.replace('/', '_')
-            
-            print(f"{progress} Downloading {pair} ({timeframe})...", end=' ', flush=True)
-            
-            try:
-                # Build freqtrade command
-                cmd = [
-                    'freqtrade',
-                    'download-data',
-                    '--exchange', EXCHANGE,
-                    '--pairs', pair,
-                    '--timeframe', timeframe,
-                    '--days', str(days),
-                    '--datadir', str(freqtrade_dir / 'user_data' / 'data'),
-                    '--config', str(freqtrade_dir / 'config.json')
-                ]
-                
-                # Run command
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minute timeout per pair
-                )
-                
-                if result.returncode == 0:
-                    print("✓")
-                else:
-                    print("✗ Failed")
-                    failed.append(f"{pair} ({timeframe})")
-                    if result.stderr:
-                        print(f"    Error: {result.stderr.strip()[:100]}")
-                
-            except subprocess.TimeoutExpired:
-                print("✗ Timeout")
-                failed.append(f"{pair} ({timeframe}) - timeout")
-            except Exception as e:
-                print(f"✗ Error: {str(e)[:50]}")
-                failed.append(f"{pair} ({timeframe}) - {str(e)[:30]}")
+    failed = download(freqtrade_dir, pairs, downloaded, days)
     
+    if derived:
+        print(f"\nDeriving {', '.join(derived)} candles...\n")
+        available = [pair for pair in base_pairs(freqtrade_dir) if pair in pairs]
+        failed += update_derived(freqtrade_dir, available, derived, rebuild=True)
     return failed
 
 
+def convert_old_files(freqtrade_dir):
+    """Convert JSON candle files written by earlier versions of this script to feather"""
+    from candle_data import convert_json_files
+    converted = convert_json_files(freqtrade_dir)
+    if converted:
+        print(f"✓ Converted {converted} JSON candle files to feather\n")
+
+
 def verify_data(freqtrade_dir):
-    """Verify downloaded data"""
-    data_dir = freqtrade_dir / 'user_data' / 'data' / EXCHANGE
-    
-    if not data_dir.exists():
-        return 0
+    """Verify downloaded data (number of candle files in the candle index)"""
+    from candle_index import refresh
+    return len(refresh(freqtrade_dir))
+
+
+def sync_data(freqtrade_dir):
+    """
+    Fetch only the candles missing from the downloaded files (async_downloader.py --sync),
+    then extend the derived timeframes (resample.py), re-deriving the buckets of
+    every gap the sync filled
+    """
+    from async_downloader import sync
+    from resample import BASE_TIMEFRAME, update_derived
     
-    # Count JSON files
-    json_files = list(data_dir.glob('*.json'))
-    return len(json_files)
+    failed, filled = sync(freqtrade_dir, timeframes=DOWNLOAD_TIMEFRAMES, new_file_days=DAYS_TO_DOWNLOAD)
+    print()
+    derived = [timeframe for timeframe in TIMEFRAMES if timeframe not in DOWNLOAD_TIMEFRAMES]
+    refill = {pair: ranges for (pair, timeframe), ranges in filled.items() if timeframe == BASE_TIMEFRAME}
+    return failed + update_derived(freqtrade_dir, timeframes=derived, refill=refill)
 
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description='Download historical candle data')
+    parser.add_argument('--sync', action='store_true',
+                        help='Only fetch candles missing from the stored files (new candles and gaps)')
+    args = parser.parse_args()
+    
+    if args.sync:
+        freqtrade_dir = get_freqtrade_dir()
+        if not freqtrade_dir:
+            sys.exit(1)
+        start_time = datetime.now()
+        convert_old_files(freqtrade_dir)
+        failed = sync_data(freqtrade_dir)
+        print(f"\nDuration: {(datetime.now() - start_time).total_seconds():.1f}s")
+        if failed:
+            print(f"\n⚠ {len(failed)} updates failed:")
+            for item in failed[:10]:
+                print(f"  - {item}")
+            sys.exit(1)
+        print("✓ Data is up to date")
+        return
+    
     print_header()
     
     # Check if freqtrade is installed
@@ -179,13 +190,14 @@ def main():
     print()
     
     # Confirm with user
-    response = input("Start download? This will take 15-20 minutes. (y/N): ")
+    response = input("Start download? This will take about 10 minutes. (y/N): ")
     if response.lower() not in ['y', 'yes']:
         print("Download cancelled.")
         sys.exit(0)
     
     print("\nStarting download...\n")
     start_time = datetime.now()
+    convert_old_files(freqtrade_dir)
     
     # Download data
     failed = download_data(freqtrade_dir, PAIRS, TIMEFRAMES, DAYS_TO_DOWNLOAD)
@@ -0,0 +1,148 @@
+"""
+Parallel Job Pool
+=================
+
+Runs independent freqtrade commands (one subprocess per job) on a pool of
+workers sized to the machine, with a CPU and memory budget per job and a
+live progress / ETA line.
+
+Every job writes its output to its own log file, so parallel runs do not
+interleave on the console. CPU is limited through the usual thread-count
+environment variables (OpenMP, BLAS, numexpr). Memory can optionally be
+capped through RLIMIT_DATA on POSIX systems, set by a small Python wrapper
+that execs the job. preexec_fn is not used because it is unsafe in the
+pool's worker threads. RLIMIT_DATA caps the *virtual* data segment (heap
+and private mappings, reserved or not), which numpy, LightGBM and glibc's
+per-thread arenas reserve far beyond what they touch, so the limit must be
+generous or jobs fail with MemoryError on a machine with free RAM; by
+default there is none.
+
+Used by train_model.py (per-pair training).
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+
+class Job:
+    """One command to run, plus its outcome once finished"""
+
+    def __init__(self, name, cmd, cwd, log_path, job_id=None):
+        self.name = name
+        self.job_id = job_id
+        self.cmd = cmd
+        self.cwd = Path(cwd)
+        self.log_path = Path(log_path)
+        self.returncode = None
+        self.seconds = 0.0
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+
+def format_duration(seconds):
+    """Format seconds as '1h02m', '4m12s' or '9s'"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def available_memory_bytes():
+    """Physical memory of the machine, or None when it cannot be determined"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def plan_workers(threads_per_job, memory_per_job_gb=None, max_workers=None):
+    """
+    Number of parallel jobs that fits the machine.
+
+    Limited by cores / threads_per_job and, when a memory budget is given,
+    by physical memory / memory_per_job_gb.
+    """
+    workers = max(1, (os.cpu_count() or 1) // max(1, threads_per_job))
+    memory = available_memory_bytes()
+    if memory_per_job_gb and memory:
+        workers = min(workers, max(1, int(memory // (memory_per_job_gb * 1024 ** 3))))
+    if max_workers:
+        workers = min(workers, max_workers)
+    return workers
+
+
+def _job_env(threads_per_job):
+    env = os.environ.copy()
+    for name in THREAD_ENV_VARS:
+        env[name] = str(threads_per_job)
+    return env
+
+
+# Sets RLIMIT_DATA, then replaces itself with the job: python -c LIMIT_EXEC <bytes> <cmd...>
+LIMIT_EXEC = (
+    "import os, resource, sys; "
+    "limit = int(sys.argv[1]); "
+    "resource.setrlimit(resource.RLIMIT_DATA, (limit, limit)); "
+    "os.execvp(sys.argv[2], sys.argv[2:])"
+)
+
+
+def _limited_cmd(cmd, memory_per_job_gb):
+    """`cmd` wrapped so it runs with its virtual data segment capped at memory_per_job_gb (POSIX only)"""
+    if not memory_per_job_gb or sys.platform == 'win32':
+        return cmd
+    limit_bytes = int(memory_per_job_gb * 1024 ** 3)
+    return [sys.executable, '-c', LIMIT_EXEC, str(limit_bytes)] + [str(part) for part in cmd]
+
+
+def _run(job, env, memory_per_job_gb):
+    job.log_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.monotonic()
+    with open(job.log_path, 'w') as log:
+        log.write(" ".join(str(part) for part in job.cmd) + "\n\n")
+        log.flush()
+        try:
+            process = subprocess.Popen(_limited_cmd(job.cmd, memory_per_job_gb), cwd=job.cwd,
+                                       stdout=log, stderr=subprocess.STDOUT, env=env)
+            job.returncode = process.wait()
+        except OSError as e:
+            log.write(f"\nFailed to start: {e}\n")
+            job.returncode = -1
+    job.seconds = time.monotonic() - start
+    return job
+
+
+def run_jobs(jobs, workers, threads_per_job=1, memory_per_job_gb=None):
+    """
+    Run all jobs, `workers` at a time, printing one progress line per finished job.
+
+    Returns the jobs with returncode/seconds filled in, in the original order.
+    """
+    env = _job_env(threads_per_job)
+    total = len(jobs)
+    width = len(str(total))
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, job, env, memory_per_job_gb) for job in jobs]
+        for done, future in enumerate(as_completed(futures), start=1):
+            job = future.result()
+            elapsed = time.monotonic() - start
+            remaining = total - done
+            eta = f"ETA {format_duration(elapsed / done * remaining)}" if remaining else "done"
+            status = '✓' if job.ok else '✗'
+            print(f"[{done:>{width}}/{total}] {status} {job.name:<28} {format_duration(job.seconds):>7}"
+                  f"  | elapsed {format_duration(elapsed)}, {eta}", flush=True)
+
+    return jobs
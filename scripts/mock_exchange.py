@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Mock Exchange Server
+====================
+
+Local HTTP server answering Binance's /api/v3/klines endpoint with
+deterministic synthetic candles, for testing the downloader without
+network access or exchange rate limits.
+
+It can misbehave on purpose:
+- --latency adds a delay to every response
+- --error-rate answers that fraction of requests with HTTP 500
+- --rate-limit answers with HTTP 429 + Retry-After once more than that
+  many requests arrive within one second
+- symbols listed in --invalid answer HTTP 400 like a delisted pair
+
+Usage:
+    python mock_exchange.py                                  # http://127.0.0.1:8800
+    python mock_exchange.py --latency 0.05 --error-rate 0.02 --rate-limit 50
+    python async_downloader.py --base-url http://127.0.0.1:8800 --days 30
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+
+import numpy as np
+from aiohttp import web
+
+from candle_data import TIMEFRAME_MS
+from resample import resample_candles
+
+
+def synthetic_klines(symbol, interval, start_ms, end_ms, limit):
+    """
+    Candles for open times in [start_ms, end_ms]; the same (symbol, time)
+    always produces the same candle, whichever page it is requested in.
+    Higher timeframes aggregate the 1m candles, like a real exchange.
+    """
+    step = TIMEFRAME_MS[interval]
+    first = -(-start_ms // step) * step
+    times = np.arange(first, end_ms + 1, step, dtype='int64')[:limit]
+    candles = synthetic_minutes(symbol, times[0], times[-1] + step) if len(times) else np.empty((0, 6))
+    if interval != '1m':
+        candles = resample_candles(candles, interval)
+    return [[int(t), f"{o:.8f}", f"{h:.8f}", f"{lo:.8f}", f"{c:.8f}", f"{v:.8f}",
+             int(t + step - 1), "0", 0, "0", "0", "0"]
+            for t, o, h, lo, c, v in candles.tolist()]
+
+
+def synthetic_minutes(symbol, start_ms, end_ms):
+    """1m candles for [start_ms, end_ms), rounded like exchange prices"""
+    step = TIMEFRAME_MS['1m']
+    times = np.arange(start_ms, end_ms, step, dtype='int64')
+    seed = zlib.crc32(symbol.encode()) % 1000
+
+    def price(t):
+        hours = t / 3_600_000
+        return 100 + seed / 10 + 5 * np.sin(hours / 24 + seed) + 0.5 * np.sin(hours * 7.3 + seed)
+
+    opens = price(times)
+    closes = price(times + step)
+    wiggle = 0.001 * opens * (1 + np.sin(times / 60_000.0))
+    highs = np.maximum(opens, closes) + wiggle
+    lows = np.minimum(opens, closes) - wiggle
+    volumes = 1000 + 500 * np.cos(times / 3_600_000 + seed)
+    return np.column_stack([times, np.round(np.column_stack([opens, highs, lows, closes, volumes]), 8)])
+
+
+class MockExchange:
+    def __init__(self, latency=0.0, error_rate=0.0, rate_limit=None, invalid=()):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.invalid = set(invalid)
+        self.requests = 0
+        self.errors = 0
+        self.limited = 0
+        self._window = (0, 0)
+
+    def _over_limit(self):
+        second = int(time.monotonic())
+        start, count = self._window
+        count = count + 1 if start == second else 1
+        self._window = (second, count)
+        return self.rate_limit is not None and count > self.rate_limit
+
+    async def klines(self, request):
+        self.requests += 1
+        if self._over_limit():
+            self.limited += 1
+            return web.json_response({'code': -1003, 'msg': 'Too many requests.'},
+                                     status=429, headers={'Retry-After': '1'})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({'code': -1000, 'msg': 'Internal error.'}, status=500)
+
+        query = request.query
+        symbol = query.get('symbol', '')
+        interval = query.get('interval', '')
+        if symbol in self.invalid or interval not in TIMEFRAME_MS:
+            return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+
+        now_ms = int(time.time() * 1000)
+        limit = min(int(query.get('limit', 500)), 1000)
+        start_ms = int(query.get('startTime', now_ms - limit * TIMEFRAME_MS[interval]))
+        end_ms = min(int(query.get('endTime', now_ms)), now_ms)
+        return web.json_response(synthetic_klines(symbol, interval, start_ms, end_ms, limit))
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/api/v3/klines', self.klines)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Binance klines server')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8800, help='Port (default: 8800)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--rate-limit', type=int, help='Requests per second before answering HTTP 429')
+    parser.add_argument('--invalid', nargs='*', default=[], help='Symbols answered with HTTP 400 (e.g. FTMUSDT)')
+    args = parser.parse_args()
+
+    exchange = MockExchange(args.latency, args.error_rate, args.rate_limit, args.invalid)
+    print(f"Mock exchange on http://{args.host}:{args.port}")
+    web.run_app(exchange.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Robustness Analysis
+===============================
+
+How much of a backtest's result is luck? Resamples the trades of a backtest
+export thousands of times and reports the spread of the outcomes:
+- bootstrap: each run draws as many trades as the backtest had, with
+  replacement, so some trades repeat and others are left out
+- permutation: each run replays exactly the backtest's trades in a shuffled
+  order; the total and profit factor stay the same, drawdowns do not
+
+For every run it measures the total profit, maximum drawdown (in the stake
+currency and as a share of the equity peak), profit factor and whether the
+equity fell to the ruin level (by default half the starting wallet).
+Profits are the trades' profit_abs as exported, i.e. the stakes of the
+backtest itself.
+
+Runs are computed as (runs x trades) matrices with numpy, in batches sized to
+keep memory bounded, and batches are spread over worker processes. Each batch
+has its own seed spawned from the run's seed, so a seed reproduces the same
+distributions with any number of workers.
+
+Usage:
+    python monte_carlo.py                                   # Latest backtest export
+    python monte_carlo.py --runs 20000 --seed 42
+    python monte_carlo.py user_data/backtest_results/backtest-sharded-20240101-20250101.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from backtest import load_export_trades
+
+
+METHODS = ['bootstrap', 'permutation']
+PERCENTILES = [5, 25, 50, 75, 95]
+RUNS_PER_TASK = 500
+MAX_BATCH_ELEMENTS = 1 << 22  # Trades x runs per matrix: 32 MB of float64
+
+_profits = None  # Trade profits in close order, set in each worker
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+def trade_profits(trades):
+    """profit_abs of the trades as a float64 array, in close order like backtest.period_stats"""
+    close = np.array([trade['close_timestamp'] for trade in trades], dtype='int64')
+    opened = np.array([trade['open_timestamp'] for trade in trades], dtype='int64')
+    profits = np.array([trade['profit_abs'] for trade in trades], dtype='float64')
+    return profits[np.lexsort((opened, close))]
+
+
+def run_metrics(profits, wallet, ruin_balance):
+    """
+    Metrics of each row of a (runs, trades) profit matrix, as arrays of
+    length runs: total, max_drawdown, max_drawdown_pct, profit_factor, ruined
+    """
+    equity = np.cumsum(profits, axis=1)
+    # The starting wallet is the first peak
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+    underwater = peak - equity
+    max_drawdown = underwater.max(axis=1)
+    underwater /= wallet + peak
+    max_drawdown_pct = underwater.max(axis=1)
+    ruined = wallet + equity.min(axis=1) <= ruin_balance
+
+    gains = np.where(profits > 0, profits, 0.0).sum(axis=1)
+    losses = -np.where(profits < 0, profits, 0.0).sum(axis=1)
+    profit_factor = np.divide(gains, losses, out=np.where(gains > 0, np.inf, 0.0), where=losses > 0)
+    return {
+        'total': equity[:, -1],
+        'max_drawdown': max_drawdown,
+        'max_drawdown_pct': max_drawdown_pct,
+        'profit_factor': profit_factor,
+        'ruined': ruined,
+    }
+
+
+def sample_runs(profits, method, runs, rng):
+    """(runs, trades) matrix of resampled profits"""
+    if method == 'bootstrap':
+        return profits[rng.integers(0, len(profits), size=(runs, len(profits)))]
+    return rng.permuted(np.broadcast_to(profits, (runs, len(profits))), axis=1)
+
+
+def simulate_task(method, runs, seed, wallet, ruin_balance, profits=None):
+    """Metrics of `runs` resampled runs, computed in memory-bounded batches"""
+    profits = _profits if profits is None else profits
+    rng = np.random.default_rng(seed)
+    batch = max(1, MAX_BATCH_ELEMENTS // len(profits))
+    parts = [run_metrics(sample_runs(profits, method, min(batch, runs - done), rng), wallet, ruin_balance)
+             for done in range(0, runs, batch)]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def _init_worker(profits):
+    global _profits
+    _profits = profits
+
+
+def simulate(profits, runs, wallet, ruin_balance, seed=None, workers=None):
+    """
+    {method: metrics} over `runs` runs per method. Work is split into tasks
+    of RUNS_PER_TASK runs with seeds spawned from `seed`, so the result does
+    not depend on `workers`.
+    """
+    root = np.random.SeedSequence(seed)
+    tasks = []
+    for method, method_seed in zip(METHODS, root.spawn(len(METHODS))):
+        sizes = [min(RUNS_PER_TASK, runs - done) for done in range(0, runs, RUNS_PER_TASK)]
+        tasks += [(method, size, task_seed) for size, task_seed in zip(sizes, method_seed.spawn(len(sizes)))]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        results = [simulate_task(method, size, task_seed, wallet, ruin_balance, profits)
+                   for method, size, task_seed in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profits,)) as pool:
+            futures = [pool.submit(simulate_task, method, size, task_seed, wallet, ruin_balance)
+                       for method, size, task_seed in tasks]
+            results = [future.result() for future in futures]
+
+    distributions = {}
+    for method in METHODS:
+        parts = [result for (task_method, _, _), result in zip(tasks, results) if task_method == method]
+        distributions[method] = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    return distributions
+
+
+def summarize(metrics):
+    """Percentiles of each metric and the outcome probabilities of one method"""
+    summary = {name: dict(zip(PERCENTILES, np.percentile(values, PERCENTILES, method='nearest').tolist()))
+               for name, values in metrics.items() if name != 'ruined'}
+    summary['ruin_probability'] = float(metrics['ruined'].mean())
+    summary['loss_probability'] = float((metrics['total'] < 0).mean())
+    summary['profit_factor_below_1'] = float((metrics['profit_factor'] < 1).mean())
+    return summary
+
+
+def print_distributions(actual, summaries, stake_currency):
+    rows = [
+        ('total', f"Total {stake_currency}", '{:.2f}'),
+        ('max_drawdown', f"Max drawdown {stake_currency}", '{:.2f}'),
+        ('max_drawdown_pct', "Max drawdown %", '{:.1%}'),
+        ('profit_factor', "Profit factor", '{:.2f}'),
+    ]
+    print(f"\n{'':24}{'backtest':>10}" + "".join(f"{f'{p}%':>10}" for p in PERCENTILES))
+    print("-"*84)
+    for method in METHODS:
+        print(method.capitalize())
+        for name, label, fmt in rows:
+            # Order does not change the total or the profit factor
+            if method == 'permutation' and name in ('total', 'profit_factor'):
+                continue
+            value = float(actual[name][0])
+            print(f"  {label:<22}{fmt.format(value):>10}"
+                  + "".join(f"{fmt.format(summaries[method][name][p]):>10}" for p in PERCENTILES))
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Monte Carlo robustness analysis of backtest trades',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python monte_carlo.py                           # Latest backtest export
+  python monte_carlo.py --runs 20000 --seed 42    # Reproducible
+  python monte_carlo.py --ruin 0.3 --max-ruin 0.01
+  python monte_carlo.py user_data/backtest_results/vector-backtest-20240101-20250101.json
+
+Run a backtest first (python backtest.py --period 1y); freqtrade, sharded and
+vector backtest exports are all accepted.
+        """
+    )
+    parser.add_argument('export', nargs='?',
+                        help='Trade export to analyse (default: the latest backtest)')
+    parser.add_argument('--runs', type=int, default=10000,
+                        help='Runs per method (default: 10000)')
+    parser.add_argument('--wallet', type=float,
+                        help='Starting wallet (default: dry_run_wallet from config.json)')
+    parser.add_argument('--ruin', type=float, default=0.5,
+                        help='Share of the starting wallet lost that counts as ruin (default: 0.5)')
+    parser.add_argument('--max-ruin', type=float,
+                        help='Exit with an error when a ruin probability is above this')
+    parser.add_argument('--seed', type=int,
+                        help='Random seed (default: random, printed for reruns)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes (default: all cores)')
+    args = parser.parse_args()
+
+    freqtrade_dir = get_freqtrade_dir()
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    stake_currency = config.get('stake_currency', '')
+    export = Path(args.export) if args.export else freqtrade_dir / 'user_data' / 'backtest_results' / '.last_result.json'
+    if not export.exists():
+        print(f"✗ No backtest export found at {export}. Run: python scripts/backtest.py")
+        sys.exit(1)
+    trades = load_export_trades(export)
+    if not trades:
+        print(f"✗ No trades in {export}")
+        sys.exit(1)
+
+    wallet = args.wallet if args.wallet is not None else float(config.get('dry_run_wallet', 1000))
+    ruin_balance = wallet * (1 - args.ruin)
+    seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+
+    print("\n" + "="*60)
+    print("  Monte Carlo Robustness Analysis")
+    print("="*60)
+    print(f"\nExport: {export.name}  Trades: {len(trades):,}  Wallet: {wallet:g} {stake_currency}")
+    print(f"Runs: {args.runs:,} per method  Seed: {seed}")
+
+    started = time.perf_counter()
+    profits = trade_profits(trades)
+    actual = run_metrics(profits[None, :], wallet, ruin_balance)
+    distributions = simulate(profits, args.runs, wallet, ruin_balance, seed, args.workers)
+    summaries = {method: summarize(metrics) for method, metrics in distributions.items()}
+    print(f"✓ {2 * args.runs:,} runs in {time.perf_counter() - started:.1f}s")
+
+    print_distributions(actual, summaries, stake_currency)
+    print(f"\nRuin (equity at or below {ruin_balance:g} {stake_currency}): "
+          + ", ".join(f"{method} {summaries[method]['ruin_probability']:.2%}" for method in METHODS))
+    print(f"Bootstrap: loss in {summaries['bootstrap']['loss_probability']:.1%} of runs, "
+          f"profit factor below 1 in {summaries['bootstrap']['profit_factor_below_1']:.1%}")
+
+    report_path = freqtrade_dir / 'user_data' / 'backtest_results' / f"monte-carlo-{export.stem.lstrip('.')}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps({
+        'export': str(export),
+        'trades': len(trades),
+        'runs': args.runs,
+        'seed': seed,
+        'wallet': wallet,
+        'ruin_balance': ruin_balance,
+        'backtest': {name: float(values[0]) for name, values in actual.items()},
+        **summaries,
+    }, indent=2))
+    print(f"\nReport: {report_path}")
+
+    if args.max_ruin is not None:
+        worst = max(summary['ruin_probability'] for summary in summaries.values())
+        if worst > args.max_ruin:
+            print(f"\n✗ Ruin probability {worst:.2%} is above {args.max_ruin:.2%}\n")
+            sys.exit(1)
+        print(f"\n✓ Ruin probability {worst:.2%} within {args.max_ruin:.2%}")
+    print()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nMonte Carlo analysis interrupted by user.")
+        sys.exit(1)
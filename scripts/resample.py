@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Timeframe Resampler
+===================
+
+Builds 5m / 15m / 1h (or any other) candles from the stored 1m candles, so
+only 1m data has to come from the exchange and every timeframe is derived
+from the same trades.
+
+- One vectorized pass per pair and timeframe (numpy reduceat over the
+  1m rows of each bucket: first open, max high, min low, last close,
+  summed volume)
+- Only complete buckets are written: a 5m candle needs all five 1m
+  candles, so the currently forming candle and buckets with missing
+  1m data are left out
+- Incremental by default: only the 1m candles after the newest derived
+  candle are read (from the end of the 1m file) and the new candles are
+  appended in place; --rebuild recomputes everything
+- 1m ranges filled in place (gaps fetched by download_data.py --sync) are
+  passed in as `refill`, and the derived buckets covering them are
+  recomputed and merged into the derived files
+- --check downloads the same candles from the exchange and compares them
+  with the derived ones; a candle the exchange has and the derived data
+  lacks fails the check like a mismatch
+
+Usage:
+    python resample.py                       # Update 5m/15m/1h for every pair with 1m data
+    python resample.py --rebuild             # Recompute from the full 1m history
+    python resample.py --check --days 3      # Compare with exchange candles
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from functools import reduce
+from math import gcd
+from pathlib import Path
+
+import numpy as np
+
+from candle_data import (TIMEFRAME_MS, append_candles, candle_path, empty_candles, last_time, load_candles,
+                         load_recent, merge_candles, save_candles)
+
+
+BASE_TIMEFRAME = '1m'
+DERIVED_TIMEFRAMES = ['5m', '15m', '1h']
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+def resample_candles(candles, timeframe, base_timeframe=BASE_TIMEFRAME, complete_only=True):
+    """
+    Aggregate sorted base-timeframe candles into `timeframe` candles.
+
+    Buckets are aligned to the epoch like the exchange's own candles. With
+    complete_only, buckets missing any base candle are dropped.
+    """
+    if not len(candles):
+        return empty_candles()
+    step = TIMEFRAME_MS[timeframe]
+    times = candles[:, 0].astype('int64')
+    buckets = times - times % step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)]
+
+    resampled = np.column_stack([
+        buckets[starts],
+        candles[starts, 1],
+        np.maximum.reduceat(candles[:, 2], starts),
+        np.minimum.reduceat(candles[:, 3], starts),
+        candles[ends - 1, 4],
+        np.add.reduceat(candles[:, 5], starts),
+    ]).astype('float64')
+    if complete_only:
+        resampled = resampled[ends - starts == step // TIMEFRAME_MS[base_timeframe]]
+    return resampled
+
+
+def base_pairs(freqtrade_dir, base_timeframe=BASE_TIMEFRAME):
+    """Pairs that have a base-timeframe file"""
+    from async_downloader import stored_files
+    return [pair for pair, timeframe in stored_files(freqtrade_dir) if timeframe == base_timeframe]
+
+
+def rederive(freqtrade_dir, pair, timeframes, ranges, base_timeframe=BASE_TIMEFRAME):
+    """
+    Recompute the derived buckets covering the base-timeframe `ranges`
+    [(start_ms, end_ms)] filled in place, up to each file's newest candle
+    (later buckets are appended by update_pair). Returns {timeframe: candles added}.
+    """
+    base = load_candles(candle_path(freqtrade_dir, pair, base_timeframe))
+    added = {}
+    for timeframe in timeframes:
+        path = candle_path(freqtrade_dir, pair, timeframe)
+        existing = load_candles(path)
+        if not len(existing):
+            continue
+        step = TIMEFRAME_MS[timeframe]
+        parts = []
+        for start, end in ranges:
+            first, last = np.searchsorted(base[:, 0], [start - start % step, end + (-end) % step])
+            parts.append(resample_candles(base[first:last], timeframe, base_timeframe))
+        derived = merge_candles(*parts)
+        derived = derived[derived[:, 0] <= existing[-1, 0]]
+        if len(derived):
+            candles = merge_candles(existing, derived)
+            save_candles(path, candles)
+            added[timeframe] = len(candles) - len(existing)
+    return added
+
+
+def update_pair(freqtrade_dir, pair, timeframes, rebuild=False, base_timeframe=BASE_TIMEFRAME, refill=None):
+    """
+    Bring the pair's derived files up to date from its base-timeframe file,
+    re-deriving the buckets of the base ranges in `refill` first.
+
+    Returns {timeframe: candles added}.
+    """
+    steps = {timeframe: TIMEFRAME_MS[timeframe] for timeframe in timeframes}
+    refilled = rederive(freqtrade_dir, pair, timeframes, refill, base_timeframe) if refill and not rebuild else {}
+    lasts = {timeframe: None if rebuild else last_time(candle_path(freqtrade_dir, pair, timeframe))
+             for timeframe in timeframes}
+    base_path = candle_path(freqtrade_dir, pair, base_timeframe)
+
+    if any(last is None for last in lasts.values()):
+        base = load_candles(base_path)
+    else:
+        # Start of the oldest missing bucket, aligned so it starts a bucket of every timeframe
+        since = min(last + steps[timeframe] for timeframe, last in lasts.items())
+        period = reduce(lambda a, b: a * b // gcd(a, b), steps.values())
+        base = load_recent(base_path, since - since % period)
+
+    added = {}
+    for timeframe in timeframes:
+        derived = resample_candles(base, timeframe, base_timeframe)
+        path = candle_path(freqtrade_dir, pair, timeframe)
+        if lasts[timeframe] is None:
+            save_candles(path, derived)
+        else:
+            derived = derived[derived[:, 0] > lasts[timeframe]]
+            append_candles(path, derived)
+        added[timeframe] = len(derived) + refilled.get(timeframe, 0)
+    return added
+
+
+def update_derived(freqtrade_dir, pairs=None, timeframes=None, rebuild=False, refill=None):
+    """
+    Update the derived timeframes of every pair with base data; returns the failed pairs.
+    `refill` maps pairs to base ranges filled in place since the last update.
+    """
+    timeframes = timeframes or DERIVED_TIMEFRAMES
+    pairs = pairs or base_pairs(freqtrade_dir)
+    refill = refill or {}
+    failed = []
+    start = time.monotonic()
+    for pair in pairs:
+        try:
+            added = update_pair(freqtrade_dir, pair, timeframes, rebuild, refill=refill.get(pair))
+        except (OSError, ValueError) as e:
+            print(f"✗ {pair:<12} {e}")
+            failed.append(f"{pair} - {str(e)[:40]}")
+            continue
+        summary = '  '.join(f"{timeframe} +{count:,}" for timeframe, count in added.items())
+        print(f"✓ {pair:<12} {summary}")
+    print(f"\nResampled {len(pairs) - len(failed)} pairs in {time.monotonic() - start:.1f}s")
+    return failed
+
+
+def check_against_exchange(freqtrade_dir, pairs, timeframes, days, base_url=None, rtol=1e-6):
+    """
+    Compare freshly derived candles with the exchange's own candles over the
+    last `days`. Returns True when every exchange candle has a derived
+    candle (none dropped for missing 1m data) that matches within `rtol`.
+    """
+    from async_downloader import BINANCE_URL, closed_candles_end, fetch
+
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    start_ms = now_ms - days * 86_400_000
+    tasks = [(pair, timeframe, [(start_ms, closed_candles_end(now_ms, timeframe))])
+             for pair in pairs for timeframe in timeframes]
+    exchange = fetch(tasks, base_url=base_url or BINANCE_URL)
+
+    print(f"\n{'pair':<12}{'tf':>5}{'compared':>10}{'missing':>9}{'mismatch':>10}{'max rel diff':>14}")
+    print("-"*60)
+    ok = True
+    for pair in pairs:
+        base = load_recent(candle_path(freqtrade_dir, pair, BASE_TIMEFRAME), start_ms - start_ms % 86_400_000)
+        for timeframe in timeframes:
+            reference, error = exchange[(pair, timeframe)]
+            if error and not len(reference):
+                print(f"{pair:<12}{timeframe:>5}  ✗ {error[:40]}")
+                ok = False
+                continue
+            derived = resample_candles(base, timeframe)
+            common, ref_idx, der_idx = np.intersect1d(reference[:, 0], derived[:, 0], return_indices=True)
+            ref, der = reference[ref_idx, 1:], derived[der_idx, 1:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rel = np.nan_to_num(np.abs(der - ref) / np.maximum(np.abs(ref), 1e-12))
+            mismatched = int(np.sum(rel.max(axis=1) > rtol)) if len(common) else 0
+            missing = len(reference) - len(common)
+            ok &= mismatched == 0 and missing == 0
+            print(f"{pair:<12}{timeframe:>5}{len(common):>10,}{missing:>9,}{mismatched:>10,}"
+                  f"{rel.max() if len(common) else 0.0:>14.2e}")
+
+    print(f"\n{'✓' if ok else '✗'} Derived candles {'match' if ok else 'DIFFER from'} the exchange (rtol {rtol})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Derive higher timeframes from 1m candles',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python resample.py                          # Incremental update, 5m/15m/1h
+  python resample.py --timeframes 5m 30m 4h   # Other timeframes
+  python resample.py --rebuild                # Recompute from the full 1m history
+  python resample.py --check --pairs BTC/USDT --days 3
+        """
+    )
+    parser.add_argument('--pairs', nargs='+', help='Pairs (default: every pair with 1m data)')
+    parser.add_argument('--timeframes', nargs='+', default=DERIVED_TIMEFRAMES,
+                        help='Timeframes to derive (default: 5m 15m 1h)')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute from the full 1m history')
+    parser.add_argument('--check', action='store_true', help='Compare derived candles with the exchange')
+    parser.add_argument('--days', type=int, default=3, help='Days to compare with --check (default: 3)')
+    parser.add_argument('--base-url', help='Exchange REST URL for --check (e.g. a mock exchange)')
+    parser.add_argument('--freqtrade-dir', type=Path, default=get_freqtrade_dir(),
+                        help='freqtrade_setup directory (default: ../freqtrade_setup)')
+    args = parser.parse_args()
+
+    unknown = [timeframe for timeframe in args.timeframes if timeframe not in TIMEFRAME_MS]
+    if unknown:
+        parser.error(f"unsupported timeframes: {', '.join(unknown)}")
+
+    pairs = args.pairs or base_pairs(args.freqtrade_dir)
+    if not pairs:
+        print("✗ No 1m data found. Run: python scripts/download_data.py")
+        sys.exit(1)
+
+    if args.check:
+        ok = check_against_exchange(args.freqtrade_dir, pairs, args.timeframes, args.days, args.base_url)
+        sys.exit(0 if ok else 1)
+
+    failed = update_derived(args.freqtrade_dir, pairs, args.timeframes, args.rebuild)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,14 +12,33 @@ This script:
 4. Displays training metrics
 
 Estimated time: 30-60 minutes (depending on CPU)
+
+Usage:
+    python train_model.py                 # Train pairs in parallel (one job per pair)
+    python train_model.py --split-windows # One job per pair and 7-day window
+    python train_model.py --serial        # Single freqtrade process (original behaviour)
 """
 
+import argparse
+import json
+import shutil
 import subprocess
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import candle_index
+from download_data import PAIRS
+from job_pool import Job, format_duration, plan_workers, run_jobs
+
+
+# Training data starts here (shared by serial and parallel training)
+TRAIN_START = '20231101'
+
+# MLScalpingStrategy.startup_candle_count
+STARTUP_CANDLES = 200
+
 
 def print_header():
     """Print script header"""
@@ -63,7 +82,7 @@ def get_freqtrade_dir():
 
 
 def check_data(freqtrade_dir):
-    """Check if historical data exists"""
+    """Check that historical data exists and covers the training timerange (via the candle index)"""
     data_dir = freqtrade_dir / 'user_data' / 'data' / 'binance'
     
     if not data_dir.exists():
@@ -71,18 +90,43 @@ def check_data(freqtrade_dir):
         print("  Please run: python scripts/download_data.py")
         return False
     
-    # Count data files
-    json_files = list(data_dir.glob('*.json'))
+    # File count, gaps and coverage come from the index, not the candle files
+    index = candle_index.refresh(freqtrade_dir)
     
-    if len(json_files) < 10:
-        print(f"✗ ERROR: Only {len(json_files)} data files found!")
+    if len(index) < 10:
+        print(f"✗ ERROR: Only {len(index)} data files found!")
         print("  Please run: python scripts/download_data.py")
         return False
     
-    print(f"✓ Found {len(json_files)} data files")
+    print(f"✓ Found {len(index)} data files")
+    
+    pairs = [entry['pair'] for entry in candle_index.entries(index, '5m', PAIRS)]
+    uncovered = uncovered_training_pairs(freqtrade_dir, pairs)
+    problems = candle_index.find_problems(index, '5m', stale_after_ms=None, pairs=PAIRS)
+    for pair, reason in sorted(uncovered.items()):
+        print(f"⚠ {pair}: 5m data {reason}, needed from {TRAIN_START} minus the training window")
+    for pair, found in sorted(problems.items()):
+        print(f"⚠ {pair}: {'; '.join(found)}")
+    if pairs and len(uncovered) == len(pairs):
+        print("✗ ERROR: No pair has 5m data covering the training timerange!")
+        print("  Please run: python scripts/download_data.py")
+        return False
     return True
 
 
+def uncovered_training_pairs(freqtrade_dir, pairs):
+    """
+    {pair: reason} for pairs whose 5m data does not reach back to TRAIN_START
+    minus FreqAI's train_period_days and the strategy's startup candles
+    """
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    return candle_index.validate_timerange(
+        freqtrade_dir, f'{TRAIN_START}-', pairs, '5m',
+        lead_days=config['freqai'].get('train_period_days', 0),
+        startup_candles=STARTUP_CANDLES,
+    )
+
+
 def check_strategy(freqtrade_dir):
     """Check if strategy exists"""
     strategy_file = freqtrade_dir / 'user_data' / 'strategies' / 'MLScalpingStrategy.py'
@@ -96,41 +140,24 @@ def check_strategy(freqtrade_dir):
 
 
 def update_data(freqtrade_dir):
-    """Update historical data before training"""
+    """Update historical data before training (fetches only the missing candles)"""
     print("\n" + "="*60)
     print("  Updating historical data...")
     print("="*60 + "\n")
     
-    # Update last 7 days of data
-    cmd = [
-        'freqtrade',
-        'download-data',
-        '--exchange', 'binance',
-        '--timeframe', '5m',
-        '--days', '7',
-        '--datadir', str(freqtrade_dir / 'user_data' / 'data'),
-        '--config', str(freqtrade_dir / 'config.json')
-    ]
-    
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout
-        )
-        
-        if result.returncode == 0:
-            print("✓ Data updated successfully")
-            return True
-        else:
-            print("⚠ Data update failed, continuing with existing data")
-            return True  # Continue anyway
-    
+        from download_data import sync_data
+        failed = sync_data(freqtrade_dir)
     except Exception as e:
         print(f"⚠ Data update failed: {e}")
         print("  Continuing with existing data...")
         return True
+    
+    if failed:
+        print(f"⚠ {len(failed)} updates failed, continuing with existing data")
+    else:
+        print("✓ Data updated successfully")
+    return True  # Continue anyway
 
 
 def train_model(freqtrade_dir):
@@ -152,8 +179,8 @@ def train_model(freqtrade_dir):
             'backtesting',
             '--strategy', 'MLScalpingStrategy',
             '--config', 'config.json',
-            '--timerange', '20231101-',  # Train on data from Nov 2023 onwards
-            '--freqaimodel', 'LightGBMClassifier'
+            '--timerange', f'{TRAIN_START}-',  # Train on data from Nov 2023 onwards
+            '--freqaimodel', 'LightGBMScalpingClassifier'
         ]
         
         print("Running command:")
@@ -204,6 +231,176 @@ def train_model(freqtrade_dir):
         os.chdir(original_dir)
 
 
+def training_pairs(freqtrade_dir, pairs=None):
+    """Pairs to train: the requested ones, or every pair whose 5m data covers the training timerange"""
+    if pairs:
+        return pairs
+    index = candle_index.refresh(freqtrade_dir)
+    available = [entry['pair'] for entry in candle_index.entries(index, '5m', PAIRS)]
+    uncovered = uncovered_training_pairs(freqtrade_dir, available)
+    if uncovered:
+        print(f"Skipping {len(uncovered)} pairs without enough 5m history: {', '.join(sorted(uncovered))}")
+    return [pair for pair in PAIRS if pair in available and pair not in uncovered]
+
+
+def walk_forward_windows(start, end, days):
+    """Split start..end into consecutive `days`-long timeranges (FreqAI's backtest windows)"""
+    windows = []
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + timedelta(days=days), end)
+        windows.append(f"{window_start:%Y%m%d}-{window_end:%Y%m%d}")
+        window_start = window_end
+    return windows
+
+
+def build_training_jobs(freqtrade_dir, pairs, windows, threads_per_job):
+    """
+    One freqtrade process per pair (and window), each in its own workspace.
+    
+    Every job gets an override config that restricts the whitelist to its
+    pair and points FreqAI at a private model identifier, so concurrent jobs
+    never write the same pair_dictionary.json. merge_job_models() folds the
+    results back into the main identifier afterwards.
+    """
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    identifier = config['freqai']['identifier']
+    workspace = freqtrade_dir / 'user_data' / 'train_jobs'
+    
+    jobs = []
+    for pair in pairs:
+        for index, timerange in enumerate(windows):
+            name = pair if len(windows) == 1 else f"{pair} w{index + 1:02d}"
+            job_id = f"{pair.replace('/', '_')}-w{index + 1:02d}"
+            job_dir = workspace / job_id
+            job_dir.mkdir(parents=True, exist_ok=True)
+            
+            override = {
+                'exchange': {'pair_whitelist': [pair]},
+                'pairlists': [{'method': 'StaticPairList'}],
+                'freqai': {
+                    'identifier': f"{identifier}-job-{job_id}",
+                    'data_kitchen_thread_count': threads_per_job,
+                    'model_training_parameters': {'n_jobs': threads_per_job},
+                },
+            }
+            (job_dir / 'config.json').write_text(json.dumps(override, indent=2))
+            
+            cmd = [
+                'freqtrade', 'backtesting',
+                '--strategy', 'MLScalpingStrategy',
+                '--config', 'config.json',
+                '--config', str(job_dir / 'config.json'),
+                '--timerange', timerange,
+                '--freqaimodel', 'LightGBMScalpingClassifier',
+                '--export', 'none',
+                '--cache', 'none',
+            ]
+            jobs.append(Job(name, cmd, freqtrade_dir, job_dir / 'train.log', job_id=job_id))
+    
+    return identifier, jobs
+
+
+def merge_job_models(models_dir, identifier, jobs):
+    """
+    Move every finished job's sub-train model folders into the main model
+    identifier and merge the pair dictionaries (newest training wins).
+    """
+    target = models_dir / identifier
+    target.mkdir(parents=True, exist_ok=True)
+    dictionary_path = target / 'pair_dictionary.json'
+    pair_dictionary = json.loads(dictionary_path.read_text()) if dictionary_path.exists() else {}
+    merged = 0
+    
+    for job in jobs:
+        source = models_dir / f"{identifier}-job-{job.job_id}"
+        if not job.ok or not source.exists():
+            continue
+        
+        for sub_train in source.glob('sub-train-*'):
+            destination = target / sub_train.name
+            if destination.exists():
+                shutil.rmtree(destination)
+            shutil.move(str(sub_train), str(destination))
+        
+        predictions = source / 'backtesting_predictions'
+        if predictions.exists():
+            (target / 'backtesting_predictions').mkdir(exist_ok=True)
+            for file in predictions.iterdir():
+                shutil.move(str(file), str(target / 'backtesting_predictions' / file.name))
+        
+        job_dictionary = source / 'pair_dictionary.json'
+        if job_dictionary.exists():
+            for pair, info in json.loads(job_dictionary.read_text()).items():
+                if info.get('data_path'):
+                    info['data_path'] = str(target / Path(info['data_path']).name)
+                current = pair_dictionary.get(pair)
+                if current is None or info.get('trained_timestamp', 0) >= current.get('trained_timestamp', 0):
+                    pair_dictionary[pair] = info
+        
+        for name in ('global_metadata.json', 'run_params.json'):
+            if (source / name).exists() and not (target / name).exists():
+                shutil.copy2(source / name, target / name)
+        
+        shutil.rmtree(source)
+        merged += 1
+    
+    dictionary_path.write_text(json.dumps(pair_dictionary, indent=2))
+    return merged
+
+
+def train_parallel(freqtrade_dir, args):
+    """Train pairs (and windows) as independent jobs on a process pool"""
+    print("\n" + "="*60)
+    print("  Training ML Model (parallel)")
+    print("="*60 + "\n")
+    
+    pairs = training_pairs(freqtrade_dir, args.pairs)
+    if not pairs:
+        print("✗ ERROR: No pairs with 5m data found!")
+        return False
+    
+    if args.split_windows:
+        config = json.loads((freqtrade_dir / 'config.json').read_text())
+        days = config['freqai'].get('backtest_period_days', 7)
+        windows = walk_forward_windows(datetime.strptime(TRAIN_START, '%Y%m%d'), datetime.now(), days)
+    else:
+        windows = [f'{TRAIN_START}-']
+    
+    workers = plan_workers(args.threads_per_job, args.memory_per_job, args.jobs)
+    identifier, jobs = build_training_jobs(freqtrade_dir, pairs, windows, args.threads_per_job)
+    
+    print(f"Pairs: {len(pairs)}  Windows per pair: {len(windows)}  Jobs: {len(jobs)}")
+    print(f"Workers: {workers} x {args.threads_per_job} threads"
+          + (f", {args.memory_per_job:g} GB virtual memory each" if args.memory_per_job else ""))
+    print(f"Job logs: {freqtrade_dir / 'user_data' / 'train_jobs'}")
+    print("\n" + "-"*60 + "\n")
+    
+    start_time = datetime.now()
+    run_jobs(jobs, workers, args.threads_per_job, args.memory_per_job)
+    wall = (datetime.now() - start_time).total_seconds()
+    
+    merged = merge_job_models(freqtrade_dir / 'user_data' / 'models', identifier, jobs)
+    failed = [job for job in jobs if not job.ok]
+    busy = sum(job.seconds for job in jobs)
+    
+    print("\n" + "="*60)
+    print(f"  Training Complete! ({format_duration(wall)})")
+    print("="*60)
+    print(f"\nMerged {merged}/{len(jobs)} jobs into models/{identifier}")
+    print(f"Job time {format_duration(busy)} in {format_duration(wall)} wall time "
+          f"({busy / wall if wall else 0:.1f}x parallel speedup)")
+    
+    if failed:
+        print(f"\n✗ {len(failed)} jobs failed:")
+        for job in failed[:10]:
+            print(f"  - {job.name}: {job.log_path}")
+        if len(failed) > 10:
+            print(f"  ... and {len(failed) - 10} more")
+    
+    return merged > 0
+
+
 def check_model(freqtrade_dir):
     """Check if model was created"""
     models_dir = freqtrade_dir / 'user_data' / 'models'
@@ -224,6 +421,32 @@ def check_model(freqtrade_dir):
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Train the FreqAI model for ML Scalping Strategy',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python train_model.py                          # One job per pair, all cores
+  python train_model.py --threads-per-job 4      # Fewer, wider jobs
+  python train_model.py --pairs BTC/USDT ETH/USDT
+  python train_model.py --serial                 # Single freqtrade process
+        """
+    )
+    parser.add_argument('--serial', action='store_true',
+                        help='Train all pairs in one freqtrade process')
+    parser.add_argument('--pairs', nargs='+',
+                        help='Pairs to train (default: all downloaded pairs)')
+    parser.add_argument('--split-windows', action='store_true',
+                        help='Also split each pair into backtest_period_days windows')
+    parser.add_argument('--jobs', type=int,
+                        help='Maximum parallel jobs (default: cores / threads-per-job)')
+    parser.add_argument('--threads-per-job', type=int, default=2,
+                        help='CPU threads per training job (default: 2)')
+    parser.add_argument('--memory-per-job', type=float, default=0,
+                        help='Virtual memory (RLIMIT_DATA) cap per job in GB, also caps workers '
+                             'at RAM / this; allow for reserved but unused memory (default: no limit)')
+    args = parser.parse_args()
+    
     print_header()
     
     # Check if freqtrade is installed
@@ -259,7 +482,8 @@ def main():
         sys.exit(1)
     
     # Train model
-    if not train_model(freqtrade_dir):
+    trained = train_model(freqtrade_dir) if args.serial else train_parallel(freqtrade_dir, args)
+    if not trained:
         print("\n⚠ Training failed!")
         print("\nTROUBLESHOOTING:")
         print("  1. Check that you have enough historical data")
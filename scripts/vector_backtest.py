@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Vectorized Backtest
+===================
+
+Standalone replay of MLScalpingStrategy's trades with numpy, for research
+iterations that cannot wait for a full freqtrade backtest.
+
+It reads the FreqAI predictions a freqtrade backtest saved
+(user_data/models/<identifier>/backtesting_predictions/, also from the
+sharded runs' <identifier>-bt-* models), recomputes the strategy's
+indicators with the strategy's own indicator code, and replays:
+- the strategy's own entry and exit rules, shifted one candle like
+  freqtrade (a signal on candle i is acted on at the open of candle i+1)
+- minimal_roi, the stoploss and the trailing stop, with freqtrade's
+  close-rate rules for each exit type
+- confirm_trade_exit: exit signals only after min_exit_signal_minutes
+- max_open_trades across pairs, the "unlimited" stake from the wallet and
+  tradable_balance_ratio, and custom_stake_amount's ATR scaling
+
+Every setting comes from MLScalpingStrategy as freqtrade loads it: class
+attributes, hyperopt results in MLScalpingStrategy.json and config.json
+overrides (see StrategySettings), so the replay follows the strategy
+instead of a copy of it.
+
+Each trade's exit is found with array operations over the candles after its
+entry; only accepted entries are walked one by one, across all pairs in
+time order, to apply max_open_trades and the wallet. A year of 5m candles
+for 50 pairs replays in seconds.
+
+Not simulated: exchange price/amount precision and minimum stakes,
+protections, unfilled-order timeouts. Profit ratios therefore match
+freqtrade's to about the exchange's price precision; --compare reconciles
+the trades with a freqtrade export.
+
+Usage:
+    python vector_backtest.py --timerange 20240101-20250101
+    python vector_backtest.py --timerange 20240101-20250101 --compare    # vs the latest freqtrade export
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtest import (STRATEGY, backtest_pairs, calculate_timerange, load_export_trades, period_stats,
+                      timerange_arg, timerange_ms, trade_key)
+from candle_data import TIMEFRAME_MS, candle_path, empty_candles
+from candle_store import CandleStore
+
+
+TIMEFRAME = '5m'
+STARTUP_CANDLES = 200
+DEFAULT_FEE = 0.001
+
+# Candles searched for a trade's exit at first; the window grows 4x until an exit is found
+EXIT_SEARCH_CANDLES = 288
+
+
+def get_freqtrade_dir():
+    """Get the freqtrade setup directory"""
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    return project_root / 'freqtrade_setup'
+
+
+# Strategy helpers live next to the strategy
+sys.path.insert(0, str(get_freqtrade_dir() / 'user_data' / 'strategies'))
+
+
+class StrategySettings:
+    """
+    What the replay needs from a loaded MLScalpingStrategy: the ROI table,
+    stoploss and trailing settings as freqtrade resolved them, the stake
+    and exit-confirmation settings, and the entry/exit rules themselves
+    (with the strategy's current buy_rsi/sell_rsi values)
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        roi = {int(minutes): float(value) for minutes, value in strategy.minimal_roi.items()}
+        self.roi_minutes = np.array(sorted(roi), dtype='int64')
+        self.roi_values = np.array([roi[minutes] for minutes in sorted(roi)])
+        self.stoploss = float(strategy.stoploss)
+        self.trailing_stop = bool(strategy.trailing_stop)
+        self.trailing_stop_positive = strategy.trailing_stop_positive
+        self.trailing_stop_positive_offset = float(strategy.trailing_stop_positive_offset or 0.0)
+        self.trailing_only_offset_is_reached = bool(strategy.trailing_only_offset_is_reached)
+        self.min_exit_signal_minutes = strategy.min_exit_signal_minutes
+        self.atr_stake_steps = list(strategy.atr_stake_steps)
+
+    def roi_at(self, minutes):
+        """ROI threshold(s) in force after `minutes` in the trade"""
+        return self.roi_values[np.searchsorted(self.roi_minutes, minutes, side='right') - 1]
+
+    def describe(self):
+        trailing = (f"trailing {self.trailing_stop_positive} above {self.trailing_stop_positive_offset}"
+                    if self.trailing_stop else "no trailing stop")
+        return (f"ROI {dict(zip(self.roi_minutes.tolist(), self.roi_values.tolist()))}  "
+                f"stoploss {self.stoploss}  {trailing}  "
+                f"buy_rsi {self.strategy.buy_rsi.value}  sell_rsi {self.strategy.sell_rsi.value}")
+
+
+def load_settings(freqtrade_dir, config):
+    """StrategySettings of MLScalpingStrategy, loaded the way freqtrade loads it"""
+    from freqtrade.resolvers import StrategyResolver
+
+    user_data = Path(freqtrade_dir) / 'user_data'
+    config = dict(config, strategy=STRATEGY, user_data_dir=user_data,
+                  strategy_path=str(user_data / 'strategies'))
+    return StrategySettings(StrategyResolver.load_strategy(config))
+
+
+class PairSignals:
+    """
+    Backtest candles of one pair with the strategy's signals, shifted like
+    freqtrade: row i carries the signals of candle i-1 and trades at its open
+    """
+
+    def __init__(self, pair, times, open_, high, low, enter, exit_, atr=None):
+        self.pair = pair
+        self.times = np.asarray(times, dtype='int64')
+        self.open = np.asarray(open_, dtype='float64')
+        self.high = np.asarray(high, dtype='float64')
+        self.low = np.asarray(low, dtype='float64')
+        enter = np.asarray(enter, dtype=bool)
+        exit_ = np.asarray(exit_, dtype=bool)
+        # freqtrade ignores an entry signal next to an exit signal, and the reverse
+        self.entries = enter & ~exit_
+        self.exits = exit_ & ~enter
+        self.atr = None if atr is None else np.asarray(atr, dtype='float64')
+
+    def __len__(self):
+        return len(self.times)
+
+
+# ---------------------------------------------------------------------------
+# Signals
+# ---------------------------------------------------------------------------
+
+def load_frame(freqtrade_dir, pair, start_ms, end_ms):
+    """OHLCV DataFrame (date as int64 ms) of candles in [start_ms, end_ms), from the memory-mapped candle file"""
+    path = candle_path(freqtrade_dir, pair, TIMEFRAME)
+    candles = CandleStore(path).candles(start_ms, end_ms) if path.exists() else empty_candles()
+    frame = pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'])
+    frame.insert(0, 'date', candles[:, 0].astype('int64'))
+    return frame
+
+
+def prediction_files(freqtrade_dir, identifier, pair):
+    """FreqAI backtesting prediction files of a pair, oldest model first"""
+    models = Path(freqtrade_dir) / 'user_data' / 'models'
+    coin = pair.split('/')[0].lower()
+    files = []
+    for model_dir in [models / identifier, *models.glob(f"{identifier}-bt-*")]:
+        files += (model_dir / 'backtesting_predictions').glob(f"cb_{coin}_*_prediction.feather")
+    # cb_<coin>_<training timestamp>_prediction.feather
+    return sorted(files, key=lambda path: int(path.stem.split('_')[-2]))
+
+
+def load_predictions(freqtrade_dir, identifier, pair):
+    """do_predict and DI_values per candle (date as int64 ms), or None when FreqAI saved none"""
+    files = prediction_files(freqtrade_dir, identifier, pair)
+    if not files:
+        return None
+    frames = []
+    for path in files:
+        frame = pd.read_feather(path, columns=['date', 'do_predict', 'DI_values'])
+        frame['date'] = frame['date'].values.astype('datetime64[ms]').astype('int64')
+        frames.append(frame)
+    # Sharded runs predict overlapping days with the same models; keep one row per candle
+    predictions = pd.concat(frames, ignore_index=True).drop_duplicates('date', keep='last')
+    return predictions.sort_values('date', ignore_index=True)
+
+
+def add_indicators(frame):
+    """populate_indicators' columns, computed by the strategy's own indicator code"""
+    from mlscalping.indicator_cache import (ATR_14, BBANDS_20_2, EMA_8, MACD_12_26_9, RSI_14,
+                                            VOLUME_MEAN_20, compute_indicator)
+
+    frame['rsi'] = compute_indicator(frame, RSI_14)
+    macd = compute_indicator(frame, MACD_12_26_9)
+    frame['macd'] = macd['macd']
+    frame['macdsignal'] = macd['macdsignal']
+    bollinger = compute_indicator(frame, BBANDS_20_2)
+    frame['bb_lowerband'] = bollinger['lower']
+    frame['bb_middleband'] = bollinger['mid']
+    frame['bb_upperband'] = bollinger['upper']
+    frame['ema_fast'] = compute_indicator(frame, EMA_8)
+    frame['volume_mean_20'] = compute_indicator(frame, VOLUME_MEAN_20)
+    frame['atr'] = compute_indicator(frame, ATR_14)
+    return frame
+
+
+def strategy_signals(frame, settings):
+    """
+    (enter, exit) masks of the strategy's own entry and exit rules
+    (_entry_conditions/_exit_conditions on numpy columns, like its live
+    fast path) on a frame with indicators and predictions, not shifted yet
+    """
+    column = {name: frame[name].to_numpy(dtype='float64') for name in frame.columns if name != 'date'}
+    # NaN compares False, like the pandas rules on candles without predictions
+    with np.errstate(invalid='ignore', divide='ignore'):
+        enter = np.logical_and.reduce(settings.strategy._entry_conditions(column))
+        exit_ = np.logical_or.reduce(settings.strategy._exit_conditions(column))
+    return enter, exit_
+
+
+def prepare_pair(freqtrade_dir, pair, start_ms, end_ms, lead_ms, identifier, settings):
+    """
+    PairSignals for the backtest candles start_ms < date <= end_ms, or a
+    reason string when the pair cannot be replayed
+    """
+    predictions = load_predictions(freqtrade_dir, identifier, pair)
+    if predictions is None:
+        return "no FreqAI backtest predictions"
+    # Indicators see the same history freqtrade loads: training window + startup candles
+    frame = load_frame(freqtrade_dir, pair, start_ms - lead_ms, end_ms + 1)
+    times = frame['date'].to_numpy()
+    first = int(np.searchsorted(times, start_ms))
+    if len(frame) - first < 2:
+        return "no candles in the timerange"
+
+    frame = add_indicators(frame)
+    merged = frame[['date']].merge(predictions, on='date', how='left')
+    frame['do_predict'] = merged['do_predict'].to_numpy(dtype='float64')
+    frame['DI_values'] = merged['DI_values'].to_numpy(dtype='float64')
+    enter, exit_ = strategy_signals(frame, settings)
+
+    # freqtrade drops the first backtest candle: its signals move to the next one
+    rows = slice(first + 1, len(frame))
+    signal_rows = slice(first, len(frame) - 1)
+    return PairSignals(pair, times[rows], frame['open'].to_numpy()[rows], frame['high'].to_numpy()[rows],
+                       frame['low'].to_numpy()[rows], enter[signal_rows], exit_[signal_rows],
+                       frame['atr'].to_numpy()[signal_rows])
+
+
+def prepare_pairs(freqtrade_dir, pairs, start_ms, end_ms, lead_ms, identifier, settings, workers=None):
+    """([PairSignals, ...] in pair order, {pair: reason skipped})"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda pair: prepare_pair(freqtrade_dir, pair, start_ms, end_ms, lead_ms,
+                                                          identifier, settings), pairs))
+    prepared = [result for result in results if isinstance(result, PairSignals)]
+    skipped = {pair: result for pair, result in zip(pairs, results) if isinstance(result, str)}
+    return prepared, skipped
+
+
+# ---------------------------------------------------------------------------
+# Exits
+# ---------------------------------------------------------------------------
+
+def profit_ratio(open_rate, rate, fee):
+    """freqtrade's calc_profit_ratio for a long trade, rounded to 8 decimals like freqtrade"""
+    return np.round(rate * (1 - fee) / (open_rate * (1 + fee)) - 1, 8)
+
+
+def stoploss_close_rate(settings, stop, trailing, minutes, open_, low, high):
+    """freqtrade's close rate for a (trailing) stoploss exit"""
+    if stop > high:
+        # Candle opened below the stop
+        return open_
+    if trailing and minutes == 0:
+        # Trailing stop armed and hit on the entry candle: assume the worst path
+        if settings.trailing_only_offset_is_reached and settings.trailing_stop_positive:
+            return max(low, open_ * (1 + abs(settings.trailing_stop_positive_offset)
+                                     - abs(settings.trailing_stop_positive)))
+        return max(low, open_ * (1 + settings.stoploss))
+    return stop
+
+
+def roi_close_rate(settings, open_rate, minutes, fee, open_, low, high):
+    """freqtrade's close rate for a ROI exit: the rate that makes exactly the ROI after fees"""
+    index = np.searchsorted(settings.roi_minutes, minutes, side='right') - 1
+    roi_minutes, roi = int(settings.roi_minutes[index]), settings.roi_values[index]
+    close_rate = (open_rate * roi + open_rate * (1 + fee)) / (1 - fee)
+    if (minutes > 0 and minutes == roi_minutes and roi_minutes % (TIMEFRAME_MS[TIMEFRAME] // 60_000) == 0
+            and open_ > close_rate):
+        # A new ROI step starts at this candle's open, which is already above it
+        return open_
+    return min(max(close_rate, low), high)
+
+
+def trailing_stops(settings, high, best):
+    """
+    Stop level the trailing stop moves to at each candle high (-inf where
+    it does not move), with `best` the profit ratio at the high
+    """
+    if not settings.trailing_stop:
+        return np.full(len(high), -np.inf)
+    offset = settings.trailing_stop_positive_offset
+    # Above the offset trailing_stop_positive applies; at or below it the stoploss distance
+    if settings.trailing_stop_positive is not None:
+        distance = np.where(best > offset, abs(settings.trailing_stop_positive), abs(settings.stoploss))
+    else:
+        distance = np.full(len(high), abs(settings.stoploss))
+    armed = best >= offset if settings.trailing_only_offset_is_reached else np.ones(len(high), dtype=bool)
+    return np.where(armed, high * (1 - distance), -np.inf)
+
+
+def find_exit(signals, entry, fee, settings):
+    """
+    Exit of a trade entered at the open of row `entry`:
+    (row, exit_reason, close_rate), or None when the data ends first.
+
+    Works on growing windows of candles. Within a window the stop is the
+    running maximum of the initial stop and every trailing stop level
+    (see trailing_stops), so the first exit is one argmax over the window.
+    """
+    open_rate = signals.open[entry]
+    initial_stop = open_rate * (1 + settings.stoploss)
+    stop = initial_stop
+    start, size = entry, EXIT_SEARCH_CANDLES
+    while start < len(signals):
+        window = slice(start, min(start + size, len(signals)))
+        high, low = signals.high[window], signals.low[window]
+        minutes = (signals.times[window] - signals.times[entry]) // 60_000
+        best = profit_ratio(open_rate, high, fee)
+        stops = np.maximum.accumulate(np.r_[stop, trailing_stops(settings, high, best)])
+        roi_hit = best > settings.roi_at(minutes)
+        signal_hit = signals.exits[window] & (minutes >= settings.min_exit_signal_minutes)
+        hit = (stops[1:] >= low) | roi_hit | signal_hit
+        if hit.any():
+            k = int(hit.argmax())
+            row = start + k
+            # freqtrade does not move a stop that is already at or above the candle low
+            stop_now = stops[k] if stops[k] >= low[k] else stops[k + 1]
+            trailing = stop_now > initial_stop
+            rates = (signals.open[row], low[k], high[k])
+            # Same order as freqtrade: exit signal, stoploss, ROI, trailing stop
+            if signal_hit[k]:
+                return row, 'exit_signal', signals.open[row]
+            if stop_now >= low[k] and not trailing:
+                return row, 'stop_loss', stoploss_close_rate(settings, stop_now, False, minutes[k], *rates)
+            if roi_hit[k]:
+                return row, 'roi', roi_close_rate(settings, open_rate, minutes[k], fee, *rates)
+            return row, 'trailing_stop_loss', stoploss_close_rate(settings, stop_now, True, minutes[k], *rates)
+        stop = stops[-1]
+        start, size = window.stop, size * 4
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Portfolio
+# ---------------------------------------------------------------------------
+
+def format_ms(ms):
+    """Timestamp as freqtrade writes dates into its trade export"""
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S+00:00')
+
+
+def make_trade(pair, open_ms, close_ms, open_rate, close_rate, stake, fee, exit_reason):
+    """Trade record with the fields of freqtrade's trade export"""
+    amount = stake / open_rate
+    profit_abs = amount * close_rate * (1 - fee) - stake * (1 + fee)
+    return {
+        'pair': pair,
+        'stake_amount': float(stake),
+        'amount': float(amount),
+        'open_date': format_ms(open_ms),
+        'close_date': format_ms(close_ms),
+        'open_rate': float(open_rate),
+        'close_rate': float(close_rate),
+        'fee_open': fee,
+        'fee_close': fee,
+        'trade_duration': int((close_ms - open_ms) // 60_000),
+        'profit_ratio': float(f"{close_rate * (1 - fee) / (open_rate * (1 + fee)) - 1:.8f}"),
+        'profit_abs': round(float(profit_abs), 8),
+        'exit_reason': exit_reason,
+        'is_open': False,
+        'is_short': False,
+        'open_timestamp': int(open_ms),
+        'close_timestamp': int(close_ms),
+    }
+
+
+def stake_factor(signals, row, steps):
+    """custom_stake_amount: smaller stakes when the signal candle's ATR is high (atr_stake_steps)"""
+    if signals.atr is None:
+        return 1.0
+    atr = signals.atr[row]
+    if atr == 0 or np.isnan(atr):
+        return 1.0
+    atr_percent = atr / signals.open[row] * 100
+    for above, factor in steps:
+        if atr_percent > above:
+            return factor
+    return 1.0
+
+
+def simulate(pairs, settings, fee=DEFAULT_FEE, max_open_trades=3, wallet=1000.0, tradable_balance_ratio=1.0,
+             stake_amount='unlimited'):
+    """
+    Replay entries across `pairs` (PairSignals, in whitelist order) with the
+    strategy's StrategySettings.
+
+    Entry signals are visited in (time, pair order), like freqtrade's loop;
+    a pair with an open trade skips them. Exits of earlier trades are
+    settled before each entry: they add their profit to the wallet and free
+    their slot, except trades held for a single candle, which freqtrade
+    still counts against max_open_trades on their closing candle.
+
+    Returns (trades sorted by open time and pair, rejected entry signals).
+    """
+    timeframe_ms = TIMEFRAME_MS[TIMEFRAME]
+    last_time = max(int(signals.times[-1]) for signals in pairs)
+    # No entries on the last candle of the backtest
+    candidates = []
+    for index, signals in enumerate(pairs):
+        rows = np.flatnonzero(signals.entries & (signals.times < last_time))
+        candidates.append((signals.times[rows], np.full(len(rows), index), rows))
+    times, pair_index, rows = (np.concatenate(parts) for parts in zip(*candidates))
+    order = np.lexsort((pair_index, times))
+
+    trades = []
+    open_trades = []  # [open ms, close ms, stake, profit, settled]
+    busy_until = [-1] * len(pairs)
+    closed_profit = 0.0
+    rejected = 0
+    unlimited = stake_amount == 'unlimited'
+    for now, index, row in zip(times[order].tolist(), pair_index[order].tolist(), rows[order].tolist()):
+        if busy_until[index] >= now:
+            continue
+        for trade in open_trades:
+            if trade[1] <= now and not trade[4]:
+                closed_profit += trade[3]
+                trade[4] = True
+        open_trades = [trade for trade in open_trades if trade[1] >= now]
+        slots_used = sum(trade[1] > now or trade[1] - trade[0] <= timeframe_ms for trade in open_trades)
+        if max_open_trades > 0 and slots_used >= max_open_trades:
+            rejected += 1
+            continue
+
+        signals = pairs[index]
+        tied_up = sum(trade[2] for trade in open_trades if trade[1] > now)
+        balance = wallet + closed_profit
+        available = min(balance * tradable_balance_ratio - tied_up, balance - tied_up)
+        if unlimited:
+            stake = min(balance * tradable_balance_ratio / max_open_trades, available)
+        else:
+            stake = float(stake_amount)
+        stake = min(stake * stake_factor(signals, row, settings.atr_stake_steps), available)
+        if stake <= 0:
+            continue
+
+        found = find_exit(signals, row, fee, settings)
+        if found is None:
+            # Still open at the end: force-exited at the last candle's open
+            exit_row, exit_reason, close_rate = len(signals) - 1, 'force_exit', signals.open[-1]
+        else:
+            exit_row, exit_reason, close_rate = found
+        trade = make_trade(signals.pair, now, int(signals.times[exit_row]), signals.open[row], close_rate,
+                           stake, fee, exit_reason)
+        trades.append(trade)
+        open_trades.append([now, trade['close_timestamp'], stake, trade['profit_abs'], False])
+        busy_until[index] = trade['close_timestamp']
+    return sorted(trades, key=trade_key), rejected
+
+
+# ---------------------------------------------------------------------------
+# Reconciliation
+# ---------------------------------------------------------------------------
+
+def reconcile(trades, reference, tolerance):
+    """
+    Match simulated trades with a freqtrade export by (pair, open time).
+
+    Returns {category: [(simulated, reference), ...]} with the categories
+    'identical', 'profit' (same exit, profit ratio off by more than
+    `tolerance`), 'exit' (different close time or exit reason), 'only_vector'
+    and 'only_freqtrade'.
+    """
+    ours = {(trade['pair'], trade['open_timestamp']): trade for trade in trades}
+    theirs = {(trade['pair'], trade['open_timestamp']): trade for trade in reference}
+    result = {'identical': [], 'profit': [], 'exit': [], 'only_vector': [], 'only_freqtrade': []}
+    for key in sorted(ours.keys() | theirs.keys(), key=lambda key: (key[1], key[0])):
+        a, b = ours.get(key), theirs.get(key)
+        if b is None:
+            result['only_vector'].append((a, None))
+        elif a is None:
+            result['only_freqtrade'].append((None, b))
+        elif trade_key(a) != trade_key(b):
+            result['exit'].append((a, b))
+        elif abs(a['profit_ratio'] - b['profit_ratio']) > tolerance:
+            result['profit'].append((a, b))
+        else:
+            result['identical'].append((a, b))
+    return result
+
+
+def export_setup(export):
+    """
+    (timerange, pairs in whitelist order, fee) a trade export was run with:
+    a freqtrade result file (or its .last_result.json pointer), a merged
+    sharded report or a vector backtest report. Pairs and fee are None when
+    the export does not record them.
+    """
+    export = Path(export)
+    result = json.loads(export.read_text())
+    if 'latest_backtest' in result:
+        return export_setup(export.parent / result['latest_backtest'])
+    trades = load_export_trades(export)
+    fee = trades[0]['fee_open'] if trades and 'fee_open' in trades[0] else result.get('fee')
+    if isinstance(result.get('strategy'), dict):
+        run = result['strategy'][STRATEGY]
+        timerange = run.get('timerange') or '-'.join(
+            datetime.fromtimestamp(run[key] / 1000, tz=timezone.utc).strftime('%Y%m%d')
+            for key in ('backtest_start_ts', 'backtest_end_ts'))
+        return timerange, run.get('pairlist'), fee
+    if 'shards' in result:
+        pairs = list(dict.fromkeys(pair for shard in result['shards'] for pair in shard['pairs']))
+    else:
+        pairs = result.get('pairs')
+    return result['timerange'], pairs, fee
+
+
+def compare_export(trades, prepared, export, start_ms, end_ms, tolerance, stake_currency=''):
+    """
+    Reconcile replayed trades with the export's trades on the replayed pairs
+    inside [start_ms, end_ms]; True when they are identical
+    """
+    replayed = {signals.pair for signals in prepared}
+    reference = [trade for trade in load_export_trades(export)
+                 if trade['pair'] in replayed and start_ms <= trade['open_timestamp'] <= end_ms]
+    result = reconcile(trades, reference, tolerance)
+    return print_reconciliation(result, trades, reference, stake_currency)
+
+
+def describe(trade):
+    if trade is None:
+        return '-'
+    return (f"{trade['exit_reason']} {trade['close_date'][:16]} "
+            f"{trade['profit_ratio']:+.4%}")
+
+
+def print_reconciliation(result, trades, reference, stake_currency, examples=10):
+    print("\n" + "="*60)
+    print("  Reconciliation with freqtrade")
+    print("="*60)
+    ours, theirs = period_stats(trades), period_stats(reference)
+    print(f"\n{'':22}{'vector':>14}{'freqtrade':>14}")
+    print("-"*50)
+    print(f"{'Trades':<22}{ours['trades']:>14}{theirs['trades']:>14}")
+    print(f"{'Win rate':<22}{ours['win_rate']:>14.1%}{theirs['win_rate']:>14.1%}")
+    print(f"{'Avg profit':<22}{ours['avg_profit']:>14.3%}{theirs['avg_profit']:>14.3%}")
+    print(f"{'Total ' + stake_currency:<22}{ours['total']:>14.4f}{theirs['total']:>14.4f}")
+    print(f"{'Max drawdown':<22}{ours['max_drawdown']:>14.4f}{theirs['max_drawdown']:>14.4f}")
+
+    labels = {
+        'identical': "Identical (open, close, exit reason, profit ratio)",
+        'profit': "Same exit, different profit ratio",
+        'exit': "Same entry, different exit",
+        'only_vector': "Only in the vector backtest",
+        'only_freqtrade': "Only in freqtrade",
+    }
+    print()
+    for category, label in labels.items():
+        pairs = result[category]
+        symbol = '✓' if category == 'identical' else ('✗' if pairs else '✓')
+        print(f"{symbol} {label}: {len(pairs)}")
+        if category == 'identical':
+            continue
+        for a, b in pairs[:examples]:
+            trade = a or b
+            print(f"    {trade['pair']:<12} opened {trade['open_date'][:16]}  "
+                  f"vector: {describe(a):<42} freqtrade: {describe(b)}")
+    return all(not result[category] for category in labels if category != 'identical')
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_summary(trades, rejected, stake_currency):
+    stats = period_stats(trades)
+    reasons = {}
+    for trade in trades:
+        reasons[trade['exit_reason']] = reasons.get(trade['exit_reason'], 0) + 1
+    print(f"\nTrades: {stats['trades']}  Win rate: {stats['win_rate']:.1%}  "
+          f"Avg profit: {stats['avg_profit']:.2%}  Total: {stats['total']:.4f} {stake_currency}")
+    print(f"Max drawdown: {stats['max_drawdown']:.4f} {stake_currency}  "
+          f"Profit factor: {stats['profit_factor']:.2f}  Rejected entry signals: {rejected}")
+    print("Exit reasons: " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Vectorized replay of MLScalpingStrategy from FreqAI backtest predictions',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python vector_backtest.py --period 1y
+  python vector_backtest.py --timerange 20240101-20250101 --pairs BTC/USDT ETH/USDT
+  python vector_backtest.py --timerange 20240101-20250101 --compare            # Latest freqtrade export
+  python vector_backtest.py --timerange 20240101-20250101 --compare user_data/backtest_results/backtest-sharded-20240101-20250101.json
+
+Needs the FreqAI predictions of a freqtrade backtest over the timerange
+(python backtest.py --timerange ...), which FreqAI keeps under user_data/models/.
+        """
+    )
+    parser.add_argument('--period', choices=['3m', '6m', '1y'], default='3m',
+                        help='Period to replay (default: 3m)')
+    parser.add_argument('--timerange', type=timerange_arg,
+                        help='Timerange to replay (YYYYMMDD-YYYYMMDD), instead of --period')
+    parser.add_argument('--pairs', nargs='+',
+                        help='Pairs in whitelist order (default: all pairs with 5m data)')
+    parser.add_argument('--fee', type=float, default=DEFAULT_FEE,
+                        help=f'Fee per side (default: {DEFAULT_FEE})')
+    parser.add_argument('--max-open-trades', type=int,
+                        help='Override max_open_trades from config.json')
+    parser.add_argument('--identifier',
+                        help='FreqAI identifier to read predictions from (default: from config.json)')
+    parser.add_argument('--compare', nargs='?', const='latest', metavar='EXPORT',
+                        help='Reconcile with a freqtrade trade export (default: the latest backtest)')
+    parser.add_argument('--tolerance', type=float, default=1e-4,
+                        help='Profit ratio difference still counted as identical (default: 0.0001)')
+    args = parser.parse_args()
+
+    freqtrade_dir = get_freqtrade_dir()
+    config = json.loads((freqtrade_dir / 'config.json').read_text())
+    stake_currency = config.get('stake_currency', '')
+    freqai = config.get('freqai', {})
+    timerange = args.timerange or calculate_timerange(args.period)
+    start_ms, end_ms = timerange_ms(timerange)
+    pairs = backtest_pairs(freqtrade_dir, args.pairs)
+    if not pairs:
+        print("✗ ERROR: No pairs with 5m data found!")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("  Vectorized Backtest")
+    print("="*60)
+    print(f"\nTimerange: {timerange}  Pairs: {len(pairs)}  Strategy: {STRATEGY}")
+    settings = load_settings(freqtrade_dir, config)
+    print(f"Settings: {settings.describe()}")
+
+    started = time.perf_counter()
+    lead_ms = int(freqai.get('train_period_days', 0) * 86_400_000) + STARTUP_CANDLES * TIMEFRAME_MS[TIMEFRAME]
+    prepared, skipped = prepare_pairs(freqtrade_dir, pairs, start_ms, end_ms, lead_ms,
+                                      args.identifier or freqai.get('identifier', ''), settings)
+    loaded = time.perf_counter()
+    for pair, reason in skipped.items():
+        print(f"⚠ {pair}: {reason}, skipped")
+    if not prepared:
+        print("✗ Nothing to replay. Run a freqtrade backtest first: python backtest.py --timerange " + timerange)
+        sys.exit(1)
+
+    max_open_trades = args.max_open_trades if args.max_open_trades is not None else config.get('max_open_trades', 3)
+    trades, rejected = simulate(prepared, settings, args.fee, max_open_trades, config.get('dry_run_wallet', 1000),
+                                config.get('tradable_balance_ratio', 1.0), config.get('stake_amount', 'unlimited'))
+    finished = time.perf_counter()
+    candles = sum(len(signals) for signals in prepared)
+    print(f"✓ {len(prepared)} pairs, {candles:,} candles: signals {loaded - started:.2f}s, "
+          f"replay {finished - loaded:.2f}s")
+    print_summary(trades, rejected, stake_currency)
+
+    report_path = freqtrade_dir / 'user_data' / 'backtest_results' / f"vector-backtest-{timerange}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps({
+        'strategy': STRATEGY,
+        'engine': 'vector',
+        'timerange': timerange,
+        'pairs': [signals.pair for signals in prepared],
+        'fee': args.fee,
+        'max_open_trades': max_open_trades,
+        'rejected_signals': rejected,
+        'trades': trades,
+    }, indent=2))
+    print(f"\nReport: {report_path}")
+
+    if args.compare is None:
+        print()
+        return
+    export = (freqtrade_dir / 'user_data' / 'backtest_results' / '.last_result.json'
+              if args.compare == 'latest' else Path(args.compare))
+    if not export.exists():
+        print(f"\n✗ No freqtrade export found at {export}")
+        sys.exit(1)
+    identical = compare_export(trades, prepared, export, start_ms, end_ms, args.tolerance, stake_currency)
+    print()
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nVector backtest interrupted by user.")
+        sys.exit(1)